@@ -0,0 +1,217 @@
+import bisect
+import json
+import math
+import threading
+from collections import namedtuple
+from analytics import RollingStats
+from ringbuffer import RingBuffer
+
+# One user-defined alert. `instrument` names a series from snapshot_values(), e.g.
+# 'straddle:23000', 'vix', 'stock:TCS' or 'call_oi_change:23050'. `kind` says what is
+# compared with `threshold`: the value itself, its % move from the session's first
+# value, or its z-score against the previous `window` values.
+Rule = namedtuple('Rule', ['id', 'instrument', 'threshold', 'direction', 'kind', 'window', 'message'])
+
+# One firing of a rule; `value` is the measured value (price, % move or z-score)
+Alert = namedtuple('Alert', ['seq', 'time', 'rule', 'value'])
+
+# Columns of the fired-alert log: one row per alert, the rule by id
+ALERT_COLUMNS = ('seq', 'time', 'rule', 'value')
+
+KINDS = ('value', 'pct', 'zscore')
+DIRECTIONS = ('above', 'below')
+
+# Function to flatten a tickengine.Snapshot into {instrument: value}
+def snapshot_values(snapshot):
+    values = {'vix': snapshot.vix, 'spot': snapshot.spot}
+    for strike, price in snapshot.straddles.items():
+        values[f'straddle:{strike}'] = price
+    for row in snapshot.stocks:
+        values[f"stock:{row['Stock Name']}"] = row['Price']
+    for row in snapshot.option_chain:
+        values[f"call_oi_change:{row['Strike Price']}"] = row['Call ChangeInOI']
+        values[f"put_oi_change:{row['Strike Price']}"] = row['Put ChangeInOI']
+    return values
+
+# Rules on one measured series, sorted by threshold. A move from the previous value to
+# the current one fires exactly the rules whose threshold lies between the two, which
+# two binary searches find without looking at any other rule.
+class _Ladder:
+    def __init__(self):
+        self.thresholds = {'above': [], 'below': []}
+        self.rules = {'above': [], 'below': []}
+        self.last = None
+
+    def __len__(self):
+        return len(self.rules['above']) + len(self.rules['below'])
+
+    def add(self, rule):
+        thresholds = self.thresholds[rule.direction]
+        i = bisect.bisect_right(thresholds, rule.threshold)
+        thresholds.insert(i, rule.threshold)
+        self.rules[rule.direction].insert(i, rule)
+
+    def remove(self, rule):
+        thresholds, rules = self.thresholds[rule.direction], self.rules[rule.direction]
+        i = bisect.bisect_left(thresholds, rule.threshold)
+        while rules[i].id != rule.id:
+            i += 1
+        del thresholds[i], rules[i]
+
+    # Rules crossed moving from the last value to `value`; the first value crosses from infinity
+    def crossed(self, value):
+        last, self.last = self.last, value
+        above, below = self.thresholds['above'], self.thresholds['below']
+        # 'above' fires on last < threshold <= value, 'below' on value <= threshold < last
+        up = self.rules['above'][bisect.bisect_right(above, -math.inf if last is None else last):
+                                 bisect.bisect_right(above, value)]
+        down = self.rules['below'][bisect.bisect_left(below, value):
+                                   bisect.bisect_left(below, math.inf if last is None else last)]
+        return up + down
+
+    # Rules whose condition holds at `value`, most extreme threshold first
+    def active(self, value):
+        above = self.rules['above'][:bisect.bisect_right(self.thresholds['above'], value)]
+        below = self.rules['below'][bisect.bisect_left(self.thresholds['below'], value):]
+        return above[::-1] + below
+
+# Every ladder of one instrument, plus the state its % and z-score measures need
+class _Instrument:
+    def __init__(self):
+        self.ladders = {}
+        self.reference = None
+        self.rolling = {}
+
+    # Measured value for each (kind, window) that has rules, for a new raw value
+    def measure(self, value):
+        if self.reference is None:
+            self.reference = value
+        measured = {}
+        for kind, window in self.ladders:
+            if kind == 'value':
+                measured[kind, window] = value
+            elif kind == 'pct':
+                measured[kind, window] = (value / self.reference - 1) * 100 if self.reference else math.nan
+            else:
+                measured[kind, window] = float(self.rolling[window].zscore(value))
+        for rolling in self.rolling.values():
+            rolling.push(value)
+        return measured
+
+# Server-side alert rules, evaluated on every tick for every instrument that has any.
+#
+# Rules are indexed by instrument, then by measure, then by threshold, so a tick costs
+# a dict lookup per instrument with rules plus two binary searches per measure, however
+# many rules there are. Fired alerts are logged with a sequence number so clients can
+# fetch just the ones they have not shown.
+#
+# Under serve.py only the ticker process evaluates; attach() has the workers read its
+# alert log from the shared store, resolving rule ids against their own rules, which
+# match because every process adds the same rules in the same order.
+class AlertEngine:
+    def __init__(self, queue_size=256):
+        self._instruments = {}
+        self._rules = {}
+        self._all_rules = {}        # every rule ever added, so logged alerts outlive removal
+        self._next_id = 0
+        self.log = RingBuffer(queue_size, ALERT_COLUMNS)
+        self.last_fired = []        # alerts fired by the latest tick evaluated here
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._rules)
+
+    # Alerts fired so far
+    @property
+    def seq(self):
+        return self.log.count
+
+    # Evaluate every tick of `engine`; for a follower, read the alerts its ticker logs
+    # to the shared store instead
+    def attach(self, engine):
+        if engine.store is not None:
+            self.log = engine.store.alert_log
+        if not engine.is_follower:
+            engine.add_listener(self.on_tick)
+
+    def add_rule(self, instrument, threshold, direction='above', kind='value', window=None, message=None):
+        if direction not in DIRECTIONS:
+            raise ValueError(f"direction must be one of {', '.join(DIRECTIONS)}")
+        if kind not in KINDS:
+            raise ValueError(f"kind must be one of {', '.join(KINDS)}")
+        if kind == 'zscore':
+            window = int(window or 20)
+            if window < 2:
+                raise ValueError("zscore window must be at least 2")
+        else:
+            window = None
+        if message is None:
+            unit = {'value': '', 'pct': '%', 'zscore': f' sigma ({window} ticks)'}[kind]
+            message = f"Alert: {instrument} {'' if kind == 'value' else kind + ' '}{direction} {threshold}{unit}"
+
+        with self._lock:
+            rule = Rule(self._next_id, instrument, float(threshold), direction, kind, window, message)
+            self._next_id += 1
+            self._all_rules[rule.id] = rule
+            state = self._instruments.setdefault(instrument, _Instrument())
+            if kind == 'zscore' and window not in state.rolling:
+                state.rolling[window] = RollingStats(window)
+            state.ladders.setdefault((kind, window), _Ladder()).add(rule)
+            self._rules[rule.id] = rule
+        return rule
+
+    def remove_rule(self, rule_id):
+        with self._lock:
+            rule = self._rules.pop(rule_id)
+            state = self._instruments[rule.instrument]
+            ladder = state.ladders[rule.kind, rule.window]
+            ladder.remove(rule)
+            if not len(ladder):
+                del state.ladders[rule.kind, rule.window]
+                if rule.kind == 'zscore' and not any(w == rule.window for k, w in state.ladders if k == 'zscore'):
+                    del state.rolling[rule.window]
+            if not state.ladders:
+                del self._instruments[rule.instrument]
+
+    # Add rules from a JSON file holding a list of add_rule() keyword dicts
+    def load_rules(self, path):
+        with open(path) as f:
+            return [self.add_rule(**spec) for spec in json.load(f)]
+
+    # Evaluate one tick of {instrument: value}; returns the alerts it fired
+    def evaluate(self, values, now):
+        fired = []
+        with self._lock:
+            seq = self.log.count
+            for instrument, state in self._instruments.items():
+                value = values.get(instrument)
+                if value is None:
+                    continue
+                for key, measured in state.measure(value).items():
+                    if math.isnan(measured):
+                        continue
+                    for rule in state.ladders[key].crossed(measured):
+                        seq += 1
+                        fired.append(Alert(seq, now, rule, measured))
+            if fired:
+                self.log.extend([(alert.seq, alert.time, alert.rule.id, alert.value) for alert in fired])
+            self.last_fired = fired
+        return fired
+
+    # TickEngine listener
+    def on_tick(self, snapshot):
+        self.evaluate(snapshot_values(snapshot), snapshot.time)
+
+    # Value rules on `instrument` whose condition holds at `value`, most extreme first
+    def active(self, instrument, value):
+        with self._lock:
+            state = self._instruments.get(instrument)
+            ladder = state and state.ladders.get(('value', None))
+            return ladder.active(value) if ladder else []
+
+    # Logged alerts fired after sequence number `seq` (at most `limit`, newest kept) and the new seq
+    def since(self, seq, limit=None):
+        rows, count = self.log.since(seq, limit)
+        alerts = [Alert(int(row_seq), time, self._all_rules.get(int(rule_id)), value)
+                  for row_seq, time, rule_id, value in rows.tolist()]
+        return [alert for alert in alerts if alert.rule is not None], count
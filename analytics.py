@@ -0,0 +1,119 @@
+import numpy as np
+from marketdata import TRADING_SECONDS_PER_YEAR
+from optionchain import OI_RATE_WINDOWS, oi_rate_column
+
+# Incremental analytics fed one tick at a time. Every statistic is O(1) per update and
+# works elementwise on a scalar or on an array of instruments (all strikes at once).
+
+# Rolling mean and variance over the last `window` values, by Welford's method extended
+# to a sliding window: each update adds the new value and retires the oldest one.
+class RollingStats:
+    def __init__(self, window, shape=()):
+        if window < 2:
+            raise ValueError("window must be at least 2")
+        self.window = window
+        self._values = np.zeros((window,) + tuple(shape))
+        self._m2 = np.zeros(shape)
+        self.mean = np.zeros(shape)
+        self.count = 0
+
+    def __len__(self):
+        return min(self.count, self.window)
+
+    def push(self, value):
+        value = np.asarray(value, dtype=float)
+        i = self.count % self.window
+        if self.count < self.window:
+            delta = value - self.mean
+            self.mean = self.mean + delta / (self.count + 1)
+            self._m2 = self._m2 + delta * (value - self.mean)
+        else:
+            old = self._values[i].copy()
+            mean = self.mean + (value - old) / self.window
+            self._m2 = self._m2 + (value - old) * (value - mean + old - self.mean)
+            self.mean = mean
+        self._values[i] = value
+        self.count += 1
+
+    @property
+    def variance(self):
+        n = len(self)
+        if n < 2:
+            return np.full(np.shape(self.mean), np.nan)[()]
+        return np.maximum(self._m2, 0) / (n - 1)
+
+    @property
+    def std(self):
+        return np.sqrt(self.variance)
+
+    # z-score of `value` against the window so far (NaN until two values, or with no spread)
+    def zscore(self, value):
+        std = self.std
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(std > 0, (value - self.mean) / std, np.nan)[()]
+
+# Exponentially weighted moving average with the usual span convention (alpha = 2 / (span + 1))
+class EWMA:
+    def __init__(self, span):
+        self.alpha = 2 / (span + 1)
+        self.value = None
+
+    def push(self, value):
+        value = np.asarray(value, dtype=float)
+        self.value = value.copy() if self.value is None else self.value + self.alpha * (value - self.value)
+        return self.value
+
+# Per-strike straddle analytics: EWMA, rolling mean and standard deviation, and realized
+# volatility (annualised stddev of tick log returns, in % like VIX)
+class StraddleAnalytics:
+    COLUMNS = ('ewma', 'mean', 'std', 'rv')
+
+    def __init__(self, size, interval, window=60, span=20):
+        self.stats = RollingStats(window, (size,))
+        self.returns = RollingStats(window, (size,))
+        self.ewma = EWMA(span)
+        self.annualise = np.sqrt(TRADING_SECONDS_PER_YEAR / interval) * 100
+        self._last = None
+
+    # Feed one tick of straddle prices; returns {column: array aligned to the strikes}
+    def update(self, straddle):
+        straddle = np.asarray(straddle, dtype=float)
+        self.stats.push(straddle)
+        if self._last is not None:
+            with np.errstate(divide='ignore', invalid='ignore'):
+                returns = np.log(straddle / self._last)
+            # A zero price has no log return; count it as flat rather than poison the window
+            self.returns.push(np.where(np.isfinite(returns), returns, 0.0))
+        self._last = straddle
+        return {
+            'ewma': self.ewma.push(straddle),
+            'mean': self.stats.mean,
+            'std': self.stats.std,
+            'rv': self.returns.std * self.annualise
+        }
+
+# Open interest change per minute over several windows at once, for call and put OI of
+# every chain strike. Keeps just enough past ticks for the longest window; until a
+# window has filled, the rate is taken over the ticks seen so far.
+class OIMomentum:
+    def __init__(self, size, interval, windows=OI_RATE_WINDOWS):
+        self.interval = interval
+        self.windows = windows
+        self.lags = [max(1, round(window / interval)) for window in windows]
+        self._past = np.zeros((max(self.lags) + 1, 2, size))
+        self.count = 0
+
+    # Feed one tick of OI arrays; returns {column: OI change per minute} for optionchain
+    def update(self, call_oi, put_oi):
+        depth = len(self._past)
+        self._past[self.count % depth] = (call_oi, put_oi)
+        self.count += 1
+        now = self._past[(self.count - 1) % depth]
+        rates = {}
+        for window, lag in zip(self.windows, self.lags):
+            lag = min(lag, self.count - 1)
+            change = now - self._past[(self.count - 1 - lag) % depth] if lag else np.zeros_like(now)
+            per_minute = (change / (max(lag, 1) * self.interval / 60)).round(1)
+            rates[oi_rate_column('Call', window)] = per_minute[0]
+            rates[oi_rate_column('Put', window)] = per_minute[1]
+        return rates
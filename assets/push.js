@@ -0,0 +1,99 @@
+// Server-push transport for the dashboards (DASHBOARD_TRANSPORT=push).
+// Ticks streamed over Server-Sent Events are applied straight to the Dash components
+// with set_props, so the browser never polls. Inert unless the layout has #push-stream.
+(function () {
+    var state = {strikes: [], window: null, mode: 'hold', source: null, tables: {}, tableVersions: {}, alerts: [],
+                 redrawEvery: 0, redrawnAt: 0};
+    var ALERT_FEED_SIZE = 10;
+
+    function setProps(id, props) {
+        if (document.getElementById(id)) {
+            window.dash_clientside.set_props(id, props);
+        }
+    }
+
+    function apply(tick) {
+        if (tick.vix !== undefined) {
+            setProps('india-vix-value', {children: 'India VIX: ' + tick.vix});
+        }
+        if (tick.stocks) {
+            setProps('live-stock-table', {data: tick.stocks});
+        }
+        if (tick.option_chain) {
+            setProps('option-chain-table', {data: tick.option_chain});
+        }
+        // Tables paged on the server are not pushed. Setting a table's version store has
+        // the server send the page it is showing, so only do it while the table is shown
+        // and only when its version moved
+        Object.keys(state.tables).forEach(function (name) {
+            var section = document.getElementById(state.tables[name][0]);
+            var version = tick.tables && tick.tables[name];
+            if (version === undefined || version === state.tableVersions[name] ||
+                    !section || section.style.display === 'none') {
+                return;
+            }
+            state.tableVersions[name] = version;
+            window.dash_clientside.set_props(state.tables[name][1], {data: version});
+        });
+        if (tick.alerts && tick.alerts.length) {
+            state.alerts = tick.alerts.slice().reverse().concat(state.alerts).slice(0, ALERT_FEED_SIZE);
+            setProps('alert-feed', {children: state.alerts.join('\n')});
+        }
+        // point = [time, [one value per chart trace], alert]
+        var points = state.strikes.map(function (strike) { return tick.straddles && tick.straddles[strike]; });
+        if (!points.length || !points.every(Boolean)) {
+            return;
+        }
+        var alert = points.map(function (point) { return point[2]; }).filter(Boolean)[0] || '';
+        setProps('alert-message', {children: alert});
+        if (state.mode === 'redraw') {
+            // A downsampled chart cannot be appended to; have the server redraw it now and then
+            var section = document.getElementById('straddle-section');
+            var now = Date.now();
+            if (section && section.style.display !== 'none' && now - state.redrawnAt >= state.redrawEvery) {
+                state.redrawnAt = now;
+                window.dash_clientside.set_props('straddle-redraw', {data: tick.time});
+            }
+        } else if (state.mode === 'extend') {
+            var x, y;
+            if (points.length === 1) {
+                // One strike: its price and analytics traces
+                x = points[0][1].map(function () { return [points[0][0]]; });
+                y = points[0][1].map(function (value) { return [value]; });
+            } else {
+                // Overlay: one straddle price trace per strike
+                x = points.map(function (point) { return [point[0]]; });
+                y = points.map(function (point) { return [point[1][0]]; });
+            }
+            var traces = x.map(function (value, i) { return i; });
+            // Every trace in one update, keeping the chart window's last points
+            setProps('live-straddle-chart', {extendData: [{x: x, y: y}, traces, state.window]});
+        }
+        // Otherwise ('hold') the chart is zoomed: leave it as the user zoomed it
+    }
+
+    function connect() {
+        var el = document.getElementById('push-stream');
+        if (state.source || !el || !window.EventSource) {
+            return;
+        }
+        state.tables = el.dataset.tables ? JSON.parse(el.dataset.tables) : {};
+        state.redrawEvery = Number(el.dataset.redraw) || 0;
+        state.source = new EventSource(el.dataset.stream);
+        state.source.onmessage = function (e) {
+            apply(JSON.parse(e.data));
+        };
+    }
+
+    window.dashboardPush = {
+        // Called from a clientside callback whenever the strike or window dropdown or the
+        // chart's cursor changes; `strikes` is one strike or a list of them, in trace order,
+        // and `mode` is how the chart drawn for them is kept up to date
+        setView: function (strikes, chartWindow, mode) {
+            state.strikes = [].concat(strikes || []);
+            state.window = chartWindow;
+            state.mode = mode || 'hold';
+            connect();
+        }
+    };
+})();
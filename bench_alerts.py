@@ -0,0 +1,34 @@
+import argparse
+import time
+import numpy as np
+from alerts import AlertEngine, KINDS
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time alert evaluation per tick against the number of rules")
+    parser.add_argument('--rules', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--instruments', type=int, default=500)
+    parser.add_argument('--ticks', type=int, default=200)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    names = [f'stock:STOCK{i}' for i in range(args.instruments)]
+    for n in args.rules:
+        alerts = AlertEngine()
+        instruments = rng.integers(0, args.instruments, n)
+        kinds = rng.choice(KINDS, n, p=[0.6, 0.2, 0.2])
+        for i, kind in zip(instruments.tolist(), kinds):
+            threshold = {'value': rng.uniform(900, 1100), 'pct': rng.uniform(-10, 10), 'zscore': rng.uniform(-3, 3)}[kind]
+            alerts.add_rule(names[i], threshold, rng.choice(['above', 'below']), kind, window=20)
+
+        # Prices random-walking around 1000, so rules keep firing
+        prices = np.full(args.instruments, 1000.0)
+        ticks = []
+        for _ in range(args.ticks):
+            prices *= np.exp(rng.normal(0, 0.002, args.instruments))
+            ticks.append(dict(zip(names, prices.tolist())))
+        start = time.perf_counter()
+        for t, values in enumerate(ticks):
+            alerts.evaluate(values, t)
+        elapsed = (time.perf_counter() - start) / args.ticks
+        print(f"{n:7,} rules on {args.instruments} instruments: {elapsed * 1000:6.2f} ms/tick  "
+              f"{alerts.seq / args.ticks:8.1f} alerts/tick")
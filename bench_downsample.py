@@ -0,0 +1,71 @@
+import argparse
+import time
+import numpy as np
+from downsample import OHLCTiers, SESSION_SECONDS, lttb_indices, minmax_indices
+from ringbuffer import RingBuffer
+from tickengine import HISTORY_COLUMNS
+
+# Times selecting and rendering a full trading day of one strike's straddle (22,500
+# ticks at 1 s) down to 1000 points. On a single-CPU container: LTTB selection ~2 ms,
+# full LTTB render ~20 ms (figure building and JSON serialisation are most of it), the
+# OHLC tier render ~9 ms. Slower machines scale these up; the render path's budget is 100 ms.
+
+# Time of `fn()` in ms, best of `repeat`
+def best_ms(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - started)
+    return min(times) * 1000
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time drawing a full trading day of one strike's straddle")
+    parser.add_argument('--interval', type=float, default=1.0, help="seconds between ticks")
+    parser.add_argument('--max-points', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    # Imported late: importing str builds the whole app
+    from str import build_straddle_figure, build_bars_figure
+
+    ticks = int(SESSION_SECONDS / args.interval)
+    rng = np.random.default_rng(0)
+    start = 1_700_000_000.0
+    times = start + np.arange(ticks) * args.interval
+    straddle = 300 * np.exp(np.cumsum(rng.normal(0, 0.001, ticks)))
+    history = RingBuffer(ticks, HISTORY_COLUMNS)
+    rows = np.zeros((ticks, len(HISTORY_COLUMNS)))
+    rows[:, 0] = times
+    rows[:, HISTORY_COLUMNS.index('straddle')] = straddle
+    for row in rows:
+        history.append(row)
+
+    tiers = OHLCTiers()
+    started = time.perf_counter()
+    for now, value in zip(times.tolist(), straddle.tolist()):
+        tiers.update(now, value)
+    per_tick = (time.perf_counter() - started) / ticks * 1e6
+    print(f"{ticks:,} ticks; tier update {per_tick:.1f} us/tick")
+
+    data = history.window()
+    x = data[:, 0]
+    y = data[:, HISTORY_COLUMNS.index('straddle')]
+    print(f"lttb    {ticks:,} -> {args.max_points}: {best_ms(lambda: lttb_indices(x, y, args.max_points), args.repeat):6.2f} ms")
+    print(f"min-max {ticks:,} -> {args.max_points}: {best_ms(lambda: minmax_indices(y, args.max_points), args.repeat):6.2f} ms")
+
+    # Full render as the chart callback does it: select the points, build the figure, serialise
+    def render_raw():
+        picked = data[lttb_indices(x, y, args.max_points)]
+        return build_straddle_figure(23000, picked).to_json()
+
+    def render_bars():
+        seconds, bars = tiers.select(None, None, args.max_points)
+        return build_bars_figure(23000, bars, seconds).to_json()
+
+    def render_all():
+        return build_straddle_figure(23000, data).to_json()
+
+    print(f"full day, lttb:        {best_ms(render_raw, args.repeat):7.2f} ms")
+    print(f"full day, OHLC tiers:  {best_ms(render_bars, args.repeat):7.2f} ms")
+    print(f"full day, every point: {best_ms(render_all, args.repeat):7.2f} ms")
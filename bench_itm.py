@@ -0,0 +1,60 @@
+import argparse
+import time
+import numpy as np
+from itm import calculate_itm_probability, calculate_itm_probability_grid
+
+# Scalar reference path: one calculate_itm_probability call per cell, as generate_itm_data used to do
+def scalar_surface(S, strike_prices, T, r, sigma):
+    call_prob = np.empty((len(strike_prices), len(T)))
+    put_prob = np.empty((len(strike_prices), len(T)))
+    for i, K in enumerate(strike_prices):
+        for j, t in enumerate(T):
+            call_prob[i, j] = calculate_itm_probability(S, K, t, r, sigma, 'call')
+            put_prob[i, j] = calculate_itm_probability(S, K, t, r, sigma, 'put')
+    return call_prob, put_prob
+
+# Function to time a surface builder, best of `repeat` runs
+def time_it(fn, repeat, *args):
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the vectorized ITM surface against the scalar path")
+    parser.add_argument('--spot', type=float, default=23100)
+    parser.add_argument('--strike-low', type=int, default=20000)
+    parser.add_argument('--strike-high', type=int, default=26000)
+    parser.add_argument('--strike-step', type=int, default=50)
+    parser.add_argument('--days', type=int, default=30)
+    parser.add_argument('--steps-per-day', type=int, default=375, help="375 = one point per NSE trading minute")
+    parser.add_argument('--scalar-cells', type=int, default=200000,
+                        help="cap on cells timed through the scalar path; its cost is extrapolated beyond that")
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    r, sigma = 0.03, 0.2
+    strike_prices = np.arange(args.strike_low, args.strike_high + 1, args.strike_step)
+    T = (args.days - np.arange(args.days * args.steps_per_day + 1) / args.steps_per_day) / 365
+    cells = len(strike_prices) * len(T)
+
+    grid_time, (grid_call, grid_put) = time_it(calculate_itm_probability_grid, args.repeat,
+                                               args.spot, strike_prices, T, r, sigma)
+
+    # The scalar path is far too slow for the full surface, so time a prefix of strikes and scale up
+    n_strikes = max(1, min(len(strike_prices), args.scalar_cells // len(T)))
+    scalar_time, (scalar_call, scalar_put) = time_it(scalar_surface, 1,
+                                                     args.spot, strike_prices[:n_strikes], T, r, sigma)
+    scalar_time *= len(strike_prices) / n_strikes
+
+    max_err = max(np.abs(grid_call[:n_strikes] - scalar_call).max(),
+                  np.abs(grid_put[:n_strikes] - scalar_put).max())
+
+    print(f"surface: {len(strike_prices)} strikes x {len(T)} expiries = {cells:,} cells")
+    print(f"scalar : {scalar_time:9.3f} s  ({cells / scalar_time:,.0f} cells/s)"
+          + ("" if n_strikes == len(strike_prices) else f"  [extrapolated from {n_strikes} strikes]"))
+    print(f"grid   : {grid_time:9.3f} s  ({cells / grid_time:,.0f} cells/s)")
+    print(f"speedup: {scalar_time / grid_time:9.1f}x   max abs diff: {max_err:.2e}")
@@ -0,0 +1,253 @@
+import argparse
+import http.client
+import json
+import multiprocessing
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+import numpy as np
+from bench_serve import callback_request, free_port, wait_until_up
+
+# Load test for the Dash apps: hundreds of simulated browsers against serve.py.
+#
+#     python bench_load.py str itm --clients 200 --workers 2 --save
+#
+# Every client loads the layout, then on each interval tick fires the callbacks the page's
+# dcc.Interval triggers, carrying its own cursors and dropdown values from one response to
+# the next the way a browser does. Now and then it switches strikes, and where the app
+# serves /itm-probability it also requests ITM tables. Results are compared against, or
+# saved as, the baseline for the same app, worker and client count in --baseline.
+
+INTERVAL_INPUT = 'interval-component.n_intervals'
+STRIKE_INPUT = 'strike-price-dropdown.value'
+
+# Function to collect the initial {'id.property': value} of every component with an id in a layout
+def layout_values(node, values=None):
+    values = {} if values is None else values
+    if isinstance(node, list):
+        for child in node:
+            layout_values(child, values)
+    elif isinstance(node, dict) and 'props' in node:
+        props = node['props']
+        if 'id' in props:
+            values.update({f"{props['id']}.{name}": value for name, value in props.items() if name != 'children'})
+        layout_values(props.get('children'), values)
+    return values
+
+# Function to name a callback in the report by its first output
+def callback_label(dependency):
+    return dependency['output'].strip('.').split('...')[0]
+
+# One simulated browser session; `samples` collects (label, seconds, ok) per request
+class SimulatedClient:
+    def __init__(self, port, dependencies, interval, switch_probability, itm_probability, rng):
+        self.connection = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+        self.dependencies = dependencies
+        self.interval = interval
+        self.switch_probability = switch_probability
+        self.itm_probability = itm_probability
+        self.rng = rng
+        self.values = {}
+        self.samples = []
+
+    def request(self, label, method, path, body=None):
+        headers = {'Content-Type': 'application/json'} if body else {}
+        started = time.perf_counter()
+        try:
+            self.connection.request(method, path, body, headers)
+            response = self.connection.getresponse()
+            data = response.read()
+            ok = response.status in (200, 204)
+        except (OSError, http.client.HTTPException):
+            self.connection.close()
+            data, ok = b'', False
+        self.samples.append((label, time.perf_counter() - started, ok))
+        return data if ok else None
+
+    # Fire every callback with one of `changed` among its inputs and keep what it returned
+    def fire(self, changed):
+        for dependency in self.dependencies:
+            inputs = {f"{i['id']}.{i['property']}" for i in dependency['inputs']}
+            if dependency.get('clientside_function') or inputs.isdisjoint(changed):
+                continue
+            data = self.request(callback_label(dependency), 'POST', '/_dash-update-component',
+                                callback_request(dependency, self.values, changed))
+            if data:
+                for component, props in json.loads(data).get('response', {}).items():
+                    self.values.update({f'{component}.{name}': value for name, value in props.items()})
+
+    def run(self, deadline):
+        layout = self.request('/_dash-layout', 'GET', '/_dash-layout')
+        if layout is None:
+            return self.samples
+        self.values = layout_values(json.loads(layout))
+        strikes = [option['value'] for option in self.values.get('strike-price-dropdown.options', [])]
+        self.fire([STRIKE_INPUT])
+        # Browsers opened at different times poll out of phase
+        next_tick = time.time() + self.rng.uniform(0, self.interval)
+        while True:
+            time.sleep(max(0.0, next_tick - time.time()))
+            if time.time() >= deadline:
+                return self.samples
+            self.values[INTERVAL_INPUT] = self.values.get(INTERVAL_INPUT, 0) + 1
+            self.fire([INTERVAL_INPUT])
+            if strikes and self.rng.random() < self.switch_probability:
+                self.values[STRIKE_INPUT] = self.rng.sample(strikes, self.rng.choice([1, 1, 1, 2, 5]))
+                self.fire([STRIKE_INPUT])
+            if self.rng.random() < self.itm_probability:
+                spot = self.rng.randrange(23000, 23200, 5)
+                vol = self.rng.choice([0.15, 0.2, 0.25])
+                self.request('/itm-probability', 'GET', f'/itm-probability?spot={spot}&vol={vol}')
+            next_tick += self.interval
+
+# Client process: run `clients` simulated browsers on threads until `deadline`
+def run_clients(port, dependencies, clients, interval, switch_probability, itm_probability, seed, deadline):
+    sessions = [SimulatedClient(port, dependencies, interval, switch_probability, itm_probability,
+                                random.Random(seed * 100003 + i)) for i in range(clients)]
+    threads = [threading.Thread(target=session.run, args=(deadline,)) for session in sessions]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return [sample for session in sessions for sample in session.samples]
+
+# Function to read a process's memory in bytes: PSS where the kernel reports it, so pages
+# shared between workers (the shared tick store) are not counted once per worker, else RSS
+def process_memory(pid):
+    try:
+        with open(f'/proc/{pid}/smaps_rollup') as f:
+            for line in f:
+                if line.startswith('Pss:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    try:
+        with open(f'/proc/{pid}/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return 0
+
+# Function to list a process and all its descendants
+def process_tree(pid):
+    pids = [pid]
+    for parent in pids:
+        try:
+            with open(f'/proc/{parent}/task/{parent}/children') as f:
+                pids.extend(int(child) for child in f.read().split())
+        except OSError:
+            pass
+    return pids
+
+# Function to summarise latencies in ms
+def latency_summary(seconds):
+    seconds = np.asarray(seconds) * 1000
+    p50, p99 = np.percentile(seconds, [50, 99]) if len(seconds) else (np.nan, np.nan)
+    return {'count': len(seconds), 'p50_ms': round(float(p50), 2), 'p99_ms': round(float(p99), 2)}
+
+# Start serve.py for `app`, load it for `duration` seconds and return the results
+def run(app, workers, clients, processes, interval, duration, switch_probability, itm_probability):
+    port = free_port()
+    server = subprocess.Popen([sys.executable, 'serve.py', app, '--workers', str(workers),
+                               '--port', str(port), '--host', '127.0.0.1'],
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    memory = []
+    stop = threading.Event()
+    try:
+        dependencies = wait_until_up(port)
+        connection = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+        # Dash answers any unknown path with its index page, so look for the table itself
+        connection.request('GET', '/itm-probability')
+        has_itm = b'ITM Probability' in connection.getresponse().read()
+        connection.close()
+
+        def sample_memory():
+            while not stop.wait(0.5):
+                memory.append(sum(process_memory(pid) for pid in process_tree(server.pid)))
+        sampler = threading.Thread(target=sample_memory, daemon=True)
+        sampler.start()
+
+        deadline = time.time() + duration
+        shares = [clients // processes + (i < clients % processes) for i in range(processes)]
+        with multiprocessing.Pool(processes) as pool:
+            results = pool.starmap(run_clients, [
+                (port, dependencies, share, interval, switch_probability,
+                 itm_probability if has_itm else 0.0, seed, deadline)
+                for seed, share in enumerate(shares) if share
+            ])
+    finally:
+        stop.set()
+        server.terminate()
+        server.wait()
+
+    samples = [sample for result in results for sample in result]
+    by_label = {}
+    for label, seconds, ok in samples:
+        if ok:
+            by_label.setdefault(label, []).append(seconds)
+    # Callbacks are labelled by output, routes by path
+    callbacks = [seconds for label, seconds, ok in samples if ok and not label.startswith('/')]
+    return {
+        'app': app, 'workers': workers, 'clients': clients, 'interval': interval, 'duration': duration,
+        'cpus': os.cpu_count(),
+        'throughput': round(len(samples) / duration, 1),
+        'errors': sum(not ok for _, _, ok in samples),
+        'callbacks': latency_summary(callbacks),
+        'requests': {label: latency_summary(seconds) for label, seconds in sorted(by_label.items())},
+        'memory_peak_mb': round(max(memory, default=0) / 2**20, 1),
+        'memory_end_mb': round(memory[-1] / 2**20, 1) if memory else 0.0
+    }
+
+def report(result, baseline):
+    print(f"\n{result['app']}: {result['workers']} workers, {result['clients']} clients polling every "
+          f"{result['interval']} s for {result['duration']} s ({result['cpus']} CPUs)")
+    print(f"  {'request':40} {'count':>8} {'p50 ms':>9} {'p99 ms':>9}")
+    rows = list(result['requests'].items()) + [('all callbacks', result['callbacks'])]
+    for label, summary in rows:
+        print(f"  {label:40} {summary['count']:8,} {summary['p50_ms']:9.2f} {summary['p99_ms']:9.2f}")
+    print(f"  throughput {result['throughput']:,.1f} req/s  errors {result['errors']}  "
+          f"server memory peak {result['memory_peak_mb']:,.1f} MB, end {result['memory_end_mb']:,.1f} MB")
+    if baseline:
+        changes = [
+            ('throughput', result['throughput'], baseline['throughput']),
+            ('callback p50', result['callbacks']['p50_ms'], baseline['callbacks']['p50_ms']),
+            ('callback p99', result['callbacks']['p99_ms'], baseline['callbacks']['p99_ms']),
+            ('memory peak', result['memory_peak_mb'], baseline['memory_peak_mb'])
+        ]
+        print('  vs baseline: ' + ', '.join(f"{name} {(new / old - 1) * 100:+.1f}%" if old else f"{name} n/a"
+                                           for name, new, old in changes))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load-test the dashboards with many simulated browsers")
+    parser.add_argument('apps', nargs='*', default=['str', 'itm'])
+    parser.add_argument('--clients', type=int, default=200)
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--processes', type=int, default=4, help="client processes the browsers are spread over")
+    parser.add_argument('--interval', type=float, default=5.0, help="seconds between polls (the app's dcc.Interval)")
+    parser.add_argument('--duration', type=float, default=60.0)
+    parser.add_argument('--switch-probability', type=float, default=0.05, help="chance per poll of changing strikes")
+    parser.add_argument('--itm-probability', type=float, default=0.1, help="chance per poll of an ITM table request")
+    parser.add_argument('--baseline', default='bench_load_baseline.json')
+    parser.add_argument('--save', action='store_true', help="save these results as the baseline")
+    args = parser.parse_args()
+
+    baselines = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baselines = json.load(f)
+    for app in args.apps:
+        result = run(app, args.workers, args.clients, args.processes, args.interval, args.duration,
+                     args.switch_probability, args.itm_probability)
+        key = f"{app}-w{args.workers}-c{args.clients}"
+        report(result, None if args.save else baselines.get(key))
+        if args.save:
+            baselines[key] = result
+    if args.save:
+        with open(args.baseline, 'w') as f:
+            json.dump(baselines, f, indent=2, sort_keys=True)
+        print(f"\nbaseline saved to {args.baseline}")
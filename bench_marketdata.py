@@ -0,0 +1,36 @@
+import argparse
+import time
+from marketdata import make_source
+from tickengine import TickEngine
+
+# Function to time `ticks` calls of fn, returning the sustainable tick rate
+def ticks_per_second(fn, ticks):
+    start = time.perf_counter()
+    for _ in range(ticks):
+        fn()
+    return ticks / (time.perf_counter() - start)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load-test a market data source without a network")
+    parser.add_argument('--source', default='synthetic')
+    parser.add_argument('--stocks', type=int, nargs='+', default=[10, 500, 5000])
+    parser.add_argument('--strikes', type=int, default=41, help="straddle strikes (history kept per strike)")
+    parser.add_argument('--chain', type=int, default=200, help="option chain strikes")
+    parser.add_argument('--ticks', type=int, default=200)
+    args = parser.parse_args()
+
+    strikes = [22000 + 50 * i for i in range(args.strikes)]
+    option_strike_prices = [21000 + 50 * i for i in range(args.chain)]
+    for n in args.stocks:
+        stock_names = [f'STOCK{i}' for i in range(n)]
+        source = make_source(stock_names, strikes, option_strike_prices, name=args.source)
+        source_rate = ticks_per_second(lambda: source.tick(time.time()), args.ticks)
+
+        # Full engine tick: source + per-strike history + option chain store + snapshot
+        engine = TickEngine(make_source(stock_names, strikes, option_strike_prices, name=args.source),
+                            interval=0.1, depth=args.ticks + 1)
+        engine_rate = ticks_per_second(engine.tick, args.ticks)
+
+        instruments = n + args.strikes * 2 + args.chain * 4
+        print(f"{args.source}: {instruments:6,} instruments ({n:,} stocks)  "
+              f"source {source_rate:9,.0f} ticks/s  engine {engine_rate:8,.0f} ticks/s")
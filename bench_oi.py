@@ -0,0 +1,64 @@
+import argparse
+import datetime
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import numpy as np
+from oi import LiveOIPlot, generate_open_interest_data
+
+# Reference path: the previous oi.update, generalised to any number of strikes
+class LegacyOIPlot:
+    def __init__(self, strikes, window):
+        self.strikes = strikes
+        self.window = window
+        self.data = {strike: [] for strike in strikes}
+        self.time_series = []
+        self.fig, self.ax = plt.subplots(figsize=(12, 6))
+
+    def update(self):
+        self.time_series.append(datetime.datetime.now())
+        for strike in self.strikes:
+            self.data[strike].append(generate_open_interest_data())
+        if len(self.time_series) > self.window:
+            self.time_series.pop(0)
+            for strike in self.strikes:
+                self.data[strike].pop(0)
+
+        self.ax.clear()
+        for strike in self.strikes:
+            self.ax.plot(self.time_series, self.data[strike], label=f'Strike Price {strike}', marker='o')
+        self.ax.set_title('Real-Time Open Interest')
+        self.ax.set_xlabel('Time')
+        self.ax.set_ylabel('Open Interest')
+        self.ax.legend()
+        self.ax.grid(True)
+        plt.setp(self.ax.get_xticklabels(), rotation=45, ha='right')
+        self.fig.canvas.draw()
+
+# Function to time `frames` updates after the history has filled up; returns per-frame ms
+def time_frames(plot, frames, warmup):
+    import time
+    for _ in range(warmup):
+        plot.update()
+    times = []
+    for _ in range(frames):
+        start = time.perf_counter()
+        plot.update()
+        times.append(time.perf_counter() - start)
+    plt.close(plot.fig)
+    return np.array(times) * 1000
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Per-frame cost of the blitted OI plot vs the clear-and-replot path")
+    parser.add_argument('--strikes', type=int, default=12)
+    parser.add_argument('--window', type=int, nargs='+', default=[50, 500])
+    parser.add_argument('--frames', type=int, default=50)
+    args = parser.parse_args()
+
+    strikes = [23000 + 50 * i for i in range(args.strikes)]
+    for window in args.window:
+        legacy = time_frames(LegacyOIPlot(strikes, window), args.frames, window)
+        blitted = time_frames(LiveOIPlot(strikes, window=window, interval=1.0), args.frames, window)
+        print(f"{args.strikes} strikes, {window} points: legacy {legacy.mean():7.2f} ms/frame "
+              f"(p95 {np.percentile(legacy, 95):7.2f})  blitted {blitted.mean():6.2f} ms/frame "
+              f"(p95 {np.percentile(blitted, 95):6.2f})  -> max {1000 / np.percentile(blitted, 95):.0f} FPS")
@@ -0,0 +1,37 @@
+import argparse
+import time
+import numpy as np
+from pricing import price_chain, implied_vol
+
+# Function to time `repeat` calls of fn, returning the mean seconds per call
+def seconds_per_call(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time chain pricing and implied vol on one core")
+    parser.add_argument('--strikes', type=int, nargs='+', default=[50, 200, 1000])
+    parser.add_argument('--expiries', type=int, default=4, help="weekly expiries per strike")
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    S, r = 23100.0, 0.03
+    rng = np.random.default_rng(0)
+    T = (np.arange(1, args.expiries + 1) * 7 / 365)[np.newaxis, :]
+    for n in args.strikes:
+        K = np.linspace(0.9 * S, 1.1 * S, n)[:, np.newaxis]
+        sigma = rng.uniform(0.10, 0.30, (n, args.expiries))
+        prices = price_chain(S, K, T, r, sigma)
+        # Quote OTM options, the side a real chain's IV is read from
+        option_type = np.where(K >= S, 'call', 'put')
+        quotes = np.where(K >= S, prices['call'], prices['put'])
+
+        pricing = seconds_per_call(lambda: price_chain(S, K, T, r, sigma), args.repeat)
+        solving = seconds_per_call(lambda: implied_vol(quotes, S, K, T, r, option_type), args.repeat)
+        iv = implied_vol(quotes, S, K, T, r, option_type)
+        # Far OTM quotes barely move with vol, so IV is only recoverable where vega is usable
+        error = np.nanmax(np.abs(iv - sigma)[prices['vega'] > 1e-2])
+        print(f"{n:5,} strikes x {args.expiries} expiries: price+greeks {pricing * 1000:7.2f} ms  "
+              f"implied vol {solving * 1000:7.2f} ms  max IV error {error:.1e}")
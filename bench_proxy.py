@@ -0,0 +1,71 @@
+import argparse
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import numpy as np
+
+# Page served by the stub upstream, carrying the divs the proxy hides
+STUB_PAGE = b"""<html><body>
+<div class="clearfix logo_wrapper">logo</div>
+<div class="bottom_nav">nav</div>
+<div class="header_desktop">header</div>
+<div class="innerPageStrip forMobNone">strip</div>
+<table>""" + b"".join(b"<tr><td>row %d</td><td>earnings</td></tr>" % i for i in range(2000)) + b"""</table>
+</body></html>"""
+
+# Local stand-in for the upstream site that counts hits and adds a fixed delay
+class StubHandler(BaseHTTPRequestHandler):
+    hits = 0
+    delay = 0.2
+
+    def do_GET(self):
+        StubHandler.hits += 1
+        time.sleep(StubHandler.delay)
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html')
+        self.send_header('Content-Length', str(len(STUB_PAGE)))
+        self.end_headers()
+        self.wfile.write(STUB_PAGE)
+
+    def log_message(self, *args):
+        pass
+
+# Function to load /proxy from `viewers` concurrent clients and report latency and upstream hits
+def burst(app, label, viewers):
+    def view(_):
+        start = time.perf_counter()
+        response = app.test_client().get('/proxy')
+        assert response.status_code == 200 and b'display:none' in response.data
+        return time.perf_counter() - start
+
+    hits_before = StubHandler.hits
+    with ThreadPoolExecutor(max_workers=viewers) as pool:
+        latencies = np.array(list(pool.map(view, range(viewers)))) * 1000
+    time.sleep(StubHandler.delay * 2)  # let any background revalidation land before counting
+    print(f"{label:<22} viewers {viewers:4d}  upstream hits {StubHandler.hits - hits_before:2d}  "
+          f"p50 {np.percentile(latencies, 50):8.2f} ms  max {latencies.max():8.2f} ms")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Exercise the /proxy cache against a local stub upstream")
+    parser.add_argument('--viewers', type=int, default=200)
+    parser.add_argument('--delay', type=float, default=0.2, help="stub upstream response time in seconds")
+    parser.add_argument('--ttl', type=float, default=1.0)
+    args = parser.parse_args()
+
+    StubHandler.delay = args.delay
+    stub = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+    threading.Thread(target=stub.serve_forever, daemon=True).start()
+
+    # showweb reads its configuration at import time
+    os.environ['PROXY_TARGET_URL'] = f'http://127.0.0.1:{stub.server_address[1]}/earnings-calendar'
+    os.environ['PROXY_CACHE_TTL'] = str(args.ttl)
+    import showweb
+
+    burst(showweb.app, "cold (coalesced)", args.viewers)
+    burst(showweb.app, "warm (fresh cache)", args.viewers)
+    time.sleep(args.ttl + 0.1)
+    burst(showweb.app, "stale (revalidating)", args.viewers)
+    burst(showweb.app, "warm (revalidated)", args.viewers)
+    stub.shutdown()
@@ -0,0 +1,95 @@
+import argparse
+import http.client
+import json
+import threading
+import time
+from urllib.parse import urlparse
+import numpy as np
+from pubsub import Broadcaster, sse_message
+
+# Function to summarise latencies in milliseconds
+def report(label, latencies, expected):
+    latencies = np.asarray(latencies) * 1000
+    if not len(latencies):
+        print(f"{label}: no messages received")
+        return
+    p50, p99 = np.percentile(latencies, [50, 99])
+    print(f"{label}: {len(latencies):,}/{expected:,} delivered  "
+          f"p50 {p50:.2f} ms  p99 {p99:.2f} ms  max {latencies.max():.2f} ms")
+
+# In-process fan-out: subscriber threads read straight from a Broadcaster
+def run_local(subscribers, messages, rate):
+    broadcaster = Broadcaster(queue_size=messages)
+    latencies = []
+    lock = threading.Lock()
+    ready = threading.Barrier(subscribers + 1)
+
+    def subscriber():
+        subscription = broadcaster.subscribe()
+        ready.wait()
+        received = []
+        for _ in range(messages):
+            message = subscription.get(timeout=5)
+            if message is None:
+                break
+            sent = json.loads(message.split('data: ', 1)[1])['sent']
+            received.append(time.perf_counter() - sent)
+        with lock:
+            latencies.extend(received)
+
+    threads = [threading.Thread(target=subscriber, daemon=True) for _ in range(subscribers)]
+    for thread in threads:
+        thread.start()
+    ready.wait()
+    for seq in range(messages):
+        broadcaster.publish(sse_message(seq, {'sent': time.perf_counter()}))
+        time.sleep(1 / rate)
+    for thread in threads:
+        thread.join()
+    report(f"local  x{subscribers}", latencies, subscribers * messages)
+
+# Over HTTP: subscribers hold open /stream connections on a running dashboard and
+# measure each tick's arrival against the tick time the engine stamped on it
+def run_http(url, subscribers, messages):
+    target = urlparse(url)
+    latencies = []
+    lock = threading.Lock()
+
+    def subscriber():
+        conn = http.client.HTTPConnection(target.hostname, target.port or 80, timeout=30)
+        conn.request('GET', target.path or '/stream')
+        response = conn.getresponse()
+        received = []
+        while len(received) < messages:
+            line = response.fp.readline()
+            if not line:
+                break
+            if line.startswith(b'data: '):
+                tick = json.loads(line[6:])
+                if 'time' in tick:
+                    received.append(time.time() - tick['time'])
+        conn.close()
+        with lock:
+            latencies.extend(received)
+
+    threads = [threading.Thread(target=subscriber, daemon=True) for _ in range(subscribers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    report(f"http   x{subscribers}", latencies, subscribers * messages)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure push fan-out latency to many concurrent subscribers")
+    parser.add_argument('--subscribers', type=int, nargs='+', default=[10, 100, 500])
+    parser.add_argument('--messages', type=int, default=50)
+    parser.add_argument('--rate', type=float, default=10, help="messages per second (local mode)")
+    parser.add_argument('--url', help="stream URL of a running dashboard started with DASHBOARD_TRANSPORT=push, "
+                                      "e.g. http://127.0.0.1:5000/stream")
+    args = parser.parse_args()
+
+    for n in args.subscribers:
+        if args.url:
+            run_http(args.url, n, args.messages)
+        else:
+            run_local(n, args.messages, args.rate)
@@ -0,0 +1,71 @@
+import argparse
+import time
+import tracemalloc
+from bs4 import BeautifulSoup
+from htmlrewrite import rewrite_stream
+from showweb import PAGE_CHROME_RULES
+
+# Classes hidden by the previous BeautifulSoup implementation of showweb.proxy
+HIDDEN_DIV_CLASSES = ['clearfix logo_wrapper', 'bottom_nav', 'header_desktop', 'innerPageStrip forMobNone']
+
+# Reference path: full-DOM parse, mutate, re-serialize
+def beautifulsoup_rewrite(content):
+    soup = BeautifulSoup(content, 'html.parser')
+    for class_name in HIDDEN_DIV_CLASSES:
+        target_div = soup.find('div', class_=class_name)
+        if target_div:
+            target_div['style'] = 'display:none;'
+    return str(soup)
+
+# Streaming path, fed in network-sized chunks
+def streaming_rewrite(content, chunk_size):
+    chunks = (content[i:i + chunk_size] for i in range(0, len(content), chunk_size))
+    return ''.join(rewrite_stream(chunks, PAGE_CHROME_RULES))
+
+# Function to build a page shaped like the earnings calendar when no saved fixture is given
+def synthetic_page(rows):
+    body = ''.join(f'<tr class="row"><td><a href="/stock/{i}">Company {i} &amp; Sons</a></td>'
+                   f'<td data-date="2026-10-{i % 28 + 1:02d}">Q2 results</td><td>{i * 1.5:.2f}</td></tr>'
+                   for i in range(rows))
+    return (f'<!DOCTYPE html><html><head><meta charset="utf-8"><title>Earnings</title>'
+            f'<script>var x = "<div>";</script></head><body>'
+            f'<div class="clearfix logo_wrapper"><img src="logo.png"></div>'
+            f'<div class="header_desktop"><ul><li>Markets</li></ul></div>'
+            f'<div class="innerPageStrip forMobNone">strip</div>'
+            f'<table>{body}</table><div class="bottom_nav">nav</div></body></html>').encode()
+
+# Function to time a rewrite and record its peak traced memory, best of `repeat` runs
+def measure(fn, repeat, *args):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(*args)
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    result = fn(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak, result
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the streaming rewriter against BeautifulSoup")
+    parser.add_argument('--fixture', help="saved page, e.g. curl -o earnings.html "
+                                          "https://www.moneycontrol.com/earnings-calendar")
+    parser.add_argument('--rows', type=int, default=5000, help="table rows in the synthetic page")
+    parser.add_argument('--chunk-size', type=int, default=16 * 1024)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    if args.fixture:
+        with open(args.fixture, 'rb') as f:
+            content = f.read()
+    else:
+        content = synthetic_page(args.rows)
+
+    bs_time, bs_peak, bs_out = measure(beautifulsoup_rewrite, args.repeat, content)
+    st_time, st_peak, st_out = measure(streaming_rewrite, args.repeat, content, args.chunk_size)
+
+    print(f"page: {len(content) / 1e6:.2f} MB ({args.fixture or 'synthetic'})")
+    print(f"beautifulsoup: {bs_time * 1000:8.1f} ms  peak {bs_peak / 1e6:7.2f} MB  hidden {bs_out.count('display:none')}")
+    print(f"streaming    : {st_time * 1000:8.1f} ms  peak {st_peak / 1e6:7.2f} MB  hidden {st_out.count('display:none')}")
+    print(f"speedup      : {bs_time / st_time:8.1f}x")
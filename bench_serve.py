@@ -0,0 +1,106 @@
+import argparse
+import http.client
+import json
+import multiprocessing
+import socket
+import subprocess
+import sys
+import time
+import numpy as np
+
+# Function to build the /_dash-update-component body for the callback writing `output`
+# (e.g. 'option-chain-table.data'), given input/state values keyed 'id.property'
+def callback_body(dependencies, output, values, changed):
+    return callback_request(next(d for d in dependencies if output in d['output']), values, changed)
+
+# Function to build the /_dash-update-component body for one /_dash-dependencies entry
+def callback_request(dependency, values, changed):
+    outputs = [
+        dict(zip(('id', 'property'), part.rsplit('.', 1)))
+        for part in dependency['output'].strip('.').split('...')
+    ]
+    refs = lambda items: [{'id': i['id'], 'property': i['property'],
+                           'value': values.get(f"{i['id']}.{i['property']}")} for i in items]
+    return json.dumps({
+        'output': dependency['output'],
+        'outputs': outputs if dependency['output'].startswith('..') else outputs[0],
+        'inputs': refs(dependency['inputs']),
+        'state': refs(dependency['state']),
+        'changedPropIds': changed
+    })
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+def wait_until_up(port, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            connection = http.client.HTTPConnection('127.0.0.1', port, timeout=2)
+            connection.request('GET', '/_dash-dependencies')
+            response = connection.getresponse()
+            if response.status == 200:
+                return json.loads(response.read())
+        except OSError:
+            pass
+        time.sleep(0.2)
+    raise TimeoutError(f"server on port {port} did not come up")
+
+# Client process: POST the body in a loop until `deadline`, returning per-request latencies
+def client(port, body, deadline):
+    latencies, errors = [], 0
+    headers = {'Content-Type': 'application/json'}
+    while time.time() < deadline:
+        started = time.perf_counter()
+        try:
+            connection = http.client.HTTPConnection('127.0.0.1', port, timeout=10)
+            connection.request('POST', '/_dash-update-component', body, headers)
+            response = connection.getresponse()
+            response.read()
+            connection.close()
+            if response.status != 200:
+                errors += 1
+                continue
+        except OSError:
+            errors += 1
+            continue
+        latencies.append(time.perf_counter() - started)
+    return latencies, errors
+
+# Start serve.py with `workers` workers, load it from `clients` processes for `duration` seconds
+def run(app, output, workers, clients, duration):
+    port = free_port()
+    server = subprocess.Popen([sys.executable, 'serve.py', app, '--workers', str(workers),
+                               '--port', str(port), '--host', '127.0.0.1'],
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        dependencies = wait_until_up(port)
+        body = callback_body(dependencies, output, {'interval-component.n_intervals': 1},
+                             ['interval-component.n_intervals'])
+        deadline = time.time() + duration
+        with multiprocessing.Pool(clients) as pool:
+            results = pool.starmap(client, [(port, body, deadline)] * clients)
+    finally:
+        server.terminate()
+        server.wait()
+
+    latencies = np.concatenate([np.asarray(r[0]) for r in results]) * 1000
+    errors = sum(r[1] for r in results)
+    p50, p99 = np.percentile(latencies, [50, 99]) if len(latencies) else (np.nan, np.nan)
+    print(f"{workers:2} workers: {len(latencies) / duration:8,.0f} req/s  "
+          f"p50 {p50:7.2f} ms  p99 {p99:7.2f} ms  errors {errors}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load-test serve.py and show throughput against worker count")
+    parser.add_argument('--app', default='str')
+    parser.add_argument('--output', default='option-chain-table.data', help="callback output to request")
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--clients', type=int, default=8, help="concurrent client processes")
+    parser.add_argument('--duration', type=float, default=10.0, help="seconds per run")
+    args = parser.parse_args()
+
+    print(f"{multiprocessing.cpu_count()} CPUs; {args.clients} clients requesting {args.output}")
+    for workers in args.workers:
+        run(args.app, args.output, workers, args.clients, args.duration)
@@ -0,0 +1,68 @@
+import argparse
+import http.client
+import statistics
+import subprocess
+import sys
+import time
+from bench_serve import free_port
+
+# Seconds to import `module` in a fresh interpreter
+def import_seconds(module):
+    code = f"import time; started = time.perf_counter(); import {module}; print(time.perf_counter() - started)"
+    return float(subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True).stdout)
+
+# Heaviest imports directly under `module`, as (cumulative seconds, name), from -X importtime
+def heaviest_imports(module, n):
+    stderr = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                            capture_output=True, text=True, check=True).stderr
+    imports = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line.split('|')
+        # The -X importtime tree indents each level by two spaces; keep the outermost level
+        # below the app, which holds everything the app imports first
+        if len(name) - len(name.lstrip()) <= 3:
+            name = name.strip()
+            if name != module:
+                imports[name] = imports.get(name, 0) + int(cumulative) / 1e6
+    return sorted(((seconds, name) for name, seconds in imports.items()), reverse=True)[:n]
+
+# Seconds from launching serve.py with one worker to its first successful response on `path`
+def first_response_seconds(app, path, timeout=60):
+    port = free_port()
+    started = time.perf_counter()
+    server = subprocess.Popen([sys.executable, 'serve.py', app, '--workers', '1', '--port', str(port),
+                               '--host', '127.0.0.1'], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        while time.perf_counter() - started < timeout:
+            try:
+                connection = http.client.HTTPConnection('127.0.0.1', port, timeout=5)
+                connection.request('GET', path)
+                response = connection.getresponse()
+                response.read()
+                if response.status == 200:
+                    return time.perf_counter() - started
+            except OSError:
+                pass
+            time.sleep(0.02)
+        raise TimeoutError(f"{app} did not answer {path} within {timeout} s")
+    finally:
+        server.terminate()
+        server.wait()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Track app import time and time to first response")
+    parser.add_argument('--apps', nargs='+', default=['str', 'itm'])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--top', type=int, default=5, help="heaviest imports listed per app")
+    args = parser.parse_args()
+
+    for app in args.apps:
+        imports = [import_seconds(app) for _ in range(args.runs)]
+        print(f"{app}: import {statistics.median(imports) * 1000:7.0f} ms (median of {args.runs})")
+        for seconds, name in heaviest_imports(app, args.top):
+            print(f"    {seconds * 1000:7.0f} ms  {name}")
+        for path in ('/', '/_dash-layout'):
+            runs = [first_response_seconds(app, path) for _ in range(args.runs)]
+            print(f"  first response {path:14} {statistics.median(runs) * 1000:7.0f} ms")
@@ -0,0 +1,69 @@
+import argparse
+import datetime
+import shutil
+import tempfile
+import time
+import numpy as np
+from downsample import SESSION_SECONDS, lttb_indices
+from marketdata import make_source
+from tickengine import TickEngine, HISTORY_COLUMNS
+from tickhistory import TickHistory, TickRecorder
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time a warm restart from a full day of tick history")
+    parser.add_argument('--strikes', type=int, default=50)
+    parser.add_argument('--interval', type=float, default=1.0, help="seconds between recorded ticks")
+    parser.add_argument('--warm-minutes', type=float, default=60)
+    parser.add_argument('--root', help="history directory (default: a temporary one)")
+    args = parser.parse_args()
+
+    # Imported late: importing str builds the whole app
+    from str import build_straddle_figure, CHART_MAX_POINTS
+
+    root = args.root or tempfile.mkdtemp(prefix='tickhistory-')
+    strikes = [22000 + 50 * i for i in range(args.strikes)]
+    recorder = None
+    try:
+        # Today's session, 09:15 to 15:30, so the restart below finds it as today's history
+        ticks = int(SESSION_SECONDS / args.interval)
+        opening = datetime.datetime.combine(datetime.date.today(), datetime.time(9, 15)).timestamp()
+        times = opening + np.arange(ticks) * args.interval
+        rng = np.random.default_rng(0)
+        rows = np.zeros((ticks, len(HISTORY_COLUMNS)))
+        rows[:, 0] = times
+        started = time.perf_counter()
+        history = TickHistory(root)
+        for strike in strikes:
+            rows[:, 1:] = 300 * np.exp(np.cumsum(rng.normal(0, 0.001, (ticks, 1)), axis=0))
+            history.record({strike: rows})
+        print(f"wrote {ticks:,} ticks x {len(strikes)} strikes in {time.perf_counter() - started:.2f} s")
+
+        # Restart: engine construction (including rehydration), then the first chart
+        started = time.perf_counter()
+        recorder = TickRecorder(root, warm_minutes=args.warm_minutes)
+        engine = TickEngine(make_source(['A'], strikes, strikes[:3]), interval=args.interval, recorder=recorder)
+        rehydrated = time.perf_counter()
+        data, _ = engine.history[strikes[0]].since(0, 3600)
+        data = data[lttb_indices(data[:, 0], data[:, HISTORY_COLUMNS.index('straddle')], CHART_MAX_POINTS)]
+        build_straddle_figure(strikes[0], data).to_json()
+        rendered = time.perf_counter()
+        print(f"rehydrate {(rehydrated - started) * 1000:7.1f} ms  "
+              f"({len(engine.history[strikes[0]]):,} rows and "
+              f"{len(engine.bars[strikes[0]].buffers[1]):,} 1s bars per strike)")
+        print(f"first render {(rendered - rehydrated) * 1000:7.1f} ms; restart to first render "
+              f"{(rendered - started) * 1000:.1f} ms")
+
+        # Write-behind cost on the engine thread, and of one background flush
+        started = time.perf_counter()
+        for _ in range(100):
+            engine.tick()
+        per_tick = (time.perf_counter() - started) / 100
+        started = time.perf_counter()
+        recorder.flush()
+        print(f"tick with recording {per_tick * 1000:.2f} ms; flush of 100 ticks "
+              f"{(time.perf_counter() - started) * 1000:.1f} ms")
+    finally:
+        if recorder is not None:
+            recorder.close()
+        if args.root is None:
+            shutil.rmtree(root)
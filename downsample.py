@@ -0,0 +1,140 @@
+import math
+import numpy as np
+from ringbuffer import RingBuffer
+
+# Downsampling for long-horizon charts: point selection that keeps the shape of a
+# series (LTTB, min-max), and OHLC bars at several resolutions kept up to date tick by
+# tick, so a chart of any range is drawn from at most a few thousand points.
+
+# Bar resolutions kept per series, in seconds
+BAR_TIERS = (1, 60, 300)
+
+# Columns of a bar
+BAR_COLUMNS = ('time', 'open', 'high', 'low', 'close')
+
+# Length of a trading session (09:15-15:30); tiers keep at least this much
+SESSION_SECONDS = 6.25 * 3600
+
+# Function to size a tier's ring buffer to hold a session of bars
+def tier_capacity(seconds):
+    return math.ceil(SESSION_SECONDS / seconds) + 1
+
+# Function to pick `n` indices of (x, y) by Largest-Triangle-Three-Buckets: the first and
+# last points, then from each of n - 2 equal buckets the point forming the largest
+# triangle with the previous pick and the next bucket's mean. Peaks and troughs survive.
+def lttb_indices(x, y, n):
+    length = len(x)
+    if n >= length or n < 3:
+        return np.arange(length)
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    edges = np.linspace(1, length - 1, n - 1).astype(np.int64)
+    # Mean of every bucket at once; the point after the last bucket stands in for bucket n - 1
+    starts = np.append(edges[:-1], length - 1)
+    counts = np.diff(np.append(starts, length))
+    mean_x = np.add.reduceat(x, starts) / counts
+    mean_y = np.add.reduceat(y, starts) / counts
+
+    # Buckets padded to one width, so each bucket's candidate points are a row of a 2-D array
+    width = int(np.diff(edges).max())
+    columns = edges[:-1, None] + np.arange(width)
+    padding = columns >= edges[1:, None]
+    columns = np.minimum(columns, length - 1)
+    bucket_x, bucket_y = x[columns], y[columns]
+    next_x, next_y = mean_x[1:n - 1, None], mean_y[1:n - 1, None]
+
+    # Picks of buckets `rows`, given each one's previous pick
+    def pick(rows, anchors):
+        anchor_x, anchor_y = x[anchors, None], y[anchors, None]
+        area = np.abs((anchor_x - next_x[rows]) * (bucket_y[rows] - anchor_y)
+                      - (anchor_x - bucket_x[rows]) * (next_y[rows] - anchor_y))
+        area[padding[rows]] = -1
+        return columns[rows, np.argmax(area, axis=1)]
+
+    # Each pick depends on the one before, so pick every bucket at once from guessed
+    # anchors (the bucket starts), then re-pick only the buckets whose anchor moved until
+    # none does. Every round fixes at least one more bucket, and the result is exactly
+    # the sequential algorithm's, in a few vectorized rounds instead of a loop per bucket.
+    anchors = np.append(0, edges[:-2])
+    picks = pick(np.arange(n - 2), anchors)
+    while True:
+        moved = np.flatnonzero(anchors[1:] != picks[:-1]) + 1
+        if not len(moved):
+            break
+        anchors[moved] = picks[moved - 1]
+        picks[moved] = pick(moved, anchors[moved])
+    return np.concatenate(([0], picks, [length - 1]))
+
+# Function to pick at most `n` indices of y by min-max decimation: the lowest and the
+# highest point of each of n / 2 equal buckets, in order. Cheaper than LTTB and never
+# hides a spike; used for the coarse tiers and for the OI plots.
+def minmax_indices(y, n):
+    length = len(y)
+    if n >= length or n < 2:
+        return np.arange(length)
+    y = np.asarray(y, dtype=float)
+    buckets = n // 2
+    size = length // buckets
+    body = y[:buckets * size].reshape(buckets, size)
+    picks = [_bucket_extremes(body, np.arange(buckets) * size)]
+    if buckets * size < length:
+        picks.append(_bucket_extremes(y[None, buckets * size:], np.array([buckets * size])))
+    return np.unique(np.concatenate(picks))
+
+# Function to index the lowest and the highest point of each row of `body` (a bucket
+# starting at `offsets`), ignoring NaN; a bucket that is all NaN, such as a strike
+# rehydrated without history, contributes no points
+def _bucket_extremes(body, offsets):
+    missing = np.isnan(body)
+    filled = ~missing.all(axis=1)
+    low = offsets + np.argmin(np.where(missing, np.inf, body), axis=1)
+    high = offsets + np.argmax(np.where(missing, -np.inf, body), axis=1)
+    return np.concatenate([low[filled], high[filled]])
+
+# OHLC bars of one series at several resolutions, each in its own ring buffer. A tick
+# either extends the current bar of each tier or opens a new one, so maintaining every
+# tier costs O(1) per tick.
+class OHLCTiers:
+    def __init__(self, buffers=None, tiers=BAR_TIERS):
+        self.buffers = buffers or {seconds: RingBuffer(tier_capacity(seconds), BAR_COLUMNS) for seconds in tiers}
+
+    def update(self, now, value):
+        for seconds, bars in self.buffers.items():
+            start = now // seconds * seconds
+            last = bars.window(1)
+            if len(last) and last[0, 0] == start:
+                _, open_, high, low, _ = last[0]
+                bars.update_last((start, open_, max(high, value), min(low, value), value))
+            else:
+                bars.append((start, value, value, value, value))
+
+    # Bulk form of update() for ticks in time order, e.g. a day read back from disk:
+    # each tier's bars are built in a few array passes instead of tick by tick
+    def extend(self, times, values):
+        times = np.asarray(times, dtype=float)
+        values = np.asarray(values, dtype=float)
+        if not len(times):
+            return
+        for seconds, bars in self.buffers.items():
+            starts = times // seconds * seconds
+            first = np.flatnonzero(np.diff(starts, prepend=np.nan))
+            last = np.append(first[1:], len(times)) - 1
+            new = np.column_stack([starts[first], values[first], np.maximum.reduceat(values, first),
+                                   np.minimum.reduceat(values, first), values[last]])
+            previous = bars.window(1)
+            if len(previous) and previous[0, 0] == new[0, 0]:
+                # The first bar continues the one being built
+                _, open_, high, low, _ = previous[0]
+                new[0, 1:4] = open_, max(high, new[0, 2]), min(low, new[0, 3])
+                bars.update_last(new[0])
+                new = new[1:]
+            bars.extend(new)
+
+    # (seconds, bars) for start <= time < end from the finest tier with at most
+    # `max_points` bars there, min-max decimated on the close if even the coarsest has more
+    def select(self, start, end, max_points):
+        for seconds in sorted(self.buffers):
+            bars = self.buffers[seconds].between(start, end)
+            if len(bars) <= max_points:
+                return seconds, bars
+        return seconds, bars[minmax_indices(bars[:, 4], max_points)]
@@ -0,0 +1,128 @@
+import codecs
+from html import escape
+from html.parser import HTMLParser
+
+# Elements that never have a closing tag
+VOID_ELEMENTS = frozenset(['area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input',
+                           'link', 'meta', 'source', 'track', 'wbr'])
+
+# One rewrite: elements matching `selector` ("tag", ".class" or "tag.class1.class2")
+# get their style attribute replaced with `style`, or are dropped with their contents
+# when `remove` is set
+class Rule:
+    def __init__(self, selector, style=None, remove=False):
+        if (style is None) == (not remove):
+            raise ValueError("a rule needs exactly one of style= or remove=True")
+        tag, *classes = selector.split('.')
+        self.selector = selector
+        self.tag = tag.lower() or None
+        self.classes = frozenset(classes)
+        self.style = style
+        self.remove = remove
+
+    def matches(self, tag, attrs):
+        if self.tag is not None and tag != self.tag:
+            return False
+        if not self.classes:
+            return True
+        class_attr = next((value for name, value in attrs if name == 'class'), None) or ''
+        return self.classes.issubset(class_attr.split())
+
+# Incremental rewriter: feed() it decoded text as it arrives and it returns the rewritten
+# output available so far. Markup that no rule touches is passed through verbatim.
+class StreamingRewriter(HTMLParser):
+    def __init__(self, rules):
+        super().__init__(convert_charrefs=False)
+        self.rules = list(rules)
+        self._out = []
+        self._removing = None   # tag name of the element being dropped
+        self._depth = 0         # nesting of that tag inside the dropped element
+
+    def _match(self, tag, attrs):
+        return next((rule for rule in self.rules if rule.matches(tag, attrs)), None)
+
+    def _emit_tag(self, tag, attrs, rule, self_closing):
+        if rule is None:
+            self._out.append(self.get_starttag_text())
+            return
+        attrs = [(name, value) for name, value in attrs if name != 'style'] + [('style', rule.style)]
+        parts = [tag] + [name if value is None else f'{name}="{escape(value, quote=True)}"' for name, value in attrs]
+        self._out.append('<' + ' '.join(parts) + (' />' if self_closing else '>'))
+
+    def handle_starttag(self, tag, attrs):
+        if self._removing is not None:
+            if tag == self._removing:
+                self._depth += 1
+            return
+        rule = self._match(tag, attrs)
+        if rule is not None and rule.remove:
+            if tag not in VOID_ELEMENTS:
+                self._removing, self._depth = tag, 1
+            return
+        self._emit_tag(tag, attrs, rule, False)
+
+    def handle_startendtag(self, tag, attrs):
+        if self._removing is not None:
+            return
+        rule = self._match(tag, attrs)
+        if rule is None or not rule.remove:
+            self._emit_tag(tag, attrs, rule, True)
+
+    def handle_endtag(self, tag):
+        if self._removing is not None:
+            if tag == self._removing:
+                self._depth -= 1
+                if self._depth == 0:
+                    self._removing = None
+            return
+        self._out.append(f'</{tag}>')
+
+    def _passthrough(self, text):
+        if self._removing is None:
+            self._out.append(text)
+
+    def handle_data(self, data):
+        self._passthrough(data)
+
+    def handle_entityref(self, name):
+        self._passthrough(f'&{name};')
+
+    def handle_charref(self, name):
+        self._passthrough(f'&#{name};')
+
+    def handle_comment(self, data):
+        self._passthrough(f'<!--{data}-->')
+
+    def handle_decl(self, decl):
+        self._passthrough(f'<!{decl}>')
+
+    def handle_pi(self, data):
+        self._passthrough(f'<?{data}>')
+
+    def unknown_decl(self, data):
+        self._passthrough(f'<![{data}]>')
+
+    def _drain(self):
+        out = ''.join(self._out)
+        self._out.clear()
+        return out
+
+    def feed(self, data):
+        super().feed(data)
+        return self._drain()
+
+    def close(self):
+        super().close()
+        return self._drain()
+
+# Function to rewrite an iterable of raw byte chunks, yielding rewritten text as it goes
+def rewrite_stream(chunks, rules, encoding='utf-8'):
+    decoder = codecs.getincrementaldecoder(encoding)(errors='replace')
+    rewriter = StreamingRewriter(rules)
+    for chunk in chunks:
+        out = rewriter.feed(decoder.decode(chunk))
+        if out:
+            yield out
+    out = rewriter.feed(decoder.decode(b'', final=True)) + rewriter.close()
+    if out:
+        yield out
@@ -3,23 +3,26 @@ import os
 import dash
 from dash import dcc, html, dash_table
 from dash.dependencies import Output, Input, State
-import plotly.graph_objs as go
-import pandas as pd
-import random
-import datetime
-from flask import Flask, send_file, render_template_string
-from scipy.stats import norm
+import hashlib
+import numpy as np
+from flask import Flask, send_file, render_template_string, request, abort, Response
+from pricing import itm_probability
+from ttlcache import TTLCache
+from sharedstate import make_engine
+import tickhistory
+from optionchain import OPTION_CHAIN_COLUMNS
+from pubsub import Broadcaster, add_sse_route, sse_message
+from metrics import CallbackMetrics
 
 # Initialize Flask and Dash apps
 server = Flask(__name__)
 app = dash.Dash(__name__, server=server)
 
-# Initial prices for different strikes
-strikes = [23000, 24000, 25000, 26000, 27000]
-prices = {strike: {'call': 200, 'put': 200, 'straddle': []} for strike in strikes}
+# Per-callback and per-route latency, payload size and allocations, at /metrics (see metrics.py)
+request_metrics = CallbackMetrics(app)
 
-# Data storage for time series
-time_series = [datetime.datetime.now()]
+# Strikes tracked by the straddle chart
+strikes = [23000, 24000, 25000, 26000, 27000]
 
 # List of random stock names
 stock_names = ['RELIANCE', 'TCS', 'INFY', 'HDFCBANK', 'ICICIBANK', 'KOTAKBANK', 'SBIN', 'BAJFINANCE', 'HINDUNILVR', 'ITC']
@@ -27,31 +30,29 @@ stock_names = ['RELIANCE', 'TCS', 'INFY', 'HDFCBANK', 'ICICIBANK', 'KOTAKBANK',
 # Static list of strike prices for option chain
 option_strike_prices = [23000, 23050, 23100]
 
-# Function to generate random stock prices
-def generate_stock_data():
-    return pd.DataFrame({
-        'Stock Name': stock_names,
-        'Price': [round(random.uniform(1000, 3000), 2) for _ in stock_names]
-    })
+# Background engine that advances all market data on a fixed clock; callbacks only read its snapshots.
+# MARKET_DATA_SOURCE picks the feed (see marketdata.SOURCES); under serve.py the engine
+# runs in a ticker process and this is a follower reading its shared store.
+engine = make_engine(stock_names, strikes, option_strike_prices)
+
+# 'poll' refreshes through dcc.Interval callbacks; 'push' streams every tick to the
+# browser over Server-Sent Events at /stream (applied by assets/push.js)
+TRANSPORT = os.environ.get("DASHBOARD_TRANSPORT", "poll")
+broadcaster = Broadcaster()
+add_sse_route(server, broadcaster)
 
-# Function to generate random option chain data
-def generate_option_chain_data():
-    data = []
-    for strike in option_strike_prices:
-        data.append({
-            'Call OI': random.randint(1000, 5000),
-            'Call ChangeInOI': random.randint(-500, 500),
-            'Call Price': round(random.uniform(100, 300), 2),
-            'Strike Price': strike,
-            'Put OI': random.randint(1000, 5000),
-            'Put ChangeInOI': random.randint(-500, 500),
-            'Put Price': round(random.uniform(100, 300), 2)
-        })
-    return pd.DataFrame(data)
-
-# Function to generate random India VIX value
-def generate_india_vix():
-    return round(random.uniform(12.0, 18.0), 2)
+# Function to publish a tick to the push subscribers; encoded once and shared by all of them
+def publish_tick(snapshot):
+    if not len(broadcaster):
+        return
+    broadcaster.publish(sse_message(snapshot.seq, {
+        'time': snapshot.time,
+        'vix': snapshot.vix,
+        'stocks': snapshot.stocks,
+        'option_chain': snapshot.option_chain
+    }))
+
+engine.add_listener(publish_tick)
 
 # Function to calculate ITM probability
 def calculate_itm_probability(S, K, T, r, sigma, option_type='call'):
@@ -63,154 +64,243 @@ def calculate_itm_probability(S, K, T, r, sigma, option_type='call'):
         else:
             raise ValueError("Invalid option type. Use 'call' or 'put'.")
     d2 = (math.log(S / K) + (r - 0.5 * sigma**2) * T) / (sigma * math.sqrt(T))
+    # Standard normal CDF of d2, from erfc
+    cdf = 0.5 * math.erfc(-d2 / math.sqrt(2))
     if option_type == 'call':
-        return norm.cdf(d2) * 100
+        return cdf * 100
     elif option_type == 'put':
-        return (1 - norm.cdf(d2)) * 100
+        return (1 - cdf) * 100
+
+# Function to calculate ITM probabilities for a whole strike x time-to-expiry grid
+def calculate_itm_probability_grid(S, K, T, r, sigma):
+    K = np.asarray(K, dtype=float)[:, np.newaxis]
+    T = np.asarray(T, dtype=float)[np.newaxis, :]
+    return itm_probability(S, K, T, r, sigma)
 
 # Function to generate ITM probability data
-def generate_itm_data():
-    S = 23100
-    r = 0.03
-    sigma = 0.2
-    strike_prices = range(22000, 24001, 500)
-    days_in_month = 30
-
-    data = []
-    for K in strike_prices:
-        for day in range(days_in_month + 1):
-            T = (days_in_month - day) / 365
-            call_prob = calculate_itm_probability(S, K, T, r, sigma, 'call')
-            put_prob = calculate_itm_probability(S, K, T, r, sigma, 'put')
-            data.append({'Strike Price': K, 'Day': day, 'Call ITM %': round(call_prob, 2), 'Put ITM %': round(put_prob, 2)})
-
-    return pd.DataFrame(data)
+def generate_itm_data(S=23100, r=0.03, sigma=0.2, strike_prices=range(22000, 24001, 500),
+                      days_in_month=30, steps_per_day=1):
+    strike_prices = np.asarray(strike_prices)
+    steps = np.arange(days_in_month * steps_per_day + 1)
+    days = steps / steps_per_day if steps_per_day > 1 else steps
+    T = (days_in_month - days) / 365
 
-# Flask route to display ITM probability table
-@server.route("/itm-probability")
-def display_table():
-    data = generate_itm_data()
+    call_prob, put_prob = calculate_itm_probability_grid(S, strike_prices, T, r, sigma)
+
+    # pandas is only needed here; importing it on first use keeps it out of every worker's startup
+    import pandas as pd
+    return pd.DataFrame({
+        'Strike Price': np.repeat(strike_prices, len(days)),
+        'Day': np.tile(days, len(strike_prices)),
+        'Call ITM %': call_prob.ravel().round(2),
+        'Put ITM %': put_prob.ravel().round(2)
+    })
+
+# Types, defaults and quantization steps for the /itm-probability query parameters.
+# Requests are snapped to these steps so nearby parameter sets share a cache entry.
+ITM_TYPES = {'spot': float, 'rate': float, 'vol': float, 'strike_low': int, 'strike_high': int,
+             'strike_step': int, 'days': int}
+ITM_DEFAULTS = {'spot': 23100.0, 'rate': 0.03, 'vol': 0.2, 'strike_low': 22000, 'strike_high': 24000,
+                'strike_step': 500, 'days': 30}
+ITM_QUANTUM = {'spot': 5, 'rate': 0.0005, 'vol': 0.0025}
+ITM_MAX_CELLS = 200000
+
+# Rendered ITM tables keyed by the quantized parameter set
+itm_cache = TTLCache(maxsize=int(os.environ.get("ITM_CACHE_SIZE", 64)),
+                     ttl=float(os.environ.get("ITM_CACHE_TTL", 300)))
+
+# Function to read, validate and quantize the /itm-probability query parameters into a
+# cache key; a value that does not parse as its type is a 400, never silently the default
+def parse_itm_params(args):
+    params = {}
+    for name, default in ITM_DEFAULTS.items():
+        value = args.get(name)
+        if value is None:
+            value = default
+        else:
+            try:
+                value = ITM_TYPES[name](value)
+            except ValueError:
+                abort(400, f"{name} must be {'a number' if ITM_TYPES[name] is float else 'an integer'}")
+            if not math.isfinite(value):
+                abort(400, f"{name} must be finite")
+        params[name] = value
+
+    if params['spot'] <= 0 or params['vol'] <= 0:
+        abort(400, "spot and vol must be positive")
+    if params['strike_step'] <= 0 or params['strike_low'] <= 0 or params['strike_low'] > params['strike_high']:
+        abort(400, "strike range must be positive with strike_low <= strike_high and strike_step > 0")
+    if params['days'] < 0:
+        abort(400, "days must not be negative")
+    n_strikes = (params['strike_high'] - params['strike_low']) // params['strike_step'] + 1
+    if n_strikes * (params['days'] + 1) > ITM_MAX_CELLS:
+        abort(400, f"requested surface exceeds {ITM_MAX_CELLS} cells")
+
+    # Snapped only once validated; a spot or vol under half a step still snaps to one step, not 0
+    for name, quantum in ITM_QUANTUM.items():
+        steps = round(params[name] / quantum)
+        if name in ('spot', 'vol'):
+            steps = max(steps, 1)
+        params[name] = round(steps * quantum, 6)
+    return tuple(params.items())
+
+# Function to compute and render the ITM table for a parameter set
+def render_itm_table(params):
+    p = dict(params)
+    data = generate_itm_data(S=p['spot'], r=p['rate'], sigma=p['vol'],
+                             strike_prices=range(p['strike_low'], p['strike_high'] + 1, p['strike_step']),
+                             days_in_month=p['days'])
     table_html = data.to_html(index=False)
     html_content = f"""
     <html>
         <head><title>ITM Probability Table</title></head>
         <body>
             <h2 style='text-align: center;'>ITM Probability vs. Days to Expiration</h2>
+            <p style='text-align: center;'>Spot {p['spot']} | Rate {p['rate']} | Vol {p['vol']}</p>
             <div style='width: 80%; margin: auto;'>
                 {table_html}
             </div>
         </body>
     </html>
     """
-    return render_template_string(html_content)
-
-# Dash App Layout
-app.layout = html.Div([
-    html.Div([
-        html.H2("Market Dashboard", style={'color': 'white', 'margin': '0', 'padding': '10px'}),
-        html.Nav([
-            html.Ul([
-                html.Li(html.A("Straddle Chart", href="#", id='menu-straddle', n_clicks=0, style={'color': 'white', 'textDecoration': 'none'})),
-                html.Li(html.A("Stock Table", href="#", id='menu-stock', n_clicks=0, style={'color': 'white', 'textDecoration': 'none'})),
-                html.Li(html.A("Option Chain", href="#", id='menu-option-chain', n_clicks=0, style={'color': 'white', 'textDecoration': 'none'})),
-                html.Li(html.A("ITM Prob", href="/itm-probability", style={'color': 'white', 'textDecoration': 'none'}, target="_blank"))
-            ], style={'listStyle': 'none', 'display': 'flex', 'gap': '20px', 'margin': '0'})
-        ], style={'padding': '10px'})
-    ], style={'backgroundColor': '#333', 'color': 'white', 'display': 'flex', 'justifyContent': 'space-between', 'alignItems': 'center'}),
-
-    html.H2("Real-Time Market Dashboard", style={'textAlign': 'center', 'marginTop': '20px'}),
-
-    html.Div([
-        html.Div([
-            dcc.Dropdown(
-                id='strike-price-dropdown',
-                options=[{'label': str(strike), 'value': strike} for strike in strikes],
-                value=23000,
-                style={'width': '90%', 'margin': '0 auto'}
-            ),
-            dcc.Graph(id='live-straddle-chart', style={'height': '60vh', 'width': '100%'}),
-            html.Div(id='alert-message', style={'textAlign': 'center', 'color': 'red', 'fontSize': 24})
-        ], id='straddle-section', style={'display': 'block', 'padding': '10px'}),
+    page = render_template_string(html_content)
+    etag = hashlib.sha1(page.encode()).hexdigest()
+    return data, page, etag
+
+# Flask route to display ITM probability table
+@server.route("/itm-probability")
+def display_table():
+    params = parse_itm_params(request.args)
+    cached = itm_cache.get(params)
+    if cached is None:
+        with request_metrics.phase('render'):
+            cached = render_itm_table(params)
+        itm_cache.set(params, cached)
+    _, page, etag = cached
+
+    response = Response(page, mimetype='text/html')
+    response.set_etag(etag)
+    response.cache_control.public = True
+    response.cache_control.max_age = int(itm_cache.ttl)
+    return response.make_conditional(request)
 
+# Dash App Layout, built on every page load so the tables start from the live store
+def serve_layout():
+    return html.Div([
         html.Div([
-            dash_table.DataTable(
-                id='live-stock-table',
-                columns=[
-                    {'name': 'Stock Name', 'id': 'Stock Name'},
-                    {'name': 'Price', 'id': 'Price'}
-                ],
-                data=generate_stock_data().to_dict('records'),
-                style_table={'width': '90%', 'margin': '0 auto'},
-                style_cell={'textAlign': 'center', 'padding': '5px'},
-                style_header={'backgroundColor': 'lightgrey', 'fontWeight': 'bold'},
-                style_data_conditional=[
-                    {
-                        'if': {'column_id': 'Price'},
-                        'backgroundColor': 'rgb(248, 248, 255)',
-                        'color': 'black'
-                    }
-                ]
-            )
-        ], id='stock-section', style={'display': 'none', 'padding': '10px'}),
+            html.H2("Market Dashboard", style={'color': 'white', 'margin': '0', 'padding': '10px'}),
+            html.Nav([
+                html.Ul([
+                    html.Li(html.A("Straddle Chart", href="#", id='menu-straddle', n_clicks=0, style={'color': 'white', 'textDecoration': 'none'})),
+                    html.Li(html.A("Stock Table", href="#", id='menu-stock', n_clicks=0, style={'color': 'white', 'textDecoration': 'none'})),
+                    html.Li(html.A("Option Chain", href="#", id='menu-option-chain', n_clicks=0, style={'color': 'white', 'textDecoration': 'none'})),
+                    html.Li(html.A("ITM Prob", href="/itm-probability", style={'color': 'white', 'textDecoration': 'none'}, target="_blank"))
+                ], style={'listStyle': 'none', 'display': 'flex', 'gap': '20px', 'margin': '0'})
+            ], style={'padding': '10px'})
+        ], style={'backgroundColor': '#333', 'color': 'white', 'display': 'flex', 'justifyContent': 'space-between', 'alignItems': 'center'}),
+
+        html.H2("Real-Time Market Dashboard", style={'textAlign': 'center', 'marginTop': '20px'}),
 
         html.Div([
-            dash_table.DataTable(
-                id='option-chain-table',
-                columns=[
-                    {'name': 'Call OI', 'id': 'Call OI'},
-                    {'name': 'Call ChangeInOI', 'id': 'Call ChangeInOI'},
-                    {'name': 'Call Price', 'id': 'Call Price'},
-                    {'name': 'Strike Price', 'id': 'Strike Price'},
-                    {'name': 'Put OI', 'id': 'Put OI'},
-                    {'name': 'Put ChangeInOI', 'id': 'Put ChangeInOI'},
-                    {'name': 'Put Price', 'id': 'Put Price'}
-                ],
-                data=generate_option_chain_data().to_dict('records'),
-                style_table={'width': '90%', 'margin': '0 auto'},
-                style_cell={'textAlign': 'center', 'padding': '5px'},
-                style_header={'backgroundColor': 'lightgrey', 'fontWeight': 'bold'},
-                style_data_conditional=[
-                    {
-                        'if': {
-                            'filter_query': '{Call ChangeInOI} > 0',
-                            'column_id': 'Call ChangeInOI'
-                        },
-                        'color': 'green'
-                    },
-                    {
-                        'if': {
-                            'filter_query': '{Call ChangeInOI} < 0',
-                            'column_id': 'Call ChangeInOI'
+            html.Div([
+                dcc.Dropdown(
+                    id='strike-price-dropdown',
+                    options=[{'label': str(strike), 'value': strike} for strike in strikes],
+                    value=23000,
+                    style={'width': '90%', 'margin': '0 auto'}
+                ),
+                dcc.Graph(id='live-straddle-chart', style={'height': '60vh', 'width': '100%'}),
+                html.Div(id='alert-message', style={'textAlign': 'center', 'color': 'red', 'fontSize': 24})
+            ], id='straddle-section', style={'display': 'block', 'padding': '10px'}),
+
+            html.Div([
+                dash_table.DataTable(
+                    id='live-stock-table',
+                    columns=[
+                        {'name': 'Stock Name', 'id': 'Stock Name'},
+                        {'name': 'Price', 'id': 'Price'}
+                    ],
+                    data=engine.snapshot().stocks,
+                    style_table={'width': '90%', 'margin': '0 auto'},
+                    style_cell={'textAlign': 'center', 'padding': '5px'},
+                    style_header={'backgroundColor': 'lightgrey', 'fontWeight': 'bold'},
+                    style_data_conditional=[
+                        {
+                            'if': {'column_id': 'Price'},
+                            'backgroundColor': 'rgb(248, 248, 255)',
+                            'color': 'black'
+                        }
+                    ]
+                )
+            ], id='stock-section', style={'display': 'none', 'padding': '10px'}),
+
+            html.Div([
+                dash_table.DataTable(
+                    id='option-chain-table',
+                    columns=[{'name': name, 'id': name} for name in OPTION_CHAIN_COLUMNS],
+                    data=engine.snapshot().option_chain,
+                    style_table={'width': '90%', 'margin': '0 auto'},
+                    style_cell={'textAlign': 'center', 'padding': '5px'},
+                    style_header={'backgroundColor': 'lightgrey', 'fontWeight': 'bold'},
+                    style_data_conditional=[
+                        {
+                            'if': {
+                                'filter_query': '{Call ChangeInOI} > 0',
+                                'column_id': 'Call ChangeInOI'
+                            },
+                            'color': 'green'
                         },
-                        'color': 'red'
-                    },
-                    {
-                        'if': {
-                            'filter_query': '{Put ChangeInOI} > 0',
-                            'column_id': 'Put ChangeInOI'
+                        {
+                            'if': {
+                                'filter_query': '{Call ChangeInOI} < 0',
+                                'column_id': 'Call ChangeInOI'
+                            },
+                            'color': 'red'
                         },
-                        'color': 'green'
-                    },
-                    {
-                        'if': {
-                            'filter_query': '{Put ChangeInOI} < 0',
-                            'column_id': 'Put ChangeInOI'
+                        {
+                            'if': {
+                                'filter_query': '{Put ChangeInOI} > 0',
+                                'column_id': 'Put ChangeInOI'
+                            },
+                            'color': 'green'
                         },
-                        'color': 'red'
-                    }
-                ]
-            )
-        ], id='option-chain-section', style={'display': 'none', 'padding': '10px'})
-    ]),
-
-    html.Div(id='india-vix-value', style={'textAlign': 'center', 'color': 'blue', 'fontSize': 24, 'marginTop': '20px'}),
-
-    dcc.Interval(
-        id='interval-component',
-        interval=5*1000,  # Update every 5 seconds
-        n_intervals=0
+                        {
+                            'if': {
+                                'filter_query': '{Put ChangeInOI} < 0',
+                                'column_id': 'Put ChangeInOI'
+                            },
+                            'color': 'red'
+                        }
+                    ]
+                )
+            ], id='option-chain-section', style={'display': 'none', 'padding': '10px'})
+        ]),
+
+        html.Div(id='india-vix-value', style={'textAlign': 'center', 'color': 'blue', 'fontSize': 24, 'marginTop': '20px'}),
+
+        dcc.Interval(
+            id='interval-component',
+            interval=5*1000,  # Update every 5 seconds
+            n_intervals=0,
+            disabled=TRANSPORT == 'push'
+        ),
+        html.Div(id='push-stream', **{'data-stream': '/stream'}) if TRANSPORT == 'push' else html.Div()
+    ])
+
+app.layout = serve_layout
+
+# In push mode, start assets/push.js once the page has rendered
+if TRANSPORT == 'push':
+    app.clientside_callback(
+        """
+        function(strike) {
+            window.dashboardPush.setView(strike, null);
+            return window.dash_clientside.no_update;
+        }
+        """,
+        Output('push-stream', 'children'),
+        Input('strike-price-dropdown', 'value')
     )
-])
 
 # Callback to update India VIX value
 @app.callback(
@@ -218,9 +308,14 @@ app.layout = html.Div([
     Input('interval-component', 'n_intervals')
 )
 def update_india_vix(n_intervals):
-    return f"India VIX: {generate_india_vix()}"
+    return f"India VIX: {engine.snapshot().vix}"
 
 # Run the app
 if __name__ == "__main__":
     port = int(os.environ.get("PORT", 5000))
-    app.run_server(host="0.0.0.0", port=port, debug=True)
+    # With debug on, this process only runs the reloader, which serves from a fresh child;
+    # stop ticking here so the child is the only engine recording tick history
+    if not os.environ.get("WERKZEUG_RUN_MAIN"):
+        engine.stop()
+        tickhistory.close_all()
+    app.run(host="0.0.0.0", port=port, debug=True)
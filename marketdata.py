@@ -0,0 +1,179 @@
+import os
+from abc import ABC, abstractmethod
+from collections import namedtuple
+import numpy as np
+from pricing import price_chain
+
+# One tick of market data, as arrays aligned to the source's instrument lists:
+# stock_prices to stock_names, straddle_call/straddle_put to strikes, and each
+# option_chain column ('Call OI', 'Call Price', 'Put OI', 'Put Price') to the
+# sorted option_strike_prices.
+MarketTick = namedtuple('MarketTick', ['time', 'spot', 'vix', 'stock_prices',
+                                       'straddle_call', 'straddle_put', 'option_chain'])
+
+# Trading time in a year, used to turn tick intervals into GBM time steps
+TRADING_SECONDS_PER_YEAR = 252 * 6.25 * 3600
+
+# Calendar time in a year, used for time to expiry when pricing options
+SECONDS_PER_YEAR = 365 * 24 * 3600
+
+# Interface every market data feed implements. A real feed subclasses this and
+# returns the latest quotes from tick(); the TickEngine never knows the difference.
+# A feed that does not implement tick() cannot be constructed.
+class MarketDataSource(ABC):
+    def __init__(self, stock_names, strikes, option_strike_prices):
+        self.stock_names = list(stock_names)
+        self.strikes = list(strikes)
+        self.option_strike_prices = sorted(option_strike_prices)
+
+    # MarketTick of the latest quotes at epoch time `now`
+    @abstractmethod
+    def tick(self, now):
+        raise NotImplementedError
+
+# Uniform random data with the same ranges the dashboards have always shown:
+# stock prices in 1000-3000, VIX in 12-18, straddle legs walking +-2 from 200.
+class RandomMarketData(MarketDataSource):
+    def __init__(self, stock_names, strikes, option_strike_prices, seed=None):
+        super().__init__(stock_names, strikes, option_strike_prices)
+        self.rng = np.random.default_rng(seed)
+        self.call = np.full(len(self.strikes), 200.0)
+        self.put = np.full(len(self.strikes), 200.0)
+        self.call_oi = None
+        self.put_oi = None
+
+    def _walk_open_interest(self):
+        n = len(self.option_strike_prices)
+        if self.call_oi is None:
+            self.call_oi = self.rng.integers(1000, 5001, n)
+            self.put_oi = self.rng.integers(1000, 5001, n)
+        else:
+            self.call_oi = np.maximum(self.call_oi + self.rng.integers(-50, 51, n), 0)
+            self.put_oi = np.maximum(self.put_oi + self.rng.integers(-50, 51, n), 0)
+
+    def _walk_straddles(self):
+        n = len(self.strikes)
+        self.call = np.maximum(self.call + self.rng.uniform(-2, 2, n), 0)
+        self.put = np.maximum(self.put + self.rng.uniform(-2, 2, n), 0)
+
+    def _option_chain(self):
+        n = len(self.option_strike_prices)
+        return {
+            'Call OI': self.call_oi,
+            'Call Price': self.rng.uniform(100, 300, n).round(2),
+            'Put OI': self.put_oi,
+            'Put Price': self.rng.uniform(100, 300, n).round(2)
+        }
+
+    def tick(self, now):
+        self._walk_straddles()
+        self._walk_open_interest()
+        return MarketTick(
+            time=now,
+            spot=23100.0,
+            vix=round(self.rng.uniform(12.0, 18.0), 2),
+            stock_prices=self.rng.uniform(1000, 3000, len(self.stock_names)).round(2),
+            straddle_call=self.call,
+            straddle_put=self.put,
+            option_chain=self._option_chain()
+        )
+
+# Vectorized synthetic market for load testing without a network:
+#
+# - the index and every stock follow GBM, correlated through one market factor
+#   (each stock's shock is sqrt(rho) * market + sqrt(1 - rho) * idiosyncratic);
+# - India VIX mean-reverts (Ornstein-Uhlenbeck, vol proportional to level) and moves
+#   against the market, and it sets the index volatility;
+# - open interest per option strike follows a random walk;
+# - straddle legs and option chain prices are Black-Scholes prices off the index,
+#   at VIX volatility, for a weekly expiry that rolls over when it is reached.
+#
+# Every instrument is advanced with a handful of array operations per tick, so
+# thousands of instruments at 10+ ticks/s cost a few milliseconds a second.
+class SyntheticMarketData(RandomMarketData):
+    def __init__(self, stock_names, strikes, option_strike_prices, interval=None, spot=23100.0,
+                 vix=14.0, correlation=0.5, rate=0.03, expiry_days=7, seed=None):
+        super().__init__(stock_names, strikes, option_strike_prices, seed)
+        n = len(self.stock_names)
+        interval = interval or float(os.environ.get("TICK_INTERVAL", 1.0))
+        self.dt = interval / TRADING_SECONDS_PER_YEAR
+        self.spot = spot
+        self.vix = vix
+        self.vix_mean = vix
+        self.vix_reversion = 5.0     # per year
+        self.vix_vol = 0.9           # annualised, proportional to level
+        self.vix_market_corr = -0.7
+        self.correlation = correlation
+        self.stock_prices = self.rng.uniform(1000, 3000, n)
+        self.stock_vols = self.rng.uniform(0.15, 0.40, n)
+        self.oi_step = 25
+        self.rate = rate
+        self.expiry_seconds = expiry_days * 24 * 3600
+        self.expiry = None
+        self.strike_array = np.asarray(self.strikes, dtype=float)
+        self.chain_strikes = np.asarray(self.option_strike_prices, dtype=float)
+
+    # Years to the current expiry, rolling to the next one once it has passed
+    def time_to_expiry(self, now):
+        if self.expiry is None or now >= self.expiry:
+            self.expiry = now + self.expiry_seconds
+        return (self.expiry - now) / SECONDS_PER_YEAR
+
+    def _walk_open_interest(self):
+        if self.call_oi is None:
+            super()._walk_open_interest()
+            return
+        n = len(self.option_strike_prices)
+        self.call_oi = np.maximum(self.call_oi + self.rng.normal(0, self.oi_step, n).round().astype(np.int64), 0)
+        self.put_oi = np.maximum(self.put_oi + self.rng.normal(0, self.oi_step, n).round().astype(np.int64), 0)
+
+    def tick(self, now):
+        dt, sqrt_dt = self.dt, np.sqrt(self.dt)
+        market = self.rng.standard_normal()
+
+        sigma = self.vix / 100
+        self.spot *= np.exp(-0.5 * sigma**2 * dt + sigma * sqrt_dt * market)
+
+        vix_shock = self.vix_market_corr * market + np.sqrt(1 - self.vix_market_corr**2) * self.rng.standard_normal()
+        self.vix += self.vix_reversion * (self.vix_mean - self.vix) * dt + self.vix_vol * self.vix * sqrt_dt * vix_shock
+        self.vix = max(self.vix, 1.0)
+
+        shocks = (np.sqrt(self.correlation) * market
+                  + np.sqrt(1 - self.correlation) * self.rng.standard_normal(len(self.stock_prices)))
+        self.stock_prices *= np.exp(-0.5 * self.stock_vols**2 * dt + self.stock_vols * sqrt_dt * shocks)
+
+        # Straddle strikes and chain strikes priced together in one call
+        T = self.time_to_expiry(now)
+        n = len(self.strike_array)
+        prices = price_chain(self.spot, np.concatenate([self.strike_array, self.chain_strikes]), T,
+                             self.rate, self.vix / 100)
+        self.call, self.put = prices['call'][:n], prices['put'][:n]
+
+        self._walk_open_interest()
+        return MarketTick(
+            time=now,
+            spot=self.spot,
+            vix=round(self.vix, 2),
+            stock_prices=self.stock_prices.round(2),
+            straddle_call=self.call,
+            straddle_put=self.put,
+            option_chain={
+                'Call OI': self.call_oi,
+                'Call Price': prices['call'][n:].round(2),
+                'Put OI': self.put_oi,
+                'Put Price': prices['put'][n:].round(2)
+            }
+        )
+
+# Available sources, selected by name (MARKET_DATA_SOURCE)
+SOURCES = {
+    'random': RandomMarketData,
+    'synthetic': SyntheticMarketData
+}
+
+# Function to build the configured market data source
+def make_source(stock_names, strikes, option_strike_prices, name=None, **kwargs):
+    name = name or os.environ.get("MARKET_DATA_SOURCE", "random")
+    if name not in SOURCES:
+        raise ValueError(f"Unknown market data source {name!r}; choose from {', '.join(SOURCES)}")
+    return SOURCES[name](stock_names, strikes, option_strike_prices, **kwargs)
@@ -0,0 +1,284 @@
+import bisect
+import collections
+import math
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from flask import Response, g, has_request_context, jsonify, request
+
+# Histogram bucket upper bounds: latency in seconds, payload in bytes (256 B to 64 MB)
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BYTES_BUCKETS = tuple(256 * 4 ** i for i in range(10))
+
+# Function to escape a Prometheus label value
+def _label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+# Fixed-bucket histogram in the Prometheus style: a count per bucket, plus sum and count
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)   # the last slot is above every bucket
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    # Upper bound of the bucket holding the q-th quantile (inf past the last bucket)
+    def quantile(self, q):
+        rank = q * self.count
+        cumulative = 0
+        for bound, count in zip(self.buckets + (math.inf,), self.counts):
+            cumulative += count
+            if cumulative >= rank:
+                return bound
+        return math.inf
+
+    # Exposition lines for this histogram as metric `name` with `labels` ('k="v",...')
+    def exposition(self, name, labels):
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + (math.inf,), self.counts):
+            cumulative += count
+            le = '+Inf' if bound == math.inf else f'{bound:g}'
+            lines.append(f'{name}_bucket{{{labels},le="{le}"}} {cumulative}')
+        lines.append(f'{name}_sum{{{labels}}} {self.sum!r}')
+        lines.append(f'{name}_count{{{labels}}} {self.count}')
+        return lines
+
+# Latency, payload and allocation totals for one callback or route
+class RequestStats:
+    def __init__(self):
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.payload = Histogram(BYTES_BUCKETS)
+        self.phases = {}            # phase name -> Histogram of seconds, see RequestMetrics.phase()
+        self.skipped = 0            # responses where every output was no_update
+        self.errors = 0             # 5xx responses
+        self.max_seconds = 0.0
+        # Net change in allocated memory blocks across the requests; other threads' work
+        # is included, so it is a trend to watch for leaks, not an exact count
+        self.allocated_blocks = 0
+
+    @property
+    def calls(self):
+        return self.latency.count
+
+    def record(self, seconds, nbytes, skipped, error, blocks, phases):
+        self.latency.observe(seconds)
+        self.payload.observe(nbytes)
+        for name, phase_seconds in phases.items():
+            self.phases.setdefault(name, Histogram(LATENCY_BUCKETS)).observe(phase_seconds)
+        self.skipped += skipped
+        self.errors += error
+        self.max_seconds = max(self.max_seconds, seconds)
+        self.allocated_blocks += blocks
+
+    def as_dict(self):
+        calls = self.calls or 1
+        return {
+            'calls': self.calls,
+            'skipped': self.skipped,
+            'errors': self.errors,
+            'avg_ms': round(1000 * self.latency.sum / calls, 3),
+            'p50_ms': round(1000 * self.latency.quantile(0.5), 3),
+            'p99_ms': round(1000 * self.latency.quantile(0.99), 3),
+            'max_ms': round(1000 * self.max_seconds, 3),
+            'avg_bytes': round(self.payload.sum / calls),
+            'total_bytes': round(self.payload.sum),
+            'allocated_blocks': self.allocated_blocks,
+            'phases_avg_ms': {name: round(1000 * phase.sum / (phase.count or 1), 3)
+                              for name, phase in sorted(self.phases.items())}
+        }
+
+# Statistical profiler: samples every thread's Python stack every `interval` seconds and
+# counts identical stacks, in the folded format flame graph tools read ("a;b;c 12")
+class SamplingProfiler:
+    def __init__(self, interval=0.005):
+        self.interval = interval
+
+    def sample(self, seconds):
+        counts = collections.Counter()
+        me = threading.get_ident()
+        deadline = time.perf_counter() + seconds
+        while time.perf_counter() < deadline:
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == me:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(f'{os.path.basename(frame.f_code.co_filename)}:{frame.f_code.co_name}')
+                    frame = frame.f_back
+                stack.append(names.get(thread_id, str(thread_id)))
+                counts[';'.join(reversed(stack))] += 1
+            time.sleep(self.interval)
+        return counts
+
+    @staticmethod
+    def folded(counts):
+        return ''.join(f'{stack} {count}\n' for stack, count in counts.most_common())
+
+# Per-route latency, payload-size and allocation metrics for a Flask server.
+#
+# Every request is timed from before_request to after_request, so the latency includes
+# the framework's own serialization and the byte count is what went over the wire; a
+# streamed response is timed and counted until the server has sent all of it. Event
+# streams (text/event-stream) stay open for as long as a browser is connected, so they
+# are not recorded: their "latency" would only measure how long the page was open.
+# Routes are keyed by their URL rule, not the path, so the label set stays bounded.
+#
+# Metrics are served in the Prometheus text format at `route`. With DASHBOARD_PROFILER
+# set, GET `profile_route`?seconds=N also samples every thread's stack for N seconds
+# and returns the folded stacks.
+class RequestMetrics:
+    def __init__(self, server, route='/metrics', profile_route='/debug/profile'):
+        self.server = server
+        self.stats = {}             # (kind, name) -> RequestStats
+        self._lock = threading.Lock()
+        self._profiling = threading.Lock()
+        self._excluded = {route, profile_route}
+        server.before_request(self._before)
+        server.after_request(self._after)
+        server.add_url_rule(route, 'metrics', self._metrics_response)
+        if os.environ.get("DASHBOARD_PROFILER"):
+            server.add_url_rule(profile_route, 'profile', self._profile_response)
+
+    # (kind, name) the current request is recorded under
+    def _key(self):
+        rule = request.url_rule
+        return 'route', rule.rule if rule is not None else 'unmatched'
+
+    # Whether the response carried nothing new (only meaningful for Dash callbacks)
+    def _skipped(self, response):
+        return False
+
+    def _before(self):
+        if request.path in self._excluded:
+            return
+        g.metrics_started = time.perf_counter()
+        g.metrics_blocks = sys.getallocatedblocks()
+        g.metrics_phases = {}
+
+    def _after(self, response):
+        started = g.pop('metrics_started', None)
+        if started is None:
+            return response
+        blocks, phases = g.pop('metrics_blocks'), g.pop('metrics_phases')
+        if response.mimetype == 'text/event-stream':
+            return response
+        key = self._key()
+        skipped, error = self._skipped(response), response.status_code >= 500
+        if response.is_streamed:
+            response.response = self._counted(response.response, key, started, blocks, phases, error)
+        else:
+            self._record(key, time.perf_counter() - started, response.calculate_content_length() or 0,
+                         skipped, error, sys.getallocatedblocks() - blocks, phases)
+        return response
+
+    # Pass a streamed body through, recording the request once the server has sent it all
+    def _counted(self, chunks, key, started, blocks, phases, error):
+        nbytes = 0
+        try:
+            for chunk in chunks:
+                nbytes += len(chunk)
+                yield chunk
+        finally:
+            self._record(key, time.perf_counter() - started, nbytes, False, error,
+                         sys.getallocatedblocks() - blocks, phases)
+
+    def _record(self, key, seconds, nbytes, skipped, error, blocks, phases):
+        with self._lock:
+            self.stats.setdefault(key, RequestStats()).record(seconds, nbytes, skipped, error, blocks, phases)
+
+    # Time a named part of the current request, e.g. figure building inside a callback;
+    # each phase gets its own histogram next to the request's total. A no-op outside a request.
+    @contextmanager
+    def phase(self, name):
+        phases = g.get('metrics_phases') if has_request_context() else None
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            if phases is not None:
+                phases[name] = phases.get(name, 0.0) + time.perf_counter() - started
+
+    # {name: stats dict} for one kind ('route' or 'callback')
+    def as_dict(self, kind='route'):
+        with self._lock:
+            return {name: stats.as_dict() for (k, name), stats in sorted(self.stats.items()) if k == kind}
+
+    def prometheus(self):
+        with self._lock:
+            items = [(f'kind="{kind}",name="{_label(name)}"', stats) for (kind, name), stats in sorted(self.stats.items())]
+            lines = ['# HELP dashboard_request_seconds Request latency, including response serialization',
+                     '# TYPE dashboard_request_seconds histogram']
+            for labels, stats in items:
+                lines += stats.latency.exposition('dashboard_request_seconds', labels)
+            lines += ['# HELP dashboard_response_bytes Response body size',
+                      '# TYPE dashboard_response_bytes histogram']
+            for labels, stats in items:
+                lines += stats.payload.exposition('dashboard_response_bytes', labels)
+            lines += ['# HELP dashboard_phase_seconds Time in named phases of a request',
+                      '# TYPE dashboard_phase_seconds histogram']
+            for labels, stats in items:
+                for phase, histogram in sorted(stats.phases.items()):
+                    lines += histogram.exposition('dashboard_phase_seconds', f'{labels},phase="{_label(phase)}"')
+            for metric, kind, help_text, attribute in [
+                ('dashboard_requests_skipped_total', 'counter', 'Callback responses with nothing to update', 'skipped'),
+                ('dashboard_request_errors_total', 'counter', 'Responses with a 5xx status', 'errors'),
+                ('dashboard_request_allocated_blocks', 'gauge', 'Net change in allocated memory blocks across requests',
+                 'allocated_blocks')
+            ]:
+                lines += [f'# HELP {metric} {help_text}', f'# TYPE {metric} {kind}']
+                lines += [f'{metric}{{{labels}}} {getattr(stats, attribute)}' for labels, stats in items]
+        lines += ['# HELP dashboard_python_allocated_blocks Memory blocks currently allocated by the interpreter',
+                  '# TYPE dashboard_python_allocated_blocks gauge',
+                  f'dashboard_python_allocated_blocks {sys.getallocatedblocks()}']
+        return '\n'.join(lines) + '\n'
+
+    def _metrics_response(self):
+        return Response(self.prometheus(), mimetype='text/plain; version=0.0.4')
+
+    def _profile_response(self):
+        seconds = min(request.args.get('seconds', 10.0, type=float), 60.0)
+        interval = max(request.args.get('interval', 0.005, type=float), 0.001)
+        if not self._profiling.acquire(blocking=False):
+            return Response("a profile is already running\n", status=409, mimetype='text/plain')
+        try:
+            counts = SamplingProfiler(interval).sample(seconds)
+        finally:
+            self._profiling.release()
+        return Response(SamplingProfiler.folded(counts), mimetype='text/plain')
+
+# RequestMetrics for a Dash app, with every /_dash-update-component request recorded
+# under the callback it ran (by Python function name, falling back to the Dash output
+# id). Callback stats are also served as JSON at `route`.
+class CallbackMetrics(RequestMetrics):
+    def __init__(self, app, route='/callback-stats', **kwargs):
+        self.app = app
+        super().__init__(app.server, **kwargs)
+        self._excluded.add(route)
+        app.server.add_url_rule(route, 'callback_stats', lambda: jsonify(self.as_dict('callback')))
+
+    # Name a callback by its Python function, falling back to the Dash output id
+    def _callback_name(self, output):
+        entry = self.app.callback_map.get(output)
+        callback = entry and entry.get('callback')
+        return getattr(callback, '__name__', output)
+
+    def _key(self):
+        if request.path.endswith('/_dash-update-component'):
+            payload = request.get_json(silent=True)
+            output = payload.get('output', '') if isinstance(payload, dict) else ''
+            return 'callback', self._callback_name(output)
+        return super()._key()
+
+    def _skipped(self, response):
+        # Older Dash answers an all-no_update callback with 204, newer with an empty response map
+        return request.path.endswith('/_dash-update-component') and (
+            response.status_code == 204 or response.get_data().endswith(b'"response":{}}'))
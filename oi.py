@@ -1,48 +1,161 @@
-import matplotlib.pyplot as plt
-import matplotlib.animation as animation
+import argparse
+import time
 import random
-import datetime
-
-# Initialize data lists
-strike_23000_data = []
-strike_24000_data = []
-time_series = []
+import matplotlib.pyplot as plt
+import numpy as np
+from ringbuffer import RingBuffer, as_local_datetimes
+from oihistory import OIHistory, day_of
+from downsample import minmax_indices
 
 # Function to generate random open interest data
 def generate_open_interest_data():
     return random.randint(1000, 5000)
 
-# Function to update the data and plot
-def update(frame):
-    current_time = datetime.datetime.now()
-    time_series.append(current_time)
-    
-    # Generate random data for both strike prices
-    strike_23000_data.append(generate_open_interest_data())
-    strike_24000_data.append(generate_open_interest_data())
-
-    # Keep only the last 50 data points
-    if len(time_series) > 50:
-        time_series.pop(0)
-        strike_23000_data.pop(0)
-        strike_24000_data.pop(0)
-
-    # Clear and update the plot
-    ax.clear()
-    ax.plot(time_series, strike_23000_data, label='Strike Price 23000', marker='o')
-    ax.plot(time_series, strike_24000_data, label='Strike Price 24000', marker='x')
-    
-    ax.set_title('Real-Time Open Interest for Strike Prices 23000 and 24000')
+# Live open-interest plot for any set of strikes.
+#
+# Lines are persistent artists fed from one fixed-size ring buffer, and frames are
+# blitted: only the lines are redrawn over a cached background. The x axis is
+# "seconds ago" over a fixed span, so the background (axes, ticks, legend, grid) is
+# only redrawn when the y range has to grow.
+class LiveOIPlot:
+    def __init__(self, strikes, window=50, interval=1.0):
+        self.strikes = list(strikes)
+        self.interval = interval
+        self.buffer = RingBuffer(window, ['time'] + [str(strike) for strike in self.strikes])
+        self.frame_times = RingBuffer(100, ['seconds'])
+
+        # Set up the plot; per-point markers only while they stay cheap to draw
+        self.fig, self.ax = plt.subplots(figsize=(12, 6))
+        marker = 'o' if window <= 100 else None
+        self.lines = [
+            self.ax.plot([], [], label=f'Strike Price {strike}', marker=marker, animated=True)[0]
+            for strike in self.strikes
+        ]
+        self.ax.set_title('Real-Time Open Interest for Strike Prices ' + ', '.join(str(s) for s in self.strikes))
+        self.ax.set_xlabel('Seconds ago')
+        self.ax.set_ylabel('Open Interest')
+        self.ax.set_xlim(-window * interval, 0)
+        self._ylim = None
+        self.ax.legend(loc='upper left')
+        self.ax.grid(True)
+        self.fig.tight_layout()
+
+        self.background = None
+        self.fig.canvas.mpl_connect('draw_event', self._on_draw)
+
+    # Full redraws (first show, resize, y range growth) refresh the cached background
+    def _on_draw(self, event):
+        self.background = self.fig.canvas.copy_from_bbox(self.fig.bbox)
+        self._draw_lines()
+
+    def _draw_lines(self):
+        for line in self.lines:
+            self.ax.draw_artist(line)
+
+    # Grow the y range with some headroom when data leaves it; never shrink, to avoid redraw churn
+    def _fit_ylim(self, values):
+        if np.isnan(values).all():
+            return False
+        vmin, vmax = float(np.nanmin(values)), float(np.nanmax(values))
+        if self._ylim is not None and self._ylim[0] <= vmin and vmax <= self._ylim[1]:
+            return False
+        pad = 0.1 * max(vmax - vmin, 1)
+        low, high = vmin - pad, vmax + pad
+        if self._ylim is not None:
+            low, high = min(low, self._ylim[0]), max(high, self._ylim[1])
+        self._ylim = (low, high)
+        self.ax.set_ylim(low, high)
+        return True
+
+    # Function to update the data and plot, for a tick at `now` (the current time by default)
+    def update(self, oi_by_strike=None, now=None):
+        started = time.perf_counter()
+        now = time.time() if now is None else now
+        if oi_by_strike is None:
+            oi_by_strike = {strike: generate_open_interest_data() for strike in self.strikes}
+        self.buffer.append([now] + [oi_by_strike.get(strike, np.nan) for strike in self.strikes])
+
+        data = self.buffer.window()
+        x = data[:, 0] - now
+        for i, line in enumerate(self.lines):
+            line.set_data(x, data[:, i + 1])
+
+        canvas = self.fig.canvas
+        if self._fit_ylim(data[:, 1:]) or self.background is None:
+            canvas.draw()
+        else:
+            canvas.restore_region(self.background)
+            self._draw_lines()
+            canvas.blit(self.fig.bbox)
+        canvas.flush_events()
+        self.frame_times.append((time.perf_counter() - started,))
+
+    # Seed the buffer with the last `window` recorded ticks of today
+    def prefill(self, history):
+        day = day_of(time.time())
+        tails = [history.log.tail(day, strike, self.buffer.capacity) for strike in self.strikes]
+        n = max(len(tail) for tail in tails)
+        if n == 0:
+            return
+        reference = next(tail for tail in tails if len(tail) == n)
+        rows = np.full((n, len(self.strikes) + 1), np.nan)
+        rows[:, 0] = reference['time']
+        for i, tail in enumerate(tails):
+            # Strikes recorded by the same recorder share timestamps; align shorter tails at the end
+            rows[n - len(tail):, i + 1] = tail['oi']
+        for row in rows:
+            self.buffer.append(row)
+
+    # Draw the newest recorded tick at its recorded time; nothing until the recorder writes a newer one
+    def follow(self, history):
+        timestamp, oi_by_strike = history.latest(self.strikes)
+        if timestamp is None or (self.buffer.count and timestamp <= self.buffer.window(1)[0, 0]):
+            return
+        self.update(oi_by_strike, timestamp)
+
+    def run(self, history=None):
+        if history is not None:
+            self.prefill(history)
+            source = lambda: self.follow(history)
+        else:
+            source = self.update
+        timer = self.fig.canvas.new_timer(interval=int(self.interval * 1000))
+        timer.add_callback(source)
+        timer.start()
+        # Display the plot
+        plt.show()
+
+# Function to plot a whole recorded day for a strike range
+def plot_recorded_day(history, day, strike_low=None, strike_high=None, max_points=2000):
+    fig, ax = plt.subplots(figsize=(12, 6))
+    for strike, records in history.load(day, strike_low, strike_high).items():
+        # A day of records is far more points than the plot has pixels; min-max keeps every spike
+        records = records[minmax_indices(records['oi'], max_points)]
+        ax.plot(as_local_datetimes(records['time']), records['oi'], label=f'Strike Price {strike}')
+    ax.set_title(f'Recorded Open Interest on {day}')
     ax.set_xlabel('Time')
     ax.set_ylabel('Open Interest')
     ax.legend()
     ax.grid(True)
     plt.xticks(rotation=45, ha='right')
+    plt.tight_layout()
+    plt.show()
 
-# Set up the plot
-fig, ax = plt.subplots(figsize=(12, 6))
-ani = animation.FuncAnimation(fig, update, interval=5000)
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Live open interest plot")
+    parser.add_argument('--strikes', type=int, nargs='+', default=[23000, 24000])
+    parser.add_argument('--interval', type=float, default=5.0, help="seconds between updates")
+    parser.add_argument('--window', type=int, default=50, help="points kept per strike")
+    parser.add_argument('--history', help="oihistory.py recording directory to draw from instead of random data")
+    parser.add_argument('--replay', metavar='DAY', help="plot a recorded day (YYYY-MM-DD) from --history; "
+                                                       "--strikes gives the low and high strike")
+    parser.add_argument('--max-points', type=int, default=2000, help="points drawn per strike by --replay")
+    args = parser.parse_args()
+    if args.replay and not args.history:
+        parser.error("--replay needs --history")
 
-# Display the plot
-plt.tight_layout()
-plt.show()
\ No newline at end of file
+    history = OIHistory(args.history) if args.history else None
+    if args.replay:
+        plot_recorded_day(history, args.replay, min(args.strikes), max(args.strikes), args.max_points)
+    else:
+        LiveOIPlot(args.strikes, window=args.window, interval=args.interval).run(history)
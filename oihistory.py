@@ -0,0 +1,141 @@
+import argparse
+import datetime
+import os
+import random
+import time
+import numpy as np
+
+# One record per strike per tick
+OI_DTYPE = np.dtype([('time', '<f8'), ('oi', '<i8')])
+
+# Function to name the trading day an epoch timestamp falls on (local time)
+def day_of(timestamp):
+    return datetime.date.fromtimestamp(timestamp).isoformat()
+
+# Append-only on-disk history of fixed-width records, one file per key per day:
+#
+#     <root>/<YYYY-MM-DD>/<key>.bin
+#
+# Records are written in time order, so a reader memory-maps only the files for the
+# keys it wants and binary-searches the time column; nothing else is read from disk.
+class ColumnLog:
+    def __init__(self, root, dtype):
+        self.root = root
+        self.dtype = np.dtype(dtype)
+        self._files = {}
+
+    def _path(self, day, key):
+        return os.path.join(self.root, day, f'{key}.bin')
+
+    def _file(self, day, key):
+        f = self._files.get((day, key))
+        if f is None:
+            os.makedirs(os.path.join(self.root, day), exist_ok=True)
+            f = self._files[(day, key)] = open(self._path(day, key), 'ab')
+        return f
+
+    # Append records (anything np.asarray accepts for this dtype) under `key`
+    def append(self, key, rows):
+        rows = np.asarray(rows, dtype=self.dtype)
+        if rows.ndim == 0:
+            rows = rows.reshape(1)
+        day = day_of(rows['time'][0])
+        if day != day_of(rows['time'][-1]):
+            # Batch spans midnight: split it so each day's file stays self-contained
+            days = np.array([day_of(t) for t in rows['time']])
+            for d in np.unique(days):
+                self._file(d, key).write(rows[days == d].tobytes())
+            return
+        self._file(day, key).write(rows.tobytes())
+
+    def flush(self):
+        for f in self._files.values():
+            f.flush()
+
+    # Close handles of days other than `keep_day`, e.g. after midnight
+    def close(self, keep_day=None):
+        for (day, key) in list(self._files):
+            if day != keep_day:
+                self._files.pop((day, key)).close()
+
+    def days(self):
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(d for d in os.listdir(self.root) if os.path.isdir(os.path.join(self.root, d)))
+
+    def keys(self, day):
+        directory = os.path.join(self.root, day)
+        if not os.path.isdir(directory):
+            return []
+        return [name[:-4] for name in os.listdir(directory) if name.endswith('.bin')]
+
+    # Records of `key` on `day` with start <= time < end, as a read-only memory-mapped view
+    def read(self, day, key, start=None, end=None):
+        path = self._path(day, key)
+        count = os.path.getsize(path) // self.dtype.itemsize if os.path.exists(path) else 0
+        if count == 0:
+            return np.empty(0, dtype=self.dtype)
+        # A writer may be mid-record; only whole records are mapped
+        records = np.memmap(path, dtype=self.dtype, mode='r', shape=(count,))
+        times = records['time']
+        lo = 0 if start is None else np.searchsorted(times, start, side='left')
+        hi = count if end is None else np.searchsorted(times, end, side='left')
+        return records[lo:hi]
+
+    # Last n records of `key` on `day`
+    def tail(self, day, key, n):
+        records = self.read(day, key)
+        return records[max(0, len(records) - n):]
+
+# Per-strike open interest history on top of ColumnLog
+class OIHistory:
+    def __init__(self, root):
+        self.log = ColumnLog(root, OI_DTYPE)
+
+    # Record one tick of {strike: oi}
+    def record(self, timestamp, oi_by_strike):
+        for strike, oi in oi_by_strike.items():
+            self.log.append(strike, (timestamp, oi))
+        self.log.flush()
+
+    def strikes(self, day):
+        return sorted(int(key) for key in self.log.keys(day))
+
+    # {strike: records} for every recorded strike in [strike_low, strike_high] on `day`
+    def load(self, day, strike_low=None, strike_high=None, start=None, end=None):
+        return {
+            strike: self.log.read(day, strike, start, end)
+            for strike in self.strikes(day)
+            if (strike_low is None or strike >= strike_low) and (strike_high is None or strike <= strike_high)
+        }
+
+    # (time, {strike: oi}) of the newest tick recorded today for the given strikes, leaving
+    # out strikes with nothing recorded at that time; (None, {}) before the first record
+    def latest(self, strikes, day=None):
+        day = day or day_of(time.time())
+        tails = [(strike, self.log.tail(day, strike, 1)) for strike in strikes]
+        tails = [(strike, records[0]) for strike, records in tails if len(records)]
+        if not tails:
+            return None, {}
+        timestamp = max(float(record['time']) for _, record in tails)
+        return timestamp, {strike: int(record['oi']) for strike, record in tails if record['time'] == timestamp}
+
+# Headless recorder: sample open interest for each strike on a fixed clock and append it
+def record(root, strikes, interval, generate):
+    history = OIHistory(root)
+    next_tick = time.monotonic()
+    while True:
+        now = time.time()
+        history.record(now, {strike: generate(strike) for strike in strikes})
+        history.log.close(keep_day=day_of(now))
+        next_tick += interval
+        time.sleep(max(0.0, next_tick - time.monotonic()))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Record open interest per strike to disk")
+    parser.add_argument('--root', default='oi_history')
+    parser.add_argument('--strikes', type=int, nargs='+', default=[23000, 24000])
+    parser.add_argument('--interval', type=float, default=1.0)
+    args = parser.parse_args()
+
+    record(args.root, args.strikes, args.interval, lambda strike: random.randint(1000, 5000))
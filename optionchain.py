@@ -0,0 +1,98 @@
+import numpy as np
+
+# Windows (seconds) over which the OI change rate columns are measured
+OI_RATE_WINDOWS = (60, 300)
+
+# Function to name the OI change-per-minute column of one side and window
+def oi_rate_column(side, window):
+    return f'{side} OI Rate {window // 60}m'
+
+# Function to list one side's columns, in display order
+def _side_columns(side):
+    rates = tuple(oi_rate_column(side, window) for window in OI_RATE_WINDOWS)
+    return (f'{side} OI', f'{side} ChangeInOI') + rates + (f'{side} Price',)
+
+# Columns of the option chain table, in display order
+OPTION_CHAIN_COLUMNS = _side_columns('Call') + ('Strike Price',) + _side_columns('Put')
+
+# Columns a tick supplies (the OI rates come from analytics.OIMomentum); the rest are derived by the store
+TICK_COLUMNS = ('Call OI', 'Call Price', 'Put OI', 'Put Price') + tuple(
+    oi_rate_column(side, w) for side in ('Call', 'Put') for w in OI_RATE_WINDOWS)
+
+# Column-oriented option chain keyed by strike.
+#
+# Each column is one NumPy array aligned to the sorted strikes. ChangeInOI is derived
+# from the OI recorded at the store's first tick rather than generated separately, and
+# every cell remembers the version it last changed at so a client holding version v
+# can be sent only the cells that moved since.
+#
+# That opening OI is only kept in memory, not recorded: ChangeInOI is measured from
+# the session open only when the process starts before it. A restart, or a new ticker
+# under serve.py, mid-session measures it from its own first tick instead, and a
+# process left running into the next session keeps the previous session's open.
+class OptionChainStore:
+    def __init__(self, strike_prices):
+        self.strikes = np.array(sorted(strike_prices), dtype=np.int64)
+        self.row_of = {int(strike): i for i, strike in enumerate(self.strikes)}
+        n = len(self.strikes)
+        self._columns = {
+            'Call OI': np.zeros(n, dtype=np.int64),
+            'Call ChangeInOI': np.zeros(n, dtype=np.int64),
+            'Call Price': np.zeros(n),
+            'Strike Price': self.strikes,
+            'Put OI': np.zeros(n, dtype=np.int64),
+            'Put ChangeInOI': np.zeros(n, dtype=np.int64),
+            'Put Price': np.zeros(n)
+        }
+        self._columns.update({name: np.zeros(n) for name in TICK_COLUMNS if name not in self._columns})
+        self._open_oi = {'Call': None, 'Put': None}
+        self._changed_at = {name: np.zeros(n, dtype=np.int64) for name in OPTION_CHAIN_COLUMNS}
+        self.version = 0
+
+    def __len__(self):
+        return len(self.strikes)
+
+    # Read-only view of one column
+    def column(self, name):
+        view = self._columns[name].view()
+        view.flags.writeable = False
+        return view
+
+    # Apply one tick: `values` maps each of TICK_COLUMNS to an array aligned to self.strikes
+    def update(self, values):
+        new = {name: np.asarray(values[name]) for name in TICK_COLUMNS}
+        for side in ('Call', 'Put'):
+            if self._open_oi[side] is None:
+                self._open_oi[side] = new[f'{side} OI'].astype(np.int64)
+            new[f'{side} ChangeInOI'] = new[f'{side} OI'] - self._open_oi[side]
+
+        version = self.version + 1
+        for name, new_values in new.items():
+            column = self._columns[name]
+            changed = column != new_values
+            self._changed_at[name][changed] = version
+            column[changed] = new_values[changed]
+        self.version = version
+
+    # Version at which any cell of column `name` last changed
+    def column_version(self, name):
+        return int(self._changed_at[name].max(initial=0))
+
+    # Whole table, or the rows at indices `rows` in that order, as DataTable records
+    def records(self, rows=None):
+        columns = [(self._columns[name] if rows is None else self._columns[name][rows]).tolist()
+                   for name in OPTION_CHAIN_COLUMNS]
+        return [dict(zip(OPTION_CHAIN_COLUMNS, row)) for row in zip(*columns)]
+
+    # Cells changed after `version` as (row, column, value) triples. With `rows`, only
+    # those rows are looked at and each change's row is its position in `rows`.
+    def changes_since(self, version, rows=None):
+        changes = []
+        for name in OPTION_CHAIN_COLUMNS:
+            changed_at, column = self._changed_at[name], self._columns[name]
+            if rows is not None:
+                changed_at, column = changed_at[rows], column[rows]
+            positions = np.flatnonzero(changed_at > version)
+            values = column[positions].tolist()
+            changes.extend(zip(positions.tolist(), [name] * len(positions), values))
+        return changes
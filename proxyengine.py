@@ -0,0 +1,136 @@
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+import requests
+from requests.adapters import HTTPAdapter
+from ttlcache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# Bytes read from the upstream socket per rewrite step
+CHUNK_SIZE = 16 * 1024
+
+# Function to pick the text encoding of a response; HTML without a declared charset is
+# treated as UTF-8 rather than the ISO-8859-1 that requests assumes for text/*
+def response_encoding(response):
+    if 'charset' in response.headers.get('Content-Type', '').lower():
+        return response.encoding
+    return 'utf-8'
+
+# Fetches upstream pages through a pooled session and caches the transformed result.
+#
+# `transform(chunks, encoding)` takes an iterable of raw byte chunks and yields the
+# rewritten page as text chunks, so a first viewer can be streamed the page while it
+# is still downloading.
+#
+# - Fresh hits (younger than `ttl`) are served from memory.
+# - Stale hits (younger than `stale_ttl`) are served immediately while one background
+#   fetch revalidates them (stale-while-revalidate).
+# - Concurrent misses for the same URL are coalesced onto a single upstream request.
+class CachedFetcher:
+    def __init__(self, transform, ttl=60, stale_ttl=600, timeout=(3.05, 15),
+                 max_workers=4, max_entries=32, session=None):
+        self.transform = transform
+        self.ttl = ttl
+        self.timeout = timeout
+        self.cache = TTLCache(maxsize=max_entries, ttl=stale_ttl)
+        self.upstream_fetches = 0
+
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+        self.session = session
+
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='proxy-fetch')
+        self._inflight = {}
+        self._lock = threading.Lock()
+
+    # Rewritten text chunks of the page at `url`, fed straight from the upstream socket
+    def _fetch_chunks(self, url):
+        with self.session.get(url, timeout=self.timeout, stream=True) as response:
+            response.raise_for_status()
+            yield from self.transform(response.iter_content(CHUNK_SIZE), response_encoding(response))
+
+    # Register a new in-flight fetch for `url`; returns (future, True) for the caller that
+    # must perform it, or the existing (future, False) to wait on
+    def _claim(self, url):
+        with self._lock:
+            future = self._inflight.get(url)
+            if future is not None:
+                return future, False
+            future = Future()
+            future.add_done_callback(self._log_failure)
+            self._inflight[url] = future
+            self.upstream_fetches += 1
+            return future, True
+
+    def _release(self, url):
+        with self._lock:
+            self._inflight.pop(url, None)
+
+    # Generator that streams the page to the caller and fills the cache once it is complete
+    def _stream_and_store(self, url, future):
+        parts = []
+        try:
+            for chunk in self._fetch_chunks(url):
+                parts.append(chunk)
+                yield chunk
+        except BaseException as e:
+            # Includes GeneratorExit when the viewer disconnects mid-page
+            future.set_exception(e if isinstance(e, Exception) else requests.ConnectionError("viewer went away"))
+            raise
+        else:
+            body = ''.join(parts)
+            self.cache.set(url, body)
+            future.set_result(body)
+        finally:
+            self._release(url)
+
+    # Future for the page at `url`, fetched on the pool unless a fetch is already in flight
+    def _start_fetch(self, url):
+        future, leader = self._claim(url)
+        if leader:
+            def run():
+                try:
+                    for _ in self._stream_and_store(url, future):
+                        pass
+                except Exception:
+                    pass  # already recorded on the future
+            self._executor.submit(run)
+        return future
+
+    @staticmethod
+    def _log_failure(future):
+        if future.exception() is not None:
+            logger.warning("upstream fetch failed: %s", future.exception())
+
+    # Transformed page for `url`; only blocks when nothing (not even a stale copy) is cached
+    def get(self, url):
+        return ''.join(self.stream(url))
+
+    # Transformed page for `url` as an iterator of text chunks. A cached page comes back
+    # whole; on a miss the first caller streams it from upstream as it downloads and
+    # concurrent callers wait for that same download.
+    def stream(self, url):
+        body, age = self.cache.get_with_age(url)
+        if age is not None:
+            if age > self.ttl:
+                self._start_fetch(url)
+            return iter([body])
+
+        future, leader = self._claim(url)
+        if leader:
+            return self._stream_and_store(url, future)
+        return self._join(url, future)
+
+    # Generator yielding the page once the fetch we joined completes, so a failure is
+    # raised on the first next() exactly as it is for the caller streaming the fetch
+    def _join(self, url, future):
+        try:
+            body = future.result()
+        except Exception:
+            # The download we joined was abandoned or failed; try once more on our own
+            body = self._start_fetch(url).result()
+        yield body
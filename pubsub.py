@@ -0,0 +1,75 @@
+import json
+import threading
+from collections import deque
+from flask import Response
+
+# Seconds between keep-alive comments on an idle event stream
+KEEPALIVE_SECONDS = 15
+
+# One subscriber's mailbox. It is bounded: a client that falls behind loses its oldest
+# undelivered messages rather than holding up the publisher or growing without limit.
+class Subscription:
+    def __init__(self, maxsize):
+        self._messages = deque(maxlen=maxsize)
+        self._ready = threading.Condition()
+
+    def put(self, message):
+        with self._ready:
+            self._messages.append(message)
+            self._ready.notify()
+
+    # Next message, or None if nothing arrived within `timeout` seconds
+    def get(self, timeout=None):
+        with self._ready:
+            if not self._messages:
+                self._ready.wait(timeout)
+            return self._messages.popleft() if self._messages else None
+
+# Fans each published message out to every current subscriber
+class Broadcaster:
+    def __init__(self, queue_size=32):
+        self.queue_size = queue_size
+        self._subscribers = set()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._subscribers)
+
+    def subscribe(self):
+        subscription = Subscription(self.queue_size)
+        with self._lock:
+            self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def publish(self, message):
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscription in subscribers:
+            subscription.put(message)
+
+# Function to encode one Server-Sent Event; done once per tick, not once per client
+def sse_message(event_id, data):
+    return f"id: {event_id}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+
+# Function to expose a broadcaster as a text/event-stream route on a Flask server
+def add_sse_route(server, broadcaster, route='/stream'):
+    def stream():
+        subscription = broadcaster.subscribe()
+
+        def events():
+            try:
+                yield "retry: 2000\n\n"
+                while True:
+                    message = subscription.get(timeout=KEEPALIVE_SECONDS)
+                    yield ": keep-alive\n\n" if message is None else message
+            finally:
+                broadcaster.unsubscribe(subscription)
+
+        return Response(events(), mimetype='text/event-stream',
+                        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+    server.add_url_rule(route, 'sse_stream', stream)
@@ -0,0 +1,95 @@
+import datetime
+import numpy as np
+
+# Fixed-capacity, array-backed ring buffer of rows with named float columns.
+#
+# Every row is written twice, at slot i and at slot i + capacity, so the most
+# recent n rows always sit in one contiguous block of the backing array. That
+# makes append O(1) and lets window() hand out plain NumPy views (no copy,
+# no wrap-around stitching) that charting code can read directly.
+class RingBuffer:
+    def __init__(self, capacity, columns, dtype=np.float64):
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self.columns = tuple(columns)
+        self._column_index = {name: i for i, name in enumerate(self.columns)}
+        self._data = np.zeros((2 * capacity, len(self.columns)), dtype=dtype)
+        # Rows ever appended. It doubles as a monotonic sequence number and is the only
+        # field append() publishes, so a reader that reads it once sees a consistent buffer.
+        self.count = 0
+
+    def __len__(self):
+        return min(self.count, self.capacity)
+
+    def append(self, row):
+        i = self.count % self.capacity
+        self._data[i] = row
+        self._data[i + self.capacity] = row
+        self.count += 1
+
+    # Append many rows at once, e.g. history read back from disk; only the last
+    # `capacity` of them are kept
+    def extend(self, rows):
+        rows = np.asarray(rows)
+        kept = rows[len(rows) - min(len(rows), self.capacity):]
+        slots = (self.count + len(rows) - len(kept) + np.arange(len(kept))) % self.capacity
+        self._data[slots] = kept
+        self._data[slots + self.capacity] = kept
+        self.count += len(rows)
+
+    def _view(self, count, n):
+        n = max(0, min(n, count, self.capacity))
+        end = count % self.capacity + self.capacity
+        view = self._data[end - n:end]
+        view.flags.writeable = False
+        return view
+
+    # Last n rows (all stored rows if n is None) as a read-only (n, columns) view, oldest first
+    def window(self, n=None):
+        count = self.count
+        return self._view(count, self.capacity if n is None else n)
+
+    # Rows appended after sequence number `seq` (at most `limit` of them) and the new sequence number
+    def since(self, seq, limit=None):
+        count = self.count
+        n = count - seq
+        if limit is not None:
+            n = min(n, limit)
+        return self._view(count, n), count
+
+    # Rows with start <= time < end (either bound may be None) as a read-only view; the
+    # `time` column must be appended in order
+    def between(self, start=None, end=None, column='time'):
+        rows = self.window()
+        times = rows[:, self._column_index[column]]
+        lo = 0 if start is None else np.searchsorted(times, start, side='left')
+        hi = len(rows) if end is None else np.searchsorted(times, end, side='left')
+        return rows[lo:hi]
+
+    # Overwrite the most recent row in place, e.g. a bar that is still being built
+    def update_last(self, row):
+        i = (self.count - 1) % self.capacity
+        self._data[i] = row
+        self._data[i + self.capacity] = row
+
+    # Last n values of one column as a read-only view
+    def column(self, name, n=None):
+        return self.window(n)[:, self._column_index[name]]
+
+    # Most recent row as a {column: value} dict, or None when empty
+    def last(self):
+        if self.count == 0:
+            return None
+        return dict(zip(self.columns, self.window(1)[0].tolist()))
+
+# Offset that turns epoch seconds into naive local wall-clock time for display
+_LOCAL_UTC_OFFSET = datetime.datetime.now().astimezone().utcoffset().total_seconds()
+
+# Function to convert an array of epoch seconds to local datetime64 values for plotting
+def as_local_datetimes(seconds):
+    return ((np.asarray(seconds) + _LOCAL_UTC_OFFSET) * 1000).astype('datetime64[ms]')
+
+# Function to convert local datetimes (datetime64 or ISO strings, e.g. a plotly axis range) back to epoch seconds
+def as_epoch_seconds(datetimes):
+    return np.asarray(datetimes, dtype='datetime64[ms]').astype(np.int64) / 1000 - _LOCAL_UTC_OFFSET
@@ -0,0 +1,167 @@
+import argparse
+import importlib
+import logging
+import multiprocessing
+import os
+import shutil
+import signal
+import socket
+import sys
+import tempfile
+import threading
+import tickhistory
+from sharedstate import SharedTickStore
+
+# Production launcher for the dashboards: one ticker process advances the market data
+# into a shared tick store, and N web worker processes serve the app from that store,
+# so every worker shows the same histories.
+#
+#     python serve.py str --workers 4 --port 8050
+#     python serve.py itm:app --server gunicorn --threads 8
+#
+# Servers: 'gunicorn' (gthread workers, if installed), 'prefork' (built in: N forked
+# werkzeug servers sharing one listening socket; POSIX only) and 'waitress' (one
+# multi-threaded worker, for platforms without fork). 'auto' picks the first available.
+
+logger = logging.getLogger('serve')
+
+# Function to load the WSGI callable for "module" or "module:attr"; a Dash app serves its Flask server
+def load_wsgi(spec):
+    module, _, attr = spec.partition(':')
+    app = getattr(importlib.import_module(module), attr or 'app')
+    return getattr(app, 'server', app)
+
+# Ticker process: importing the app as the ticker creates the shared store and starts the engine.
+# It stops on the launcher's SIGTERM (Ctrl-C is left to the launcher) and writes out any
+# tick history still pending.
+def run_ticker(spec, store):
+    os.environ.update(DASHBOARD_ROLE='ticker', STATE_STORE=store)
+    load_wsgi(spec)
+    stop = threading.Event()
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, lambda signum, frame: stop.set())
+    stop.wait()
+    tickhistory.close_all()
+
+def available_servers():
+    servers = []
+    try:
+        import gunicorn  # noqa: F401
+        servers.append('gunicorn')
+    except ImportError:
+        pass
+    if hasattr(os, 'fork'):
+        servers.append('prefork')
+    try:
+        import waitress  # noqa: F401
+        servers.append('waitress')
+    except ImportError:
+        pass
+    return servers
+
+def serve_gunicorn(spec, host, port, workers, threads):
+    from gunicorn.app.base import BaseApplication
+
+    class Application(BaseApplication):
+        def load_config(self):
+            self.cfg.set('bind', f'{host}:{port}')
+            self.cfg.set('workers', workers)
+            self.cfg.set('worker_class', 'gthread')
+            self.cfg.set('threads', threads)
+            # Push streams hold a request open; keep-alives every 15 s stay well inside this
+            self.cfg.set('timeout', 60)
+
+        def load(self):
+            return load_wsgi(spec)
+
+    Application().run()
+
+def serve_waitress(spec, host, port, workers, threads):
+    import waitress
+    if workers > 1:
+        logger.warning("waitress runs a single worker process; using %d threads instead", workers * threads)
+    waitress.serve(load_wsgi(spec), host=host, port=port, threads=workers * threads)
+
+# Pre-forked werkzeug servers accepting on one shared socket; dead workers are replaced
+def serve_prefork(spec, host, port, workers, threads):
+    from werkzeug.serving import make_server
+
+    listener = socket.create_server((host, port), backlog=1024)
+    listener.set_inheritable(True)
+
+    def spawn():
+        pid = os.fork()
+        if pid:
+            return pid
+        signal.signal(signal.SIGINT, signal.SIG_DFL)
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        try:
+            logging.getLogger('werkzeug').setLevel(logging.WARNING)
+            server = make_server(host, port, load_wsgi(spec), threaded=True, fd=listener.fileno())
+            server.serve_forever()
+        finally:
+            os._exit(1)
+
+    children = {spawn() for _ in range(workers)}
+    logger.info("serving %s on http://%s:%d with %d prefork workers", spec, host, port, workers)
+    try:
+        while True:
+            pid, status = os.wait()
+            if pid in children:
+                logger.warning("worker %d exited (status %d); restarting it", pid, status)
+                children.discard(pid)
+                children.add(spawn())
+    finally:
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        listener.close()
+
+SERVERS = {
+    'gunicorn': serve_gunicorn,
+    'prefork': serve_prefork,
+    'waitress': serve_waitress
+}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run a dashboard with multiple workers over a shared tick store")
+    parser.add_argument('app', help="module or module:attr, e.g. str or itm:app")
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=int(os.environ.get("PORT", 5000)))
+    parser.add_argument('--workers', type=int, default=int(os.environ.get("WEB_CONCURRENCY", os.cpu_count() or 1)))
+    parser.add_argument('--threads', type=int, default=8, help="threads per worker (gunicorn, waitress)")
+    parser.add_argument('--server', choices=['auto'] + list(SERVERS), default='auto')
+    parser.add_argument('--store', help="shared tick store directory (default: a fresh one under /dev/shm)")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(name)s %(levelname)s %(message)s')
+
+    servers = available_servers()
+    server = servers[0] if args.server == 'auto' else args.server
+    if server not in servers:
+        parser.error(f"server {server!r} is not available here; choose from {', '.join(servers)}")
+
+    owns_store = args.store is None
+    store = args.store or tempfile.mkdtemp(prefix='livedashboard-',
+                                           dir='/dev/shm' if os.path.isdir('/dev/shm') else None)
+    ticker = multiprocessing.Process(target=run_ticker, args=(args.app, store), name='ticker', daemon=True)
+    ticker.start()
+
+    # SIGTERM unwinds like Ctrl-C so the ticker and the store are cleaned up either way
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    try:
+        SharedTickStore.open(store)
+        os.environ.update(DASHBOARD_ROLE='worker', STATE_STORE=store)
+        SERVERS[server](args.app, args.host, args.port, args.workers, args.threads)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        ticker.terminate()
+        ticker.join()
+        if owns_store:
+            shutil.rmtree(store, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
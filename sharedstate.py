@@ -0,0 +1,303 @@
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+import numpy as np
+from ringbuffer import RingBuffer
+from optionchain import OptionChainStore, OPTION_CHAIN_COLUMNS, TICK_COLUMNS
+from tickengine import TickEngine, HISTORY_COLUMNS, make_snapshot
+from marketdata import make_source
+from downsample import OHLCTiers, BAR_TIERS, BAR_COLUMNS, tier_capacity
+from tickhistory import TickRecorder
+from alerts import ALERT_COLUMNS
+
+logger = logging.getLogger(__name__)
+
+# Option chain columns by storage type; each group is one 2-D block of the store
+CHAIN_INT_COLUMNS = ('Call OI', 'Call ChangeInOI', 'Strike Price', 'Put OI', 'Put ChangeInOI')
+CHAIN_FLOAT_COLUMNS = tuple(name for name in TICK_COLUMNS if name not in CHAIN_INT_COLUMNS)
+
+# Slots of the int64 header; the float64 quote block holds time, spot and vix
+GENERATION, SEQ, CHAIN_VERSION = range(3)
+
+# Alerts kept in the shared fired-alert log, written by the ticker's AlertEngine
+ALERT_LOG_SIZE = 256
+
+# Function to list the arrays of a store: (name, dtype, shape)
+def _layout(meta):
+    n_strikes, n_stocks, n_chain = len(meta['strikes']), len(meta['stock_names']), len(meta['option_strike_prices'])
+    return [
+        ('header', np.int64, (3,)),
+        ('quote', np.float64, (3,)),
+        ('counts', np.int64, (n_strikes,)),
+        ('history', np.float64, (n_strikes, 2 * meta['depth'], len(HISTORY_COLUMNS))),
+        ('stocks', np.float64, (n_stocks,)),
+        ('chain_int', np.int64, (len(CHAIN_INT_COLUMNS), n_chain)),
+        ('chain_float', np.float64, (len(CHAIN_FLOAT_COLUMNS), n_chain)),
+        ('changed_at', np.int64, (len(OPTION_CHAIN_COLUMNS), n_chain)),
+        ('alerts', np.float64, (2 * ALERT_LOG_SIZE, len(ALERT_COLUMNS))),
+        ('alert_count', np.int64, (1,))
+    ] + [
+        entry
+        for seconds in BAR_TIERS
+        for entry in [(f'bars_{seconds}', np.float64, (n_strikes, 2 * tier_capacity(seconds), len(BAR_COLUMNS))),
+                       (f'bar_counts_{seconds}', np.int64, (n_strikes,))]
+    ]
+
+# Ring buffer whose rows and row count live in a shared block. The count is still the
+# only field append() publishes, so readers in other processes get the same guarantee.
+class SharedRingBuffer(RingBuffer):
+    def __init__(self, data, counter, columns):
+        self.capacity = data.shape[0] // 2
+        self.columns = tuple(columns)
+        self._column_index = {name: i for i, name in enumerate(self.columns)}
+        self._data = data
+        self._counter = counter
+
+    @property
+    def count(self):
+        return int(self._counter[0])
+
+    @count.setter
+    def count(self, value):
+        self._counter[0] = value
+
+# Option chain whose columns, change versions and version number live in a shared block
+class SharedOptionChainStore(OptionChainStore):
+    def __init__(self, chain_int, chain_float, changed_at, header):
+        self._columns = {name: chain_int[i] for i, name in enumerate(CHAIN_INT_COLUMNS)}
+        self._columns.update({name: chain_float[i] for i, name in enumerate(CHAIN_FLOAT_COLUMNS)})
+        self.strikes = self._columns['Strike Price']
+        self.row_of = {int(strike): i for i, strike in enumerate(self.strikes)}
+        self._changed_at = {name: changed_at[i] for i, name in enumerate(OPTION_CHAIN_COLUMNS)}
+        self._open_oi = {'Call': None, 'Put': None}
+        self._header = header
+
+    @property
+    def version(self):
+        return int(self._header[CHAIN_VERSION])
+
+    @version.setter
+    def version(self, value):
+        self._header[CHAIN_VERSION] = value
+
+# Tick state shared between one ticker process and any number of web workers.
+#
+# Everything lives in one memory-mapped file (put it on /dev/shm to keep it in RAM),
+# laid out from meta.json:
+#
+#     <path>/meta.json   instruments, history depth and tick interval
+#     <path>/state.bin   header, quote, per-strike history and bar rings, stocks, option chain,
+#                        fired alerts
+#
+# The ticker writes through writing(); workers map the file read-only. Writes to a
+# tick bump a generation counter to odd before and back to even after, so a reader
+# that sees the same even generation on both sides of a read knows it is untorn.
+class SharedTickStore:
+    def __init__(self, path, meta, mode):
+        self.path = path
+        self.meta = meta
+        self.strikes = list(meta['strikes'])
+        self.stock_names = list(meta['stock_names'])
+        self.interval = meta['interval']
+
+        layout = _layout(meta)
+        offsets, size = [], 0
+        for _, dtype, shape in layout:
+            offsets.append(size)
+            size += -(-np.dtype(dtype).itemsize * int(np.prod(shape)) // 8) * 8
+        self._map = np.memmap(os.path.join(path, 'state.bin'), dtype=np.uint8, mode=mode, shape=(size,))
+        self.arrays = {
+            name: np.ndarray(shape, dtype=dtype, buffer=self._map, offset=offset)
+            for (name, dtype, shape), offset in zip(layout, offsets)
+        }
+        header = self.arrays['header']
+        self.history = {
+            strike: SharedRingBuffer(self.arrays['history'][i], self.arrays['counts'][i:i + 1], HISTORY_COLUMNS)
+            for i, strike in enumerate(self.strikes)
+        }
+        self.bars = {
+            strike: OHLCTiers({
+                seconds: SharedRingBuffer(self.arrays[f'bars_{seconds}'][i],
+                                          self.arrays[f'bar_counts_{seconds}'][i:i + 1], BAR_COLUMNS)
+                for seconds in BAR_TIERS
+            })
+            for i, strike in enumerate(self.strikes)
+        }
+        self.option_chain = SharedOptionChainStore(self.arrays['chain_int'], self.arrays['chain_float'],
+                                                   self.arrays['changed_at'], header)
+        self.alert_log = SharedRingBuffer(self.arrays['alerts'], self.arrays['alert_count'], ALERT_COLUMNS)
+
+    # Create an empty store for the given instruments, replacing any previous one at `path`
+    @classmethod
+    def create(cls, path, strikes, stock_names, option_strike_prices, depth, interval):
+        meta = {
+            'strikes': list(strikes),
+            'stock_names': list(stock_names),
+            'option_strike_prices': sorted(option_strike_prices),
+            'depth': depth,
+            'interval': interval
+        }
+        os.makedirs(path, exist_ok=True)
+        meta_path = os.path.join(path, 'meta.json')
+        if os.path.exists(meta_path):
+            os.remove(meta_path)
+        store = cls(path, meta, 'w+')
+        store.arrays['chain_int'][CHAIN_INT_COLUMNS.index('Strike Price')] = meta['option_strike_prices']
+        store.arrays['header'][SEQ] = -1
+        store._map.flush()
+        # meta.json appears last and atomically: its presence means the store is ready
+        with open(meta_path + '.tmp', 'w') as f:
+            json.dump(meta, f)
+        os.replace(meta_path + '.tmp', meta_path)
+        return store
+
+    # Map an existing store read-only, waiting up to `timeout` seconds for it to be created
+    @classmethod
+    def open(cls, path, timeout=30.0):
+        meta_path = os.path.join(path, 'meta.json')
+        deadline = time.monotonic() + timeout
+        while not os.path.exists(meta_path):
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"no shared tick store at {path}")
+            time.sleep(0.05)
+        with open(meta_path) as f:
+            return cls(path, json.load(f), 'r')
+
+    @property
+    def seq(self):
+        return int(self.arrays['header'][SEQ])
+
+    # Write one tick: history and option chain updates happen inside the block
+    @contextmanager
+    def writing(self, seq, market):
+        header = self.arrays['header']
+        header[GENERATION] += 1
+        try:
+            yield
+            self.arrays['quote'][:] = (market.time, market.spot, market.vix)
+            self.arrays['stocks'][:] = market.stock_prices
+            header[SEQ] = seq
+        finally:
+            header[GENERATION] += 1
+
+    # Consistent Snapshot of the latest tick, or None before the first one
+    def read_snapshot(self):
+        header = self.arrays['header']
+        while True:
+            generation = int(header[GENERATION])
+            if generation % 2:
+                time.sleep(0.0005)
+                continue
+            seq = int(header[SEQ])
+            if seq < 0:
+                return None
+            now, spot, vix = self.arrays['quote'].tolist()
+            depth = self.meta['depth']
+            last = (self.arrays['counts'] - 1) % depth + depth
+            straddle = self.arrays['history'][np.arange(len(self.strikes)), last, HISTORY_COLUMNS.index('straddle')]
+            snapshot = make_snapshot(seq, now, spot, self.strikes, straddle, self.stock_names,
+                                     self.arrays['stocks'], self.option_chain, vix)
+            if int(header[GENERATION]) == generation:
+                return snapshot
+
+# Read-only engine for web workers: same interface as TickEngine (history, bars, option_chain,
+# snapshot(), add_listener()), backed by a SharedTickStore that a ticker process writes.
+# A poll thread notices new ticks and calls the listeners, so push streams work per worker.
+class FollowerEngine:
+    is_follower = True
+
+    def __init__(self, store, poll_interval=0.02):
+        self.store = store
+        self.strikes = store.strikes
+        self.stock_names = store.stock_names
+        self.interval = store.interval
+        self.history = store.history
+        self.bars = store.bars
+        self.option_chain = store.option_chain
+        self.poll_interval = poll_interval
+
+        self._listeners = []
+        self._snapshot = None
+        self._snapshot_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def add_listener(self, fn):
+        self._listeners.append(fn)
+
+    # Latest snapshot; rebuilt only when the ticker has published a newer tick
+    def snapshot(self):
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot.seq == self.store.seq:
+            return snapshot
+        with self._snapshot_lock:
+            if self._snapshot is None or self._snapshot.seq != self.store.seq:
+                self._snapshot = self.store.read_snapshot()
+            return self._snapshot
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='tick-follower', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        notified = None
+        while not self._stop.wait(self.poll_interval):
+            if self.store.seq == notified:
+                continue
+            snapshot = self.snapshot()
+            if snapshot is None:
+                continue
+            notified = snapshot.seq
+            for fn in self._listeners:
+                try:
+                    fn(snapshot)
+                except Exception:
+                    logger.exception("tick listener %r failed", fn)
+
+# Function to build the tick engine for an app, according to DASHBOARD_ROLE:
+#
+# - unset:    an in-process TickEngine (the single-process dev server)
+# - 'ticker': a TickEngine that also publishes to the shared store at STATE_STORE
+# - 'worker': a FollowerEngine that reads the shared store at STATE_STORE
+#
+# serve.py sets these for the processes it starts.
+#
+# When TICK_HISTORY names a directory, the engine that ticks (not a worker) persists its
+# history there and warm-starts from the last TICK_HISTORY_WARM_MINUTES of it (see tickhistory.py).
+def make_engine(stock_names, strikes, option_strike_prices, role=None, path=None):
+    role = role or os.environ.get("DASHBOARD_ROLE")
+    path = path or os.environ.get("STATE_STORE")
+    recorder = None
+    if os.environ.get("TICK_HISTORY") and role != 'worker':
+        recorder = TickRecorder(os.environ["TICK_HISTORY"],
+                                warm_minutes=float(os.environ.get("TICK_HISTORY_WARM_MINUTES", 60)))
+    if role is None:
+        engine = TickEngine(make_source(stock_names, strikes, option_strike_prices), recorder=recorder)
+    elif role == 'ticker':
+        interval = float(os.environ.get("TICK_INTERVAL", 1.0))
+        depth = int(os.environ.get("STRADDLE_HISTORY_DEPTH", 20000))
+        store = SharedTickStore.create(path, strikes, stock_names, option_strike_prices, depth, interval)
+        engine = TickEngine(make_source(stock_names, strikes, option_strike_prices), interval, depth, store,
+                            recorder)
+    elif role == 'worker':
+        store = SharedTickStore.open(path)
+        if (store.strikes, store.stock_names, store.meta['option_strike_prices']) != \
+                (list(strikes), list(stock_names), sorted(option_strike_prices)):
+            raise ValueError(f"shared tick store at {path} was created for different instruments")
+        engine = FollowerEngine(store)
+    else:
+        raise ValueError(f"Unknown DASHBOARD_ROLE {role!r}; use 'ticker' or 'worker'")
+    engine.start()
+    return engine
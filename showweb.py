@@ -1,38 +1,48 @@
+import os
+import itertools
 from flask import Flask, Response
 import requests
-from bs4 import BeautifulSoup
+from htmlrewrite import Rule, rewrite_stream
+from proxyengine import CachedFetcher
+from metrics import RequestMetrics
 
 app = Flask(__name__)
 
+# Per-route latency, payload size and allocations, at /metrics (see metrics.py)
+request_metrics = RequestMetrics(app)
+
+# Page shown in the iframe; overridable so the proxy can be pointed at a local stub
+TARGET_URL = os.environ.get('PROXY_TARGET_URL', 'https://www.moneycontrol.com/earnings-calendar')
+
+# Site chrome hidden in the embedded page
+PAGE_CHROME_RULES = [
+    Rule('div.clearfix.logo_wrapper', style='display:none;'),
+    Rule('div.bottom_nav', style='display:none;'),
+    Rule('div.header_desktop', style='display:none;'),
+    Rule('div.innerPageStrip.forMobNone', style='display:none;')
+]
+
+# Function to hide the site chrome while the page streams through
+def hide_page_chrome(chunks, encoding):
+    return rewrite_stream(chunks, PAGE_CHROME_RULES, encoding)
+
+# Pooled, cached fetcher shared by all viewers; the cache holds the already-rewritten page
+fetcher = CachedFetcher(hide_page_chrome,
+                        ttl=float(os.environ.get('PROXY_CACHE_TTL', 60)),
+                        stale_ttl=float(os.environ.get('PROXY_STALE_TTL', 600)))
+
 # Route to fetch and modify the website content
 @app.route('/proxy')
 def proxy():
-    target_url = 'https://www.moneycontrol.com/earnings-calendar'
-    
-    # Fetch the external website content
-    response = requests.get(target_url)
-    
-    # Parse the HTML content
-    soup = BeautifulSoup(response.content, 'html.parser')
-    
-    # Hide the div with class 'abc'
-    target_div = soup.find('div', class_='clearfix logo_wrapper')
-    if target_div:
-        target_div['style'] = 'display:none;'  # Hide the div
-
-        target_div_bottom = soup.find('div', class_='bottom_nav')
-    if target_div_bottom:
-        target_div_bottom['style'] = 'display:none;'  # Hide the div
-    
-        target_div_header_desktop = soup.find('div', class_='header_desktop')
-    if target_div_header_desktop:
-        target_div_header_desktop['style'] = 'display:none;'  # Hide the div
-
-        innerPageStrip_forMobNone = soup.find('div', class_='innerPageStrip forMobNone')
-    if innerPageStrip_forMobNone:
-        innerPageStrip_forMobNone['style'] = 'display:none;'  # Hide the div
-    # Return modified HTML content
-    return Response(str(soup), content_type='text/html')
+    try:
+        # Pull the first chunk here so connection errors still become a 502
+        with request_metrics.phase('first_chunk'):
+            chunks = fetcher.stream(TARGET_URL)
+            first = next(chunks, '')
+    except requests.RequestException as e:
+        return Response(f'Upstream fetch failed: {e}', status=502, content_type='text/plain')
+    # Stream the modified HTML content
+    return Response(itertools.chain([first], chunks), content_type='text/html; charset=utf-8')
 
 
 # Main app to load iframe
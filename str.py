@@ -2,20 +2,53 @@ import dash
 from dash import dcc, html, dash_table
 from dash.dependencies import Output, Input, State
 import plotly.graph_objs as go
-import pandas as pd
-import random
-import datetime
+from plotly.colors import sample_colorscale
+import json
+import math
 import os
+import numpy as np
+from ringbuffer import as_local_datetimes, as_epoch_seconds
+from downsample import lttb_indices, minmax_indices
+from sharedstate import make_engine
+from optionchain import OPTION_CHAIN_COLUMNS
+from tablequery import ColumnTable, page_count
+from tickengine import HISTORY_COLUMNS
+from metrics import CallbackMetrics
+from alerts import AlertEngine
+from pubsub import Broadcaster, add_sse_route, sse_message
 
 # Initialize the Dash app
 app = dash.Dash(__name__)
 
-# Initial prices for different strikes
+# Per-callback and per-route latency, payload size and allocations: Prometheus text at
+# /metrics, callback stats as JSON at /callback-stats (see metrics.py)
+callback_metrics = CallbackMetrics(app)
+
+# Headline strikes, with the classic straddle alerts
 strikes = [23000, 24000, 25000, 26000, 27000]
-prices = {strike: {'call': 200, 'put': 200, 'straddle': []} for strike in strikes}
 
-# Data storage for time series
-time_series = [datetime.datetime.now()]
+# Strikes that can be overlaid on the straddle chart: OVERLAY_STRIKES strikes either side
+# of the at-the-money strike, OVERLAY_STRIKE_STEP apart
+ATM_STRIKE = int(os.environ.get("STRADDLE_ATM_STRIKE", 23100))
+OVERLAY_STRIKE_STEP = int(os.environ.get("STRADDLE_OVERLAY_STEP", 50))
+OVERLAY_STRIKES = int(os.environ.get("STRADDLE_OVERLAY_STRIKES", 20))
+overlay_strikes = [ATM_STRIKE + i * OVERLAY_STRIKE_STEP for i in range(-OVERLAY_STRIKES, OVERLAY_STRIKES + 1)]
+
+# Every strike the engine keeps a history for, each with a fixed colour on the overlay chart
+tracked_strikes = sorted(set(strikes) | set(overlay_strikes))
+STRIKE_COLORS = dict(zip(tracked_strikes, sample_colorscale('Turbo', len(tracked_strikes))))
+
+# Default number of most recent points kept on the straddle chart; also the extendData maxPoints
+CHART_WINDOW = int(os.environ.get("STRADDLE_CHART_WINDOW", 60))
+
+# Chart windows a client can pick from, in ticks
+CHART_WINDOWS = sorted({CHART_WINDOW, 60, 300, 900, 3600})
+
+# Window value for the whole session, drawn from the OHLC bars once it outgrows the tick history
+SESSION_WINDOW = 0
+
+# Most points drawn per trace; longer ranges are downsampled (LTTB) or drawn from coarser bars
+CHART_MAX_POINTS = int(os.environ.get("STRADDLE_CHART_MAX_POINTS", 1000))
 
 # List of random stock names
 stock_names = ['RELIANCE', 'TCS', 'INFY', 'HDFCBANK', 'ICICIBANK', 'KOTAKBANK', 'SBIN', 'BAJFINANCE', 'HINDUNILVR', 'ITC']
@@ -23,146 +56,270 @@ stock_names = ['RELIANCE', 'TCS', 'INFY', 'HDFCBANK', 'ICICIBANK', 'KOTAKBANK',
 # Static list of strike prices for option chain
 option_strike_prices = [23000, 23050, 23100]
 
-# Function to generate random stock prices
-def generate_stock_data():
-    return pd.DataFrame({
-        'Stock Name': stock_names,
-        'Price': [round(random.uniform(1000, 3000), 2) for _ in stock_names]
-    })
+# Rows per page of the stock and option chain tables, which are paged, sorted and
+# filtered on the server so each tick only ships the page a browser is looking at
+TABLE_PAGE_SIZE = int(os.environ.get("DASHBOARD_TABLE_PAGE_SIZE", 20))
 
-# Function to generate random option chain data
-def generate_option_chain_data():
-    data = []
-    for strike in option_strike_prices:
-        data.append({
-            'Call OI': random.randint(1000, 5000),
-            'Call ChangeInOI': random.randint(-500, 500),
-            'Call Price': round(random.uniform(100, 300), 2),
-            'Strike Price': strike,
-            'Put OI': random.randint(1000, 5000),
-            'Put ChangeInOI': random.randint(-500, 500),
-            'Put Price': round(random.uniform(100, 300), 2)
-        })
-    return pd.DataFrame(data)
-
-# Function to generate random India VIX value
-def generate_india_vix():
-    return round(random.uniform(12.0, 18.0), 2)
-
-# App layout
-app.layout = html.Div([
-    html.Div([
-        html.H2("Market Dashboard", style={'color': 'white', 'margin': '0', 'padding': '10px'}),
-        html.Nav([
-            html.Ul([
-                html.Li(html.A("Straddle Chart", href="#", id='menu-straddle', n_clicks=0, style={'color': 'white', 'textDecoration': 'none'})),
-                html.Li(html.A("Stock Table", href="#", id='menu-stock', n_clicks=0, style={'color': 'white', 'textDecoration': 'none'})),
-                html.Li(html.A("Option Chain", href="#", id='menu-option-chain', n_clicks=0, style={'color': 'white', 'textDecoration': 'none'})),
-                html.Li(html.A("MoneyControl", href="#", id='menu-itm-prob', n_clicks=0, style={'color': 'white', 'textDecoration': 'none'}))
-            ], style={'listStyle': 'none', 'display': 'flex', 'gap': '20px', 'margin': '0'})
-        ], style={'padding': '10px'})
-    ], style={'backgroundColor': '#333', 'color': 'white', 'display': 'flex', 'justifyContent': 'space-between', 'alignItems': 'center'}),
-
-    html.H2("Real-Time Market Dashboard", style={'textAlign': 'center', 'marginTop': '20px'}),
-
-    html.Div([
-        html.Div([
-            dcc.Dropdown(
-                id='strike-price-dropdown',
-                options=[{'label': str(strike), 'value': strike} for strike in strikes],
-                value=23000,
-                style={'width': '90%', 'margin': '0 auto'}
-            ),
-            dcc.Graph(id='live-straddle-chart', style={'height': '60vh', 'width': '100%'}),
-            html.Div(id='alert-message', style={'textAlign': 'center', 'color': 'red', 'fontSize': 24})
-        ], id='straddle-section', style={'display': 'block', 'padding': '10px'}),
+# Alert rules evaluated server-side on every tick: the classic straddle 500/300 levels
+# for every strike, plus any rules in the JSON file named by ALERT_RULES (see alerts.py)
+alerts = AlertEngine()
+for strike in strikes:
+    alerts.add_rule(f'straddle:{strike}', 500, 'above',
+                    message=f"Alert: Straddle price for {strike} has reached or exceeded 500!")
+    alerts.add_rule(f'straddle:{strike}', 300, 'below',
+                    message=f"Alert: Straddle price for {strike} has dropped to or below 300!")
+if os.environ.get("ALERT_RULES"):
+    alerts.load_rules(os.environ["ALERT_RULES"])
+
+# Number of fired alerts listed in the alert feed
+ALERT_FEED_SIZE = 10
+
+# Function to generate the alert message for a strike's straddle price
+def straddle_alert(strike, straddle_price):
+    active = alerts.active(f'straddle:{strike}', straddle_price)
+    return active[0].message if active else ""
+
+# Function to format a fired alert for the alert feed
+def format_alert(alert):
+    return f"{str(as_local_datetimes([alert.time])[0])[11:19]}  {alert.rule.message}"
+
+# Background engine that advances all market data on a fixed clock; callbacks only read its snapshots.
+# MARKET_DATA_SOURCE picks the feed (see marketdata.SOURCES); under serve.py the engine
+# runs in a ticker process and this is a follower reading its shared store.
+engine = make_engine(stock_names, tracked_strikes, option_strike_prices)
+alerts.attach(engine)
+
+# Traces of the straddle chart, in order: the price, then its rolling analytics
+# (name, line style, y axis); straddle_series() gives their values from history rows
+STRADDLE_TRACES = [
+    ('Straddle Price', {}, 'y'),
+    ('EWMA', {'dash': 'dot'}, 'y'),
+    ('Rolling mean', {'dash': 'dash'}, 'y'),
+    ('Mean + 2σ', {'dash': 'dash', 'width': 1}, 'y'),
+    ('Mean - 2σ', {'dash': 'dash', 'width': 1}, 'y'),
+    ('Realized vol %', {'width': 1}, 'y2')
+]
+
+# Function to compute the straddle chart traces' y values from (n, HISTORY_COLUMNS) rows
+def straddle_series(rows):
+    column = {name: rows[:, i] for i, name in enumerate(HISTORY_COLUMNS)}
+    mean, std = column['mean'], column['std']
+    return [column['straddle'], column['ewma'], mean, mean + 2 * std, mean - 2 * std, column['rv']]
+
+# Function to get the latest value of every straddle chart trace for a strike (NaN as None, for JSON)
+def latest_series(strike):
+    latest = [float(series[-1]) for series in straddle_series(engine.history[strike].window(1))]
+    return [None if math.isnan(y) else y for y in latest]
+
+# 'poll' refreshes through dcc.Interval callbacks; 'push' streams every tick to the
+# browser over Server-Sent Events at /stream (applied by assets/push.js)
+TRANSPORT = os.environ.get("DASHBOARD_TRANSPORT", "poll")
+
+# Server-paged tables refreshed in push mode: name in the tick's 'tables' -> (section, version store)
+PUSHED_TABLES = {'stocks': ('stock-section', 'stock-table-tick'),
+                 'option_chain': ('option-chain-section', 'option-chain-table-tick')}
 
+# Milliseconds between chart refreshes: the poll interval, and in push mode how often a
+# downsampled chart, which ticks cannot simply be appended to, is redrawn
+REFRESH_INTERVAL = 5 * 1000
+broadcaster = Broadcaster()
+add_sse_route(app.server, broadcaster)
+
+# Sequence number of the newest alert already pushed. Under serve.py the ticker logs a
+# tick's alerts after workers may have seen the tick, so they go out with the next one.
+pushed_alert_seq = alerts.seq
+
+# Function to publish a tick to the push subscribers; encoded once and shared by all of them
+def publish_tick(snapshot):
+    global pushed_alert_seq
+    fired, pushed_alert_seq = alerts.since(pushed_alert_seq, ALERT_FEED_SIZE)
+    if not len(broadcaster):
+        return
+    broadcaster.publish(sse_message(snapshot.seq, {
+        'time': snapshot.time,
+        # Versions of the server-paged tables; assets/push.js asks for a table's page only
+        # when its version moved and the table is shown. Every stock price moves each tick.
+        'tables': {'stocks': snapshot.seq, 'option_chain': engine.option_chain.version},
+        'vix': snapshot.vix,
+        'straddles': {
+            strike: [str(as_local_datetimes([snapshot.time])[0]), latest_series(strike), straddle_alert(strike, price)]
+            for strike, price in snapshot.straddles.items()
+        },
+        'alerts': [format_alert(alert) for alert in fired]
+    }))
+
+engine.add_listener(publish_tick)
+
+# App layout, built on every page load so the tables start from the live store
+def serve_layout():
+    return html.Div([
         html.Div([
-            dash_table.DataTable(
-                id='live-stock-table',
-                columns=[
-                    {'name': 'Stock Name', 'id': 'Stock Name'},
-                    {'name': 'Price', 'id': 'Price'}
-                ],
-                data=generate_stock_data().to_dict('records'),
-                style_table={'width': '90%', 'margin': '0 auto'},
-                style_cell={'textAlign': 'center', 'padding': '5px'},
-                style_header={'backgroundColor': 'lightgrey', 'fontWeight': 'bold'},
-                style_data_conditional=[
-                    {
-                        'if': {'column_id': 'Price'},
-                        'backgroundColor': 'rgb(248, 248, 255)',
-                        'color': 'black'
-                    }
-                ]
-            )
-        ], id='stock-section', style={'display': 'none', 'padding': '10px'}),
+            html.H2("Market Dashboard", style={'color': 'white', 'margin': '0', 'padding': '10px'}),
+            html.Nav([
+                html.Ul([
+                    html.Li(html.A("Straddle Chart", href="#", id='menu-straddle', n_clicks=0, style={'color': 'white', 'textDecoration': 'none'})),
+                    html.Li(html.A("Stock Table", href="#", id='menu-stock', n_clicks=0, style={'color': 'white', 'textDecoration': 'none'})),
+                    html.Li(html.A("Option Chain", href="#", id='menu-option-chain', n_clicks=0, style={'color': 'white', 'textDecoration': 'none'})),
+                    html.Li(html.A("MoneyControl", href="#", id='menu-itm-prob', n_clicks=0, style={'color': 'white', 'textDecoration': 'none'}))
+                ], style={'listStyle': 'none', 'display': 'flex', 'gap': '20px', 'margin': '0'})
+            ], style={'padding': '10px'})
+        ], style={'backgroundColor': '#333', 'color': 'white', 'display': 'flex', 'justifyContent': 'space-between', 'alignItems': 'center'}),
+
+        html.H2("Real-Time Market Dashboard", style={'textAlign': 'center', 'marginTop': '20px'}),
 
         html.Div([
-            dash_table.DataTable(
-                id='option-chain-table',
-                columns=[
-                    {'name': 'Call OI', 'id': 'Call OI'},
-                    {'name': 'Call ChangeInOI', 'id': 'Call ChangeInOI'},
-                    {'name': 'Call Price', 'id': 'Call Price'},
-                    {'name': 'Strike Price', 'id': 'Strike Price'},
-                    {'name': 'Put OI', 'id': 'Put OI'},
-                    {'name': 'Put ChangeInOI', 'id': 'Put ChangeInOI'},
-                    {'name': 'Put Price', 'id': 'Put Price'}
-                ],
-                data=generate_option_chain_data().to_dict('records'),
-                style_table={'width': '90%', 'margin': '0 auto'},
-                style_cell={'textAlign': 'center', 'padding': '5px'},
-                style_header={'backgroundColor': 'lightgrey', 'fontWeight': 'bold'},
-                style_data_conditional=[
-                    {
-                        'if': {
-                            'filter_query': '{Call ChangeInOI} > 0',
-                            'column_id': 'Call ChangeInOI'
-                        },
-                        'color': 'green'
-                    },
-                    {
-                        'if': {
-                            'filter_query': '{Call ChangeInOI} < 0',
-                            'column_id': 'Call ChangeInOI'
+            html.Div([
+                # Each browser session keeps its own strike and window selection. One strike shows
+                # its straddle with analytics; several are overlaid, straddle prices only.
+                html.Div([
+                    dcc.Dropdown(
+                        id='strike-price-dropdown',
+                        options=[{'label': str(strike), 'value': strike} for strike in tracked_strikes],
+                        value=[23000],
+                        multi=True,
+                        clearable=False,
+                        persistence=True,
+                        persistence_type='session',
+                        style={'flex': '3'}
+                    ),
+                    html.Button(f'ATM ±{OVERLAY_STRIKES}', id='overlay-strikes-button', n_clicks=0),
+                    dcc.Dropdown(
+                        id='chart-window-dropdown',
+                        options=[{'label': f'Last {window} ticks', 'value': window} for window in CHART_WINDOWS]
+                        + [{'label': 'Whole session', 'value': SESSION_WINDOW}],
+                        value=CHART_WINDOW,
+                        clearable=False,
+                        persistence=True,
+                        persistence_type='session',
+                        style={'flex': '1'}
+                    )
+                ], style={'display': 'flex', 'gap': '10px', 'width': '90%', 'margin': '0 auto'}),
+                dcc.Graph(id='live-straddle-chart', style={'height': '60vh', 'width': '100%'}),
+                # Strikes, window and history sequence number the browser's chart was last brought up to,
+                # and whether push mode may extend it ('extend'), must redraw it ('redraw') or leaves it ('hold')
+                dcc.Store(id='straddle-chart-cursor'),
+                # Set by assets/push.js in push mode to redraw a downsampled chart
+                dcc.Store(id='straddle-redraw'),
+                html.Div(id='alert-message', style={'textAlign': 'center', 'color': 'red', 'fontSize': 24}),
+                # Latest alerts fired on any instrument, newest first
+                html.Div(id='alert-feed', style={'textAlign': 'center', 'color': 'darkred', 'whiteSpace': 'pre-line'}),
+                dcc.Store(id='alert-feed-cursor')
+            ], id='straddle-section', style={'display': 'block', 'padding': '10px'}),
+
+            html.Div([
+                dash_table.DataTable(
+                    id='live-stock-table',
+                    columns=[
+                        {'name': 'Stock Name', 'id': 'Stock Name'},
+                        {'name': 'Price', 'id': 'Price', 'type': 'numeric'}
+                    ],
+                    data=[],
+                    page_action='custom', page_current=0, page_size=TABLE_PAGE_SIZE,
+                    sort_action='custom', sort_mode='single', sort_by=[],
+                    filter_action='custom', filter_query='',
+                    style_table={'width': '90%', 'margin': '0 auto'},
+                    style_cell={'textAlign': 'center', 'padding': '5px'},
+                    style_header={'backgroundColor': 'lightgrey', 'fontWeight': 'bold'},
+                    style_data_conditional=[
+                        {
+                            'if': {'column_id': 'Price'},
+                            'backgroundColor': 'rgb(248, 248, 255)',
+                            'color': 'black'
+                        }
+                    ]
+                )
+            ], id='stock-section', style={'display': 'none', 'padding': '10px'}),
+
+            html.Div([
+                dash_table.DataTable(
+                    id='option-chain-table',
+                    columns=[{'name': name, 'id': name, 'type': 'numeric'} for name in OPTION_CHAIN_COLUMNS],
+                    data=[],
+                    page_action='custom', page_current=0, page_size=TABLE_PAGE_SIZE,
+                    sort_action='custom', sort_mode='single', sort_by=[],
+                    filter_action='custom', filter_query='',
+                    style_table={'width': '90%', 'margin': '0 auto'},
+                    style_cell={'textAlign': 'center', 'padding': '5px'},
+                    style_header={'backgroundColor': 'lightgrey', 'fontWeight': 'bold'},
+                    style_data_conditional=[
+                        {
+                            'if': {
+                                'filter_query': '{Call ChangeInOI} > 0',
+                                'column_id': 'Call ChangeInOI'
+                            },
+                            'color': 'green'
                         },
-                        'color': 'red'
-                    },
-                    {
-                        'if': {
-                            'filter_query': '{Put ChangeInOI} > 0',
-                            'column_id': 'Put ChangeInOI'
+                        {
+                            'if': {
+                                'filter_query': '{Call ChangeInOI} < 0',
+                                'column_id': 'Call ChangeInOI'
+                            },
+                            'color': 'red'
                         },
-                        'color': 'green'
-                    },
-                    {
-                        'if': {
-                            'filter_query': '{Put ChangeInOI} < 0',
-                            'column_id': 'Put ChangeInOI'
+                        {
+                            'if': {
+                                'filter_query': '{Put ChangeInOI} > 0',
+                                'column_id': 'Put ChangeInOI'
+                            },
+                            'color': 'green'
                         },
-                        'color': 'red'
-                    }
-                ]
-            )
-        ], id='option-chain-section', style={'display': 'none', 'padding': '10px'}),
+                        {
+                            'if': {
+                                'filter_query': '{Put ChangeInOI} < 0',
+                                'column_id': 'Put ChangeInOI'
+                            },
+                            'color': 'red'
+                        }
+                    ]
+                ),
+                # Option chain version, query and rows of the page the browser's table was last brought up to
+                dcc.Store(id='option-chain-cursor')
+            ], id='option-chain-section', style={'display': 'none', 'padding': '10px'}),
 
-        html.Div([
-            html.Iframe(
-                src='https://www.moneycontrol.com/earnings-calendar',
-                style={'width': '100%', 'height': '80vh', 'border': 'none'}
-            )
-        ], id='itm-prob-section', style={'display': 'none', 'padding': '10px'})
-    ]),
-
-    html.Div(id='india-vix-value', style={'textAlign': 'center', 'color': 'blue', 'fontSize': 24, 'marginTop': '20px'}),
-
-    dcc.Interval(
-        id='interval-component',
-        interval=5*1000,  # Update every 5 seconds
-        n_intervals=0
+            html.Div([
+                html.Iframe(
+                    src='https://www.moneycontrol.com/earnings-calendar',
+                    style={'width': '100%', 'height': '80vh', 'border': 'none'}
+                )
+            ], id='itm-prob-section', style={'display': 'none', 'padding': '10px'})
+        ]),
+
+        html.Div(id='india-vix-value', style={'textAlign': 'center', 'color': 'blue', 'fontSize': 24, 'marginTop': '20px'}),
+
+        dcc.Interval(
+            id='interval-component',
+            interval=REFRESH_INTERVAL,
+            n_intervals=0,
+            disabled=TRANSPORT == 'push'
+        ),
+        # Table versions, set by assets/push.js in push mode to refresh the server-paged tables
+        dcc.Store(id='stock-table-tick'),
+        dcc.Store(id='option-chain-table-tick'),
+        html.Div(id='push-stream', **{'data-stream': '/stream', 'data-tables': json.dumps(PUSHED_TABLES),
+                                      'data-redraw': REFRESH_INTERVAL})
+        if TRANSPORT == 'push' else html.Div()
+    ])
+
+app.layout = serve_layout
+
+# In push mode, tell assets/push.js which strikes' ticks to draw, how many to keep, and
+# whether the chart drawn for them may be extended. Until the server has drawn the chart
+# for the dropdowns' view, its cursor is for an older one and the chart is left alone.
+if TRANSPORT == 'push':
+    app.clientside_callback(
+        """
+        function(strikes, chartWindow, cursor) {
+            var drawn = cursor && cursor.window === chartWindow &&
+                JSON.stringify(cursor.strikes) === JSON.stringify([].concat(strikes || []));
+            window.dashboardPush.setView(strikes, chartWindow, drawn ? cursor.mode : 'hold');
+            return window.dash_clientside.no_update;
+        }
+        """,
+        Output('push-stream', 'children'),
+        Input('strike-price-dropdown', 'value'),
+        Input('chart-window-dropdown', 'value'),
+        Input('straddle-chart-cursor', 'data')
     )
-])
 
 # Callback to update India VIX value
 @app.callback(
@@ -170,7 +327,29 @@ app.layout = html.Div([
     Input('interval-component', 'n_intervals')
 )
 def update_india_vix(n_intervals):
-    return f"India VIX: {generate_india_vix()}"
+    return f"India VIX: {engine.snapshot().vix}"
+
+# Callback to overlay the whole strike range around the money
+@app.callback(
+    Output('strike-price-dropdown', 'value'),
+    Input('overlay-strikes-button', 'n_clicks'),
+    prevent_initial_call=True
+)
+def select_overlay_strikes(n_clicks):
+    return overlay_strikes
+
+# Callback to list the latest fired alerts; nothing is sent until a new one fires
+@app.callback(
+    [Output('alert-feed', 'children'),
+     Output('alert-feed-cursor', 'data')],
+    Input('interval-component', 'n_intervals'),
+    State('alert-feed-cursor', 'data')
+)
+def update_alert_feed(n, seen):
+    if seen is not None and seen == alerts.seq:
+        return dash.no_update, dash.no_update
+    latest, seq = alerts.since(0, ALERT_FEED_SIZE)
+    return '\n'.join(format_alert(alert) for alert in reversed(latest)), seq
 
 # Callback to toggle between sections
 @app.callback(
@@ -203,68 +382,298 @@ def toggle_sections(n_straddle, n_stock, n_option_chain, n_itm_prob, straddle_st
             return {'display': 'none', 'padding': '10px'}, {'display': 'none', 'padding': '10px'}, {'display': 'none', 'padding': '10px'}, {'display': 'block', 'padding': '10px'}
     return straddle_style, stock_style, option_chain_style, itm_prob_style
 
-# Function to simulate price updates and store straddle prices
-def update_prices_and_straddle(strike):
-    call_price = prices[strike]['call'] + random.uniform(-2, 2)
-    put_price = prices[strike]['put'] + random.uniform(-2, 2)
-    call_price = max(call_price, 0)
-    put_price = max(put_price, 0)
+# Column of the straddle price in history rows
+STRADDLE_COLUMN = HISTORY_COLUMNS.index('straddle')
+
+# Function to build the full straddle figure for a strike from (n, HISTORY_COLUMNS) rows
+def build_straddle_figure(selected_strike, straddle_data, uirevision=None):
+    fig = go.Figure()
+    x = as_local_datetimes(straddle_data[:, 0])
+    for (name, line, yaxis), y in zip(STRADDLE_TRACES, straddle_series(straddle_data)):
+        fig.add_trace(go.Scatter(
+            x=x,
+            y=y,
+            mode='lines+markers' if yaxis == 'y' and not line and len(x) <= 300 else 'lines',
+            line=line,
+            yaxis=yaxis,
+            name=f'{name} {selected_strike}' if name == 'Straddle Price' else name
+        ))
+    fig.update_layout(title=f'Live Straddle Price ({selected_strike} Strike)', xaxis_title='Time', yaxis_title='Price',
+                      yaxis2={'title': 'Realized vol %', 'overlaying': 'y', 'side': 'right', 'showgrid': False},
+                      showlegend=True, uirevision=uirevision)
+    return fig
+
+# Function to build the straddle figure from OHLC bars of `seconds` each
+def build_bars_figure(selected_strike, bars, seconds, uirevision=None):
+    fig = go.Figure()
+    x = as_local_datetimes(bars[:, 0])
+    fig.add_trace(go.Scatter(x=x, y=bars[:, 4], mode='lines', name=f'Straddle Price {selected_strike}'))
+    fig.add_trace(go.Scatter(x=x, y=bars[:, 2], mode='lines', line={'dash': 'dot', 'width': 1}, name='High'))
+    fig.add_trace(go.Scatter(x=x, y=bars[:, 3], mode='lines', line={'dash': 'dot', 'width': 1}, name='Low'))
+    label = f'{seconds}s' if seconds < 60 else f'{seconds // 60}m'
+    fig.update_layout(title=f'Straddle Price ({selected_strike} Strike, {label} bars)', xaxis_title='Time',
+                      yaxis_title='Price', showlegend=True, uirevision=uirevision)
+    return fig
+
+# Function to build the overlay figure: one WebGL line per strike from its (times, prices)
+def build_overlay_figure(selected_strikes, lines, uirevision=None):
+    fig = go.Figure()
+    for strike, (x, y) in zip(selected_strikes, lines):
+        fig.add_trace(go.Scattergl(x=as_local_datetimes(x), y=y, mode='lines', name=str(strike),
+                                   line={'color': STRIKE_COLORS[strike], 'width': 1}))
+    fig.update_layout(title=f'Live Straddle Prices ({len(selected_strikes)} Strikes)', xaxis_title='Time',
+                      yaxis_title='Price', showlegend=True, uirevision=uirevision)
+    return fig
+
+# Function to pick what is drawn of a strike's straddle for start <= time < end (None for
+# open ends): (None, rows) from the tick history while it reaches back far enough, else
+# (seconds, bars) from the finest bar tier that fits. Rows are not yet downsampled.
+def select_straddle(strike, start=None, end=None):
+    history = engine.history[strike]
+    if history.count <= history.capacity or (start is not None and history.window()[0, 0] <= start):
+        return None, history.between(start, end)
+    return engine.bars[strike].select(start, end, CHART_MAX_POINTS)
 
-    straddle_price = call_price + put_price
-    prices[strike]['call'] = call_price
-    prices[strike]['put'] = put_price
-    prices[strike]['straddle'].append(straddle_price)
+# Function to LTTB-downsample history rows on their straddle price past CHART_MAX_POINTS
+def downsample_rows(rows):
+    if len(rows) <= CHART_MAX_POINTS:
+        return rows
+    return rows[lttb_indices(rows[:, 0], rows[:, STRADDLE_COLUMN], CHART_MAX_POINTS)]
 
-    if len(prices[strike]['straddle']) > 60:
-        prices[strike]['straddle'] = prices[strike]['straddle'][-60:]
+# Function to build the straddle figure for start <= time < end (None for open ends)
+def render_straddle(strike, start=None, end=None, uirevision=None):
+    seconds, data = select_straddle(strike, start, end)
+    if seconds is None:
+        return build_straddle_figure(strike, downsample_rows(data), uirevision)
+    return build_bars_figure(strike, data, seconds, uirevision)
+
+# Function to build the figure for a client's whole chart window, and the history seq it covers
+def render_window(strike, chart_window, uirevision=None):
+    history = engine.history[strike]
+    if chart_window == SESSION_WINDOW:
+        seq = history.count
+        return render_straddle(strike, uirevision=uirevision), seq
+    straddle_data, seq = history.since(0, chart_window)
+    return build_straddle_figure(strike, downsample_rows(straddle_data), uirevision), seq
+
+# Function to get the overlay line of a strike, (times, prices), over its last `chart_window`
+# ticks up to history seq `seq`, or over a zoomed range. Lines are min-max decimated rather
+# than LTTB'd: with dozens of strikes per redraw, the vectorized pick keeps the callback cheap.
+def overlay_line(strike, chart_window, seq, zoom=None):
+    if zoom is None and chart_window != SESSION_WINDOW:
+        rows, latest = engine.history[strike].since(0, chart_window)
+        # The engine may have appended this strike's next tick since `seq` was read
+        rows = rows[:max(0, len(rows) - (latest - seq))]
+        x, y = rows[:, 0], rows[:, STRADDLE_COLUMN]
+    else:
+        seconds, data = select_straddle(strike, *(zoom or (None, None)))
+        x, y = data[:, 0], data[:, STRADDLE_COLUMN if seconds is None else 4]
+    keep = minmax_indices(y, CHART_MAX_POINTS)
+    return x[keep], y[keep]
+
+# Function to build the figure of a view (one strike with analytics, or several overlaid)
+# for its chart window or a zoomed range, and the history seq it covers
+def render_view(selected_strikes, chart_window, zoom=None, uirevision=None):
+    if len(selected_strikes) == 1:
+        if zoom is None:
+            return render_window(selected_strikes[0], chart_window, uirevision)
+        return render_straddle(selected_strikes[0], *zoom, uirevision=uirevision), engine.history[selected_strikes[0]].count
+    seq = engine.history[selected_strikes[0]].count
+    lines = [overlay_line(strike, chart_window, seq, zoom) for strike in selected_strikes]
+    return build_overlay_figure(selected_strikes, lines, uirevision), seq
+
+# Function to build the one extendData update that brings every trace of a view from
+# history seq `since` up to date, and the seq it reaches (no_update if nothing is new)
+def extend_view(selected_strikes, since, chart_window):
+    updates = [engine.history[strike].since(since, chart_window) for strike in selected_strikes]
+    # Strikes are appended one after another within a tick; any strike that is already a
+    # tick ahead of the others keeps its newest point for the next update
+    seq = min(latest for _, latest in updates)
+    new_points = [rows[:max(0, len(rows) - (latest - seq))] for rows, latest in updates]
+    if seq == since:
+        return dash.no_update, seq
+    if len(selected_strikes) == 1:
+        x = as_local_datetimes(new_points[0][:, 0])
+        return ({'x': [x] * len(STRADDLE_TRACES), 'y': straddle_series(new_points[0])},
+                list(range(len(STRADDLE_TRACES))), chart_window), seq
+    return ({'x': [as_local_datetimes(rows[:, 0]) for rows in new_points],
+             'y': [rows[:, STRADDLE_COLUMN] for rows in new_points]},
+            list(range(len(selected_strikes))), chart_window), seq
+
+# Function to tell whether a chart window is drawn downsampled (and so redrawn, not extended)
+def is_downsampled(chart_window):
+    return chart_window == SESSION_WINDOW or chart_window > CHART_MAX_POINTS
+
+# Function to read the x range a user zoomed to from relayoutData: (start, end) in epoch
+# seconds, None when the zoom was reset, False when the event did not touch the x axis
+def zoomed_range(relayout):
+    relayout = relayout or {}
+    if relayout.get('xaxis.autorange'):
+        return None
+    if 'xaxis.range[0]' in relayout:
+        bounds = [relayout['xaxis.range[0]'], relayout['xaxis.range[1]']]
+    elif 'xaxis.range' in relayout:
+        bounds = relayout['xaxis.range']
+    else:
+        return False
+    return tuple(as_epoch_seconds(bounds).tolist())
 
-    return straddle_price
+# Function to check whether a section is currently shown by toggle_sections
+def is_visible(style):
+    return (style or {}).get('display') != 'none'
 
-# Callback to update the graph and check for alerts
+# Callback to update the graph and check for alerts.
+# The full figure is only sent when the strikes or window change, the section is revealed,
+# the user zooms, or the client fell more than a chart window behind; otherwise only the
+# points appended since the client's cursor are streamed through extendData, for all the
+# selected strikes in one update. Windows too long to draw point by point are downsampled
+# and redrawn instead, and a zoomed chart is left alone until the zoom is reset. Nothing
+# is sent while hidden. The cursor's mode tells push mode which of these applies.
+# All view state is per client (the dropdowns and the cursor store); the callback only
+# reads the engine's shared history, which is never written from a request.
 @app.callback(
     [Output('live-straddle-chart', 'figure'),
-     Output('alert-message', 'children'),
-     Output('live-stock-table', 'data'),
-     Output('option-chain-table', 'data')],
+     Output('live-straddle-chart', 'extendData'),
+     Output('straddle-chart-cursor', 'data'),
+     Output('alert-message', 'children')],
     [Input('interval-component', 'n_intervals'),
-     Input('strike-price-dropdown', 'value')]
+     Input('strike-price-dropdown', 'value'),
+     Input('chart-window-dropdown', 'value'),
+     Input('straddle-section', 'style'),
+     Input('live-straddle-chart', 'relayoutData'),
+     Input('straddle-redraw', 'data')],
+    [State('straddle-chart-cursor', 'data')]
 )
-def update_dashboard(n, selected_strike):
-    global time_series
+def update_straddle_view(n, selected_strikes, chart_window, section_style, relayout, redraw, cursor):
+    if not is_visible(section_style):
+        return dash.no_update, dash.no_update, dash.no_update, dash.no_update
 
-    # Update prices and straddle for selected strike
-    straddle_price = update_prices_and_straddle(selected_strike)
+    if not isinstance(selected_strikes, list):
+        selected_strikes = [selected_strikes]
+    selected_strikes = [strike for strike in dict.fromkeys(selected_strikes) if strike in engine.history] or strikes[:1]
+    if chart_window not in CHART_WINDOWS and chart_window != SESSION_WINDOW:
+        chart_window = CHART_WINDOW
 
-    # Update time series
-    time_series.append(datetime.datetime.now())
-    if len(time_series) > 60:
-        time_series = time_series[-60:]
+    snapshot = engine.snapshot()
 
-    # Generate alert message
-    alert_message = ""
-    if straddle_price >= 500:
-        alert_message = f"Alert: Straddle price for {selected_strike} has reached or exceeded 500!"
-    elif straddle_price <= 300:
-        alert_message = f"Alert: Straddle price for {selected_strike} has dropped to or below 300!"
+    # Generate alert message: the first selected strike with an active alert
+    alert_message = next(filter(None, (straddle_alert(strike, snapshot.straddles[strike])
+                                       for strike in selected_strikes)), "")
 
     # Prepare line chart data for plotting
-    straddle_data = prices[selected_strike]['straddle']
-    fig = go.Figure()
-    fig.add_trace(go.Scatter(
-        x=time_series[-len(straddle_data):],
-        y=straddle_data,
-        mode='lines+markers',
-        name=f'Straddle Price {selected_strike}'
-    ))
-    fig.update_layout(title=f'Live Straddle Price ({selected_strike} Strike)', xaxis_title='Time', yaxis_title='Price', showlegend=True)
+    history = engine.history[selected_strikes[0]]
+    view = {'strikes': selected_strikes, 'window': chart_window}
+    uirevision = f"{'-'.join(map(str, selected_strikes))}-{chart_window}"
+    triggered = {t['prop_id'] for t in dash.callback_context.triggered}
+    same_view = cursor is not None and {k: cursor.get(k) for k in view} == view
+    zoom = cursor.get('range') if same_view else None
+    fig = extend = dash.no_update
+
+    if 'live-straddle-chart.relayoutData' in triggered:
+        new_zoom = zoomed_range(relayout)
+        if not same_view or new_zoom is False:
+            return dash.no_update, dash.no_update, dash.no_update, alert_message
+        zoom = new_zoom
+        with callback_metrics.phase('figure'):
+            fig, seq = render_view(selected_strikes, chart_window, zoom, uirevision)
+    elif zoom is not None and 'straddle-section.style' not in triggered:
+        # Leave a zoomed chart as the user zoomed it
+        return dash.no_update, dash.no_update, dash.no_update, alert_message
+    elif (not same_view or 'straddle-section.style' in triggered or is_downsampled(chart_window)
+            or history.count - cursor['seq'] > chart_window):
+        zoom = None
+        with callback_metrics.phase('figure'):
+            fig, seq = render_view(selected_strikes, chart_window, uirevision=uirevision)
+    else:
+        with callback_metrics.phase('extend'):
+            extend, seq = extend_view(selected_strikes, cursor['seq'], chart_window)
+
+    mode = 'hold' if zoom is not None else 'redraw' if is_downsampled(chart_window) else 'extend'
+    return fig, extend, dict(view, seq=seq, range=zoom, mode=mode), alert_message
+
+# Sort orders of the two tables' columns, shared by every client
+stock_table = ColumnTable()
+option_chain_table = ColumnTable()
+
+# Function to read a paged table's query, with the DataTable's defaults filled in
+def table_query(page_current, page_size, sort_by, filter_query):
+    return [page_current or 0, page_size or TABLE_PAGE_SIZE, sort_by or [], filter_query or '']
+
+# Callback to refresh the visible page of the stock table while it is shown
+@app.callback(
+    [Output('live-stock-table', 'data'),
+     Output('live-stock-table', 'page_count')],
+    [Input('interval-component', 'n_intervals'),
+     Input('stock-table-tick', 'data'),
+     Input('stock-section', 'style'),
+     Input('live-stock-table', 'page_current'),
+     Input('live-stock-table', 'page_size'),
+     Input('live-stock-table', 'sort_by'),
+     Input('live-stock-table', 'filter_query')]
+)
+def update_stock_view(n, tick, section_style, page_current, page_size, sort_by, filter_query):
+    if not is_visible(section_style):
+        return dash.no_update, dash.no_update
+    snapshot = engine.snapshot()
+    # Every price moves on every tick, so all columns share the tick's version
+    columns = stock_table.columns(snapshot.seq, lambda: {
+        'Stock Name': np.array([row['Stock Name'] for row in snapshot.stocks]),
+        'Price': np.array([row['Price'] for row in snapshot.stocks])
+    })
+    query = table_query(page_current, page_size, sort_by, filter_query)
+    with callback_metrics.phase('query'):
+        rows, matches = stock_table.query(columns, lambda name: snapshot.seq, *query)
+    return [snapshot.stocks[row] for row in rows.tolist()], page_count(matches, query[1])
+
+# Callback to refresh the visible page of the option chain while it is shown.
+# The first response for a page is the whole page; while the same rows stay on it,
+# each tick only patches the cells that changed since the version the client holds.
+@app.callback(
+    [Output('option-chain-table', 'data'),
+     Output('option-chain-table', 'page_count'),
+     Output('option-chain-cursor', 'data')],
+    [Input('interval-component', 'n_intervals'),
+     Input('option-chain-table-tick', 'data'),
+     Input('option-chain-section', 'style'),
+     Input('option-chain-table', 'page_current'),
+     Input('option-chain-table', 'page_size'),
+     Input('option-chain-table', 'sort_by'),
+     Input('option-chain-table', 'filter_query')],
+    [State('option-chain-cursor', 'data')]
+)
+def update_option_chain_view(n, tick, section_style, page_current, page_size, sort_by, filter_query, cursor):
+    if not is_visible(section_style):
+        return dash.no_update, dash.no_update, dash.no_update
+
+    chain = engine.option_chain
+    # Read the version before the cells so anything the engine changes meanwhile is resent next time
+    version = chain.version
+    query = table_query(page_current, page_size, sort_by, filter_query)
+    columns = {name: chain.column(name) for name in OPTION_CHAIN_COLUMNS}
+    with callback_metrics.phase('query'):
+        rows, matches = option_chain_table.query(columns, chain.column_version, *query)
+    pages = page_count(matches, query[1])
+    view = {'version': version, 'query': query, 'rows': rows.tolist(), 'pages': pages}
 
-    # Update stock table data
-    stock_data = generate_stock_data()
+    triggered = {t['prop_id'] for t in dash.callback_context.triggered}
+    if (cursor is None or 'option-chain-section.style' in triggered
+            or cursor['query'] != query or cursor['rows'] != view['rows']):
+        with callback_metrics.phase('records'):
+            return chain.records(rows), pages, view
 
-    # Update option chain data
-    option_chain_data = generate_option_chain_data()
+    with callback_metrics.phase('changes'):
+        changes = chain.changes_since(cursor['version'], rows)
+    pages_changed = pages != cursor['pages']
+    if not changes and not pages_changed:
+        return dash.no_update, dash.no_update, dash.no_update
+    if len(changes) > len(rows) * len(OPTION_CHAIN_COLUMNS) // 2:
+        with callback_metrics.phase('records'):
+            return chain.records(rows), pages, view
 
-    return fig, alert_message, stock_data.to_dict('records'), option_chain_data.to_dict('records')
+    patch = dash.Patch() if changes else dash.no_update
+    for row, column, value in changes:
+        patch[row][column] = value
+    return patch, pages if pages_changed else dash.no_update, view
 
 # Run the app
 if __name__ == "__main__":
@@ -0,0 +1,129 @@
+import math
+import re
+import threading
+import numpy as np
+
+# One clause of a DataTable filter_query, e.g. `{Call OI} >= 1000` or `{Stock Name} icontains "bank"`.
+# The table writes operators as symbols or words, optionally prefixed s (case-sensitive) or i.
+_CLAUSE = re.compile(r'\s*\{(?P<column>[^}]+)\}\s*(?P<case>[si]?)(?P<op>>=|<=|!=|<|>|=|ge|le|lt|gt|ne|eq'
+                     r'|contains|datestartswith)\s*(?P<value>.*?)\s*$')
+_OPERATORS = {'ge': '>=', 'le': '<=', 'lt': '<', 'gt': '>', 'ne': '!=', 'eq': '='}
+_STRING_OPERATORS = ('contains', 'datestartswith')
+
+# Comparisons a sorted column can answer by binary search: op -> (searchsorted side, bound)
+_RANGES = {'>=': ('left', 'lo'), '>': ('right', 'lo'), '<=': ('right', 'hi'), '<': ('left', 'hi')}
+
+# Function to parse a DataTable filter_query into (column, op, value, case_sensitive) clauses.
+# Clauses are joined with &&; anything this parser does not understand is ignored, as the
+# table would rather show too many rows than none. Unquoted values of comparisons are read
+# as numbers; string operators keep the text as typed, so `contains 1` looks for '1'.
+def parse_filter(filter_query):
+    clauses = []
+    for part in (filter_query or '').split(' && '):
+        match = _CLAUSE.match(part)
+        if match is None:
+            continue
+        op = _OPERATORS.get(match['op'], match['op'])
+        value = match['value']
+        if len(value) >= 2 and value[0] == value[-1] and value[0] in '"\'`':
+            value = value[1:-1].replace('\\' + value[0], value[0])
+        elif op not in _STRING_OPERATORS:
+            try:
+                value = float(value)
+            except ValueError:
+                pass
+        clauses.append((match['column'], op, value, match['case'] != 'i'))
+    return clauses
+
+# Function to evaluate one clause over a whole column, as a boolean mask
+def _clause_mask(values, op, value, case_sensitive):
+    if op in _STRING_OPERATORS or values.dtype.kind not in 'iuf':
+        text = values.astype(str)
+        value = str(value)
+        if not case_sensitive:
+            text, value = np.char.lower(text), value.lower()
+        if op == 'contains':
+            return np.char.find(text, value) >= 0
+        if op == 'datestartswith':
+            return np.char.startswith(text, value)
+        values = text
+    elif not isinstance(value, float):
+        # A number column compared with text matches nothing
+        return np.zeros(len(values), dtype=bool)
+    return {'=': values == value, '!=': values != value, '<': values < value, '<=': values <= value,
+            '>': values > value, '>=': values >= value}[op]
+
+# Server side of a DataTable with page_action, sort_action and filter_action 'custom'.
+#
+# The table is a mapping of equal-length column arrays, each with a version that moves
+# whenever the column changes. Each column's sort order (argsort) is built at most once
+# per version and shared by every client, so a request for one page of a sorted table
+# is a slice of that order: O(page). Filters on the sort column are answered by binary
+# search in the sorted values; any other filter costs one vectorized pass over its column.
+class ColumnTable:
+    def __init__(self):
+        self._sorted = {}           # column -> (version, order, values in that order)
+        self._columns = (None, None)
+        self._lock = threading.Lock()
+
+    # Columns for `version`, from build() at most once per version
+    def columns(self, version, build):
+        cached_version, columns = self._columns
+        if cached_version != version:
+            columns = build()
+            self._columns = (version, columns)
+        return columns
+
+    # (order, sorted values) of column `name` at `version`; the version is read before the
+    # values, so a column that moves meanwhile is simply re-sorted on the next request
+    def sorted_by(self, name, values, version):
+        cached = self._sorted.get(name)
+        if cached is None or cached[0] != version:
+            with self._lock:
+                cached = self._sorted.get(name)
+                if cached is None or cached[0] != version:
+                    order = np.argsort(values, kind='stable')
+                    cached = self._sorted[name] = (version, order, values[order])
+        return cached[1], cached[2]
+
+    # One page of the table: (row indices for the page, number of matching rows).
+    # `columns` maps names to arrays, `version_of(name)` gives a column's version, and the
+    # rest are the DataTable's own page_current, page_size, sort_by and filter_query.
+    def query(self, columns, version_of, page_current, page_size, sort_by=None, filter_query=''):
+        n = len(next(iter(columns.values())))
+        clauses = [clause for clause in parse_filter(filter_query) if clause[0] in columns]
+        sort = next((s for s in sort_by or [] if s['column_id'] in columns), None)
+
+        if sort is None and not clauses:
+            start = min(page_current * page_size, n)
+            return np.arange(start, min(start + page_size, n)), n
+
+        if sort is not None:
+            name = sort['column_id']
+            order, ordered = self.sorted_by(name, columns[name], version_of(name))
+            lo, hi = 0, n
+            rest = []
+            for clause in clauses:
+                column, op, value, _ = clause
+                if column == name and op in _RANGES and isinstance(value, float) and ordered.dtype.kind in 'iuf':
+                    side, bound = _RANGES[op]
+                    index = int(np.searchsorted(ordered, value, side))
+                    lo, hi = (max(lo, index), hi) if bound == 'lo' else (lo, min(hi, index))
+                else:
+                    rest.append(clause)
+            rows = order[lo:max(lo, hi)]
+            if rest:
+                mask = np.logical_and.reduce([_clause_mask(columns[c], op, v, cs) for c, op, v, cs in rest])
+                rows = rows[mask[rows]]
+            if sort['direction'] == 'desc':
+                rows = rows[::-1]
+        else:
+            mask = np.logical_and.reduce([_clause_mask(columns[c], op, v, cs) for c, op, v, cs in clauses])
+            rows = np.flatnonzero(mask)
+
+        start = page_current * page_size
+        return rows[start:start + page_size], len(rows)
+
+# Function to count a DataTable's pages; an empty table still has one
+def page_count(matches, page_size):
+    return max(1, math.ceil(matches / page_size))
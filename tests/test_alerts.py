@@ -0,0 +1,101 @@
+from alerts import AlertEngine, Rule, _Ladder
+from marketdata import make_source
+from sharedstate import SharedTickStore, FollowerEngine
+from tickengine import TickEngine
+
+STRIKES = [23000, 23050, 23100]
+
+# Function to build an AlertEngine with stateful rules, the same in every process
+def make_alerts():
+    alerts = AlertEngine()
+    for strike in STRIKES:
+        alerts.add_rule(f'straddle:{strike}', 1, 'above', kind='zscore', window=5)
+        alerts.add_rule(f'straddle:{strike}', -1, 'below', kind='zscore', window=5)
+        alerts.add_rule(f'straddle:{strike}', 0.5, 'above', kind='pct')
+        alerts.add_rule(f'straddle:{strike}', -0.5, 'below', kind='pct')
+    return alerts
+
+# Function to list alerts in a comparable form
+def feed(alerts):
+    latest, seq = alerts.since(0)
+    return seq, [(alert.seq, alert.time, alert.rule.id, alert.value) for alert in latest]
+
+def test_workers_serve_the_tickers_alerts(tmp_path):
+    store = SharedTickStore.create(str(tmp_path), STRIKES, ['A'], STRIKES, depth=100, interval=1.0)
+    ticker = TickEngine(make_source(['A'], STRIKES, STRIKES), 1.0, 100, store)
+    ticker_alerts = make_alerts()
+    ticker_alerts.attach(ticker)
+
+    # Each worker maps the store itself, as a separate process would
+    workers = []
+    for _ in range(2):
+        alerts = make_alerts()
+        alerts.attach(FollowerEngine(SharedTickStore.open(str(tmp_path))))
+        workers.append(alerts)
+
+    for _ in range(50):
+        ticker.tick()
+
+    seq, fired = feed(ticker_alerts)
+    assert seq > 0
+    for alerts in workers:
+        assert alerts.seq == seq
+        assert feed(alerts) == (seq, fired)
+        # Polling from any worker continues from the same cursor
+        assert alerts.since(seq) == ([], seq)
+
+# Function to build a ladder of value rules from (threshold, direction) pairs, ids in order
+def make_ladder(*specs):
+    ladder = _Ladder()
+    for i, (threshold, direction) in enumerate(specs):
+        ladder.add(Rule(i, 'x', float(threshold), direction, 'value', None, ''))
+    return ladder
+
+# Function to feed a ladder a series, listing the rule ids crossed at each value
+def crossings(ladder, values):
+    return [sorted(rule.id for rule in ladder.crossed(value)) for value in values]
+
+def test_ladder_fires_once_per_crossing():
+    ladder = make_ladder((10, 'above'), (20, 'above'), (10, 'below'), (5, 'below'))
+    # Both directions; staying past a threshold does not fire again, recrossing does
+    assert crossings(ladder, [12, 15, 25, 21, 9, 11, 4, 4, 6, 10]) == \
+        [[0], [], [1], [], [2], [0], [2, 3], [], [], [0]]
+
+def test_ladder_thresholds_are_inclusive_on_arrival():
+    ladder = make_ladder((10, 'above'), (10, 'below'))
+    # 'above' fires on last < threshold <= value and 'below' on value <= threshold < last
+    assert crossings(ladder, [9, 10, 10, 11, 10, 9]) == [[1], [0], [], [], [1], []]
+
+def test_ladder_first_value_crosses_from_infinity():
+    ladder = make_ladder((10, 'above'), (20, 'above'), (10, 'below'))
+    assert crossings(ladder, [15]) == [[0]]
+    ladder = make_ladder((10, 'above'), (20, 'above'), (10, 'below'))
+    assert crossings(ladder, [10]) == [[0, 2]]
+    ladder = make_ladder((10, 'above'), (20, 'above'), (10, 'below'))
+    assert crossings(ladder, [5]) == [[2]]
+
+def test_ladder_active_lists_most_extreme_first():
+    ladder = make_ladder((10, 'above'), (20, 'above'), (15, 'below'), (5, 'below'))
+    assert [rule.id for rule in ladder.active(25)] == [1, 0]
+    assert [rule.id for rule in ladder.active(12)] == [0, 2]
+    assert [rule.id for rule in ladder.active(5)] == [3, 2]
+    assert ladder.active(17) == [ladder.rules['above'][0]]
+
+def test_remove_rule_stops_it_firing():
+    alerts = AlertEngine()
+    kept = alerts.add_rule('vix', 20)
+    removed = alerts.add_rule('vix', 20)        # same threshold: removal must find it by id
+    other = alerts.add_rule('vix', 25, kind='pct')
+    assert {alert.rule.id for alert in alerts.evaluate({'vix': 21}, 1.0)} == {kept.id, removed.id}
+
+    alerts.remove_rule(removed.id)
+    alerts.remove_rule(other.id)
+    assert len(alerts) == 1
+    alerts.evaluate({'vix': 19}, 2.0)
+    assert [alert.rule for alert in alerts.evaluate({'vix': 22}, 3.0)] == [kept]
+    assert [rule.id for rule in alerts.active('vix', 22)] == [kept.id]
+    # Alerts logged before the removal still resolve to their rule
+    assert [alert.rule for alert in alerts.since(0)[0]] == [kept, removed, kept]
+
+    alerts.remove_rule(kept.id)
+    assert len(alerts) == 0 and alerts.evaluate({'vix': 30}, 4.0) == []
@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+from downsample import lttb_indices, minmax_indices
+
+# Straightforward one-bucket-at-a-time LTTB, the reference for the vectorized version
+def lttb_reference(x, y, n):
+    length = len(x)
+    if n >= length or n < 3:
+        return np.arange(length)
+    edges = np.linspace(1, length - 1, n - 1).astype(np.int64)
+    indices = [0]
+    for i in range(n - 2):
+        lo, hi = edges[i], edges[i + 1]
+        next_lo, next_hi = hi, edges[i + 2] if i + 2 < n - 1 else length
+        mean_x, mean_y = x[next_lo:next_hi].mean(), y[next_lo:next_hi].mean()
+        a = indices[-1]
+        area = np.abs((x[a] - mean_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (mean_y - y[a]))
+        indices.append(lo + int(np.argmax(area)))
+    return np.array(indices + [length - 1])
+
+@pytest.mark.parametrize('length, n', [(22500, 1000), (1000, 999), (50, 3), (10, 4), (5000, 37)])
+def test_lttb_matches_the_sequential_algorithm(length, n):
+    rng = np.random.default_rng(length)
+    x = np.arange(length) + rng.random(length) * 0.1
+    for y in (np.cumsum(rng.normal(size=length)), np.zeros(length), np.sin(np.arange(length) / 7)):
+        np.testing.assert_array_equal(lttb_indices(x, y, n), lttb_reference(x, y, n))
+
+def test_minmax_keeps_spikes():
+    y = np.zeros(10000)
+    y[1234], y[8765] = 50, -50
+    picked = minmax_indices(y, 100)
+    assert len(picked) <= 100
+    assert {1234, 8765} <= set(picked.tolist())
+
+def test_minmax_skips_all_nan_buckets():
+    y = np.full(5000, np.nan)
+    y[3000:] = np.arange(2000.0)
+    picked = minmax_indices(y, 100)
+    assert len(picked) and not np.isnan(y[picked]).any()
+    assert {3000, 4999} <= set(picked.tolist())
+    assert len(minmax_indices(np.full(5000, np.nan), 100)) == 0
@@ -0,0 +1,54 @@
+import pytest
+from htmlrewrite import Rule, StreamingRewriter, rewrite_stream
+from showweb import PAGE_CHROME_RULES
+
+# Markup the rules leave alone, written the ways real pages write it
+UNTOUCHED = ('<!DOCTYPE html>\n<html lang=en><head><meta charset="utf-8"><title>Q2 &amp; Q3 — résumé</title>'
+             '<script>if (a < b && c > d) { x = "<div>"; }</script><!-- a comment --></head><body>'
+             "<a href='/stock?id=1&amp;x=2' data-x=unquoted>Tata &#8377; &#x20B9; &nbsp;</a><br/><img src=x.png >"
+             '<div class="logo_wrapper">only one of the classes</div>')
+
+# The four chrome divs as the site writes them -> as the rewriter should emit them
+CHROME = [
+    ('<div class="clearfix logo_wrapper" id="logo">logo</div>',
+     '<div class="clearfix logo_wrapper" id="logo" style="display:none;">logo</div>'),
+    ('<DIV style="color:red" class="bottom_nav">nav</div>',
+     '<div class="bottom_nav" style="display:none;">nav</div>'),
+    ('<div class="header_desktop extra"><span>header</span></div>',
+     '<div class="header_desktop extra" style="display:none;"><span>header</span></div>'),
+    ('<div class="forMobNone innerPageStrip">strip</div>',
+     '<div class="forMobNone innerPageStrip" style="display:none;">strip</div>'),
+]
+
+PAGE = UNTOUCHED + ''.join(raw for raw, _ in CHROME) + '</body></html>'
+EXPECTED = UNTOUCHED + ''.join(rewritten for _, rewritten in CHROME) + '</body></html>'
+
+# Function to rewrite `page` as the proxy does, from byte chunks split at `cuts`
+def rewrite_split(page, cuts, rules=PAGE_CHROME_RULES):
+    data = page.encode('utf-8')
+    bounds = [0] + sorted(cuts) + [len(data)]
+    return ''.join(rewrite_stream([data[a:b] for a, b in zip(bounds, bounds[1:])], rules))
+
+def test_untouched_markup_passes_through_verbatim():
+    assert rewrite_split(UNTOUCHED + '</body></html>', []) == UNTOUCHED + '</body></html>'
+
+@pytest.mark.parametrize('cut_after', ['<div cla', '&am', '&#83', '&#x20', '&nbs', '<!-- a com', '<script>if (a <',
+                                       'r', '<!DOC', '<DIV style="col', 'header_desktop extra"><sp'])
+def test_chunk_boundaries_inside_markup(cut_after):
+    cuts = [PAGE.encode('utf-8').index(cut_after.encode('utf-8')) + len(cut_after.encode('utf-8'))]
+    assert rewrite_split(PAGE, cuts) == EXPECTED
+
+@pytest.mark.parametrize('size', [1, 2, 3, 7, 64])
+def test_every_chunk_size(size):
+    # Byte-sized chunks also split the multi-byte characters
+    assert rewrite_split(PAGE, range(size, len(PAGE.encode('utf-8')), size)) == EXPECTED
+
+def test_remove_drops_nested_same_tag_children():
+    rules = [Rule('div.ad', remove=True)]
+    page = ('<p>before</p><div class="ad"><div><div class="inner">ad</div></div><img src=a.png>tail</div>'
+            '<div class="kept">after</div>')
+    expected = '<p>before</p><div class="kept">after</div>'
+    assert rewrite_split(page, []) == page
+    assert ''.join(StreamingRewriter(rules).feed(page)) == expected
+    for size in (1, 5):
+        assert rewrite_split(page, range(size, len(page), size), rules) == expected
@@ -0,0 +1,30 @@
+import pytest
+import itm
+
+@pytest.fixture
+def client():
+    itm.itm_cache.clear()
+    return itm.server.test_client()
+
+def test_fractional_spot_is_used_not_the_default(client):
+    response = client.get('/itm-probability?spot=24002.6')
+    assert response.status_code == 200
+    # Snapped to the 5-point quantum
+    assert b'Spot 24005 |' in response.data
+
+def test_invalid_spot_is_rejected(client):
+    for spot in ('abc', 'nan', 'inf'):
+        assert client.get(f'/itm-probability?spot={spot}').status_code == 400
+
+def test_fractional_integer_parameter_is_rejected(client):
+    assert client.get('/itm-probability?days=7.5').status_code == 400
+
+def test_small_positive_spot_and_vol_are_accepted(client):
+    response = client.get('/itm-probability?spot=2&vol=0.001&strike_low=5&strike_high=10&strike_step=5&days=2')
+    assert response.status_code == 200
+    # Snapped up to one step rather than down to 0
+    assert b'Spot 5 | Rate 0.03 | Vol 0.0025' in response.data
+
+def test_non_positive_spot_and_vol_are_rejected(client):
+    for query in ('spot=0', 'spot=-1', 'vol=0', 'vol=-0.001'):
+        assert client.get(f'/itm-probability?{query}').status_code == 400
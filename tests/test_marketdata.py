@@ -0,0 +1,14 @@
+import pytest
+from marketdata import MarketDataSource, make_source
+
+def test_feed_without_tick_cannot_be_constructed():
+    class NoTick(MarketDataSource):
+        pass
+
+    with pytest.raises(TypeError):
+        NoTick(['A'], [23000], [23000])
+
+def test_bundled_feeds_tick():
+    source = make_source(['A'], [23000], [23000])
+    assert isinstance(source, MarketDataSource)
+    assert source.tick(0.0).stock_prices.shape == (1,)
@@ -0,0 +1,32 @@
+import dash
+from dash import Input, Output, html
+from pubsub import Broadcaster, add_sse_route
+from metrics import CallbackMetrics
+
+# Function to build a one-callback Dash app with callback metrics and an SSE route
+def make_app():
+    app = dash.Dash(__name__)
+    app.layout = html.Div([html.Div(id='source'), html.Div(id='target')])
+
+    @app.callback(Output('target', 'children'), Input('source', 'children'))
+    def echo(value):
+        return value
+
+    broadcaster = Broadcaster()
+    add_sse_route(app.server, broadcaster)
+    return app, broadcaster, CallbackMetrics(app)
+
+def test_event_streams_are_not_timed():
+    app, broadcaster, metrics = make_app()
+    response = app.server.test_client().get('/stream', buffered=False)
+    assert response.mimetype == 'text/event-stream'
+    assert next(response.response).startswith(b'retry:')
+    response.close()
+    assert metrics.as_dict('route') == {}
+
+def test_callback_body_that_is_not_an_object():
+    app, _, metrics = make_app()
+    client = app.server.test_client()
+    assert client.post('/_dash-update-component', json=[1]).status_code >= 400
+    assert client.get('/metrics').status_code == 200
+    assert metrics.as_dict('callback')['']['calls'] == 1
@@ -0,0 +1,54 @@
+import math
+import numpy as np
+import pytest
+from pricing import implied_vol, norm_cdf, price_chain
+
+# The accuracy stated on norm_cdf: one ulp of 1.0
+NORM_CDF_BOUND = 2.0 ** -52
+
+def test_norm_cdf_within_stated_bound_of_erf():
+    rng = np.random.default_rng(0)
+    x = np.concatenate([np.linspace(-40, 40, 200001), rng.normal(0, 3, 100000)])
+    expected = np.array([0.5 * (1 + math.erf(value / math.sqrt(2))) for value in x])
+    assert np.abs(norm_cdf(x) - expected).max() <= NORM_CDF_BOUND
+
+def test_norm_cdf_limits():
+    assert norm_cdf(np.inf) == 1.0
+    assert norm_cdf(-np.inf) == 0.0
+    assert norm_cdf(0.0) == 0.5
+
+# A chain around the money, from far OTM to deep ITM, over a day to a year
+SPOT, RATE = 24000.0, 0.065
+STRIKES = np.arange(20000, 28001, 250.0)[:, None]
+EXPIRIES = (np.array([1, 2, 7, 14, 30, 60, 90, 180, 365]) / 365)[None, :]
+
+@pytest.mark.parametrize('option_type', ['call', 'put'])
+@pytest.mark.parametrize('sigma', [0.1, 0.2, 0.4])
+def test_implied_vol_round_trips(option_type, sigma):
+    price = price_chain(SPOT, STRIKES, EXPIRIES, RATE, sigma)[option_type]
+    iv = implied_vol(price, SPOT, STRIKES, EXPIRIES, RATE, option_type)
+    solved = ~np.isnan(iv)
+    intrinsic = np.maximum(SPOT - STRIKES * np.exp(-RATE * EXPIRIES), 0)
+    if option_type == 'put':
+        intrinsic = intrinsic - SPOT + STRIKES * np.exp(-RATE * EXPIRIES)
+    time_value = price - intrinsic
+
+    # Every cell with time value to solve for is solved, and reprices within tol
+    assert solved[time_value > 1e-6].all()
+    repriced = price_chain(SPOT, STRIKES, EXPIRIES, RATE, np.where(solved, iv, sigma))[option_type]
+    assert np.abs(repriced - price)[solved].max() < 1e-6
+    # The vol itself is only well determined where the price moves with it
+    assert np.abs(iv - sigma)[time_value > 1e-2].max() < 1e-5
+
+def test_implied_vol_nan_cases():
+    price = price_chain(SPOT, 24000.0, 30 / 365, RATE, 0.2)['call']
+    # Expired
+    assert np.isnan(implied_vol(price, SPOT, 24000.0, 0.0, RATE))
+    # At or below the discounted intrinsic value, at or above the spot
+    lower = SPOT - 23000.0 * np.exp(-RATE * 30 / 365)
+    assert np.isnan(implied_vol([lower, lower - 1], SPOT, 23000.0, 30 / 365, RATE)).all()
+    assert np.isnan(implied_vol([SPOT, SPOT + 1], SPOT, 24000.0, 30 / 365, RATE)).all()
+    # A put is bounded by the discounted strike instead
+    strike = 24000.0 * np.exp(-RATE * 30 / 365)
+    assert np.isnan(implied_vol([strike, 0.0], SPOT, 24000.0, 30 / 365, RATE, 'put')).all()
+    assert np.isfinite(implied_vol(price, SPOT, 24000.0, 30 / 365, RATE))
@@ -0,0 +1,42 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+import showweb
+
+# Upstream stub that answers every request with a 503, slowly enough for viewers to pile up
+class FailingUpstream(BaseHTTPRequestHandler):
+    def do_GET(self):
+        time.sleep(0.3)
+        self.send_response(503)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def failing_upstream(monkeypatch):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), FailingUpstream)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setattr(showweb, 'TARGET_URL', f'http://127.0.0.1:{server.server_port}/page')
+    yield
+    server.shutdown()
+    server.server_close()
+
+def test_concurrent_viewers_of_failing_upstream_all_get_502(failing_upstream):
+    statuses = []
+    barrier = threading.Barrier(4)
+
+    def view():
+        client = showweb.app.test_client()
+        barrier.wait()
+        statuses.append(client.get('/proxy').status_code)
+
+    threads = [threading.Thread(target=view) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert statuses == [502] * 4
@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+from tablequery import ColumnTable, page_count, parse_filter
+
+@pytest.mark.parametrize('filter_query, clauses', [
+    ('{Call OI} >= 1000', [('Call OI', '>=', 1000.0, True)]),
+    ('{Call OI} ge 1000 && {Put OI} lt 2.5', [('Call OI', '>=', 1000.0, True), ('Put OI', '<', 2.5, True)]),
+    ('{Stock Name} icontains "bank"', [('Stock Name', 'contains', 'bank', False)]),
+    ('{Stock Name} scontains TC', [('Stock Name', 'contains', 'TC', True)]),
+    # String operators keep unquoted numbers as typed
+    ('{Strike Price} contains 1', [('Strike Price', 'contains', '1', True)]),
+    ('{Date} datestartswith 2024', [('Date', 'datestartswith', '2024', True)]),
+    ('{Stock Name} eq "it\\"s"', [('Stock Name', '=', 'it"s', True)]),
+    ('{Stock Name} = TCS', [('Stock Name', '=', 'TCS', True)]),
+    ('', []),
+    ('not a clause && {Call OI} > 5', [('Call OI', '>', 5.0, True)]),
+])
+def test_parse_filter(filter_query, clauses):
+    assert parse_filter(filter_query) == clauses
+
+# A small table with repeated values, so stable sorting and range bounds both matter
+def make_columns():
+    rng = np.random.default_rng(7)
+    return {'Strike Price': np.arange(23000, 23000 + 50 * 40, 50),
+            'Call OI': rng.integers(0, 20, 40).astype(float),
+            'Stock Name': np.array([f'S{i:02d}' for i in range(40)])}
+
+# Function to answer a query the slow way: filter every row, stable-sort, then page
+def expected_rows(columns, page_current, page_size, sort_by, keep):
+    rows = np.flatnonzero(keep)
+    if sort_by:
+        name, direction = sort_by[0]['column_id'], sort_by[0]['direction']
+        rows = rows[np.argsort(columns[name][rows], kind='stable')]
+        if direction == 'desc':
+            rows = rows[::-1]
+    start = page_current * page_size
+    return rows[start:start + page_size].tolist(), len(rows)
+
+@pytest.mark.parametrize('direction', ['asc', 'desc'])
+@pytest.mark.parametrize('filter_query, keep', [
+    ('', lambda c: np.ones(40, dtype=bool)),
+    ('{Call OI} >= 5 && {Call OI} < 15', lambda c: (c['Call OI'] >= 5) & (c['Call OI'] < 15)),
+    ('{Call OI} > 5 && {Call OI} <= 15', lambda c: (c['Call OI'] > 5) & (c['Call OI'] <= 15)),
+    ('{Call OI} > 30', lambda c: np.zeros(40, dtype=bool)),
+    # A string operator on a number column, alongside a range on the sort column
+    ('{Call OI} >= 3 && {Strike Price} contains 15', lambda c: (c['Call OI'] >= 3) &
+                                                               np.array(['15' in str(s) for s in c['Strike Price']])),
+])
+def test_query_matches_a_full_scan(direction, filter_query, keep):
+    columns = make_columns()
+    table = ColumnTable()
+    sort_by = [{'column_id': 'Call OI', 'direction': direction}]
+    for page_current in range(4):
+        rows, matches = table.query(columns, lambda name: 0, page_current, 7, sort_by, filter_query)
+        assert (rows.tolist(), matches) == expected_rows(columns, page_current, 7, sort_by, keep(columns))
+
+def test_query_pages_without_sort_or_filter():
+    columns = make_columns()
+    rows, matches = ColumnTable().query(columns, lambda name: 0, 5, 7)
+    assert rows.tolist() == list(range(35, 40)) and matches == 40
+    rows, matches = ColumnTable().query(columns, lambda name: 0, 9, 7)
+    assert rows.tolist() == [] and matches == 40
+
+def test_query_resorts_when_the_version_moves():
+    columns = make_columns()
+    table = ColumnTable()
+    sort_by = [{'column_id': 'Call OI', 'direction': 'asc'}]
+    table.query(columns, lambda name: 1, 0, 40, sort_by)
+    columns['Call OI'] = columns['Call OI'][::-1].copy()
+    rows, _ = table.query(columns, lambda name: 2, 0, 40, sort_by)
+    assert rows.tolist() == expected_rows(columns, 0, 40, sort_by, np.ones(40, dtype=bool))[0]
+
+@pytest.mark.parametrize('matches, pages', [(0, 1), (1, 1), (10, 1), (11, 2), (40, 4)])
+def test_page_count(matches, pages):
+    assert page_count(matches, 10) == pages
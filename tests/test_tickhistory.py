@@ -0,0 +1,78 @@
+import time
+import numpy as np
+from marketdata import make_source
+from tickengine import TickEngine, HISTORY_COLUMNS
+from oihistory import day_of
+from tickhistory import TickHistory, TickRecorder
+
+# Function to record one tick row for `strike` at each of `times`
+def record_ticks(history, strike, times):
+    rows = np.zeros((len(times), len(HISTORY_COLUMNS)))
+    rows[:, 0] = times
+    rows[:, 1:] = strike / 100
+    history.record({strike: rows})
+
+def test_rehydrate_aligns_partial_histories(tmp_path):
+    now = time.time()
+    times = now - 100 + np.arange(100)
+    history = TickHistory(tmp_path)
+    record_ticks(history, 23000, times)
+    record_ticks(history, 23050, times[60:])         # joined late, e.g. a new overlay strike
+    # 23100 has no history at all
+
+    recorder = TickRecorder(tmp_path)
+    strikes = [23000, 23050, 23100]
+    engine = TickEngine(make_source(['A'], strikes, strikes), interval=1.0, recorder=recorder)
+    try:
+        # The engine's first tick follows the 100 rehydrated rows
+        assert {engine.history[strike].count for strike in strikes} == {101}
+        for strike in strikes:
+            np.testing.assert_array_equal(engine.history[strike].window()[:100, 0], times)
+        assert np.isnan(engine.history[23050].window()[:60, 1]).all()
+        assert (engine.history[23050].window()[60:100, 1] == 230.5).all()
+        assert np.isnan(engine.history[23100].window()[:100, 1]).all()
+
+        engine.tick()
+        assert {engine.history[strike].count for strike in strikes} == {102}
+    finally:
+        recorder.close()
+
+def test_second_recorder_on_a_directory_does_not_record(tmp_path):
+    strikes = [23000, 23050]
+    first, second = TickRecorder(tmp_path), TickRecorder(tmp_path)
+    engine = TickEngine(make_source(['A'], strikes, strikes), interval=1.0, recorder=first)
+    other = TickEngine(make_source(['A'], strikes, strikes), interval=1.0, recorder=second)
+    try:
+        for _ in range(5):
+            engine.tick()
+            other.tick()
+    finally:
+        second.close()
+        first.close()
+
+    times = TickHistory(tmp_path).load(day_of(time.time()), 23000)[:, 0]
+    assert len(times) == 6
+    assert (np.diff(times) > 0).all()
+
+def test_overlay_renders_after_partial_rehydrate(tmp_path, monkeypatch):
+    # Imported here: importing str builds the whole app
+    import str as straddle_app
+    now = time.time()
+    times = now - 3000 + np.arange(2990)
+    record_ticks(TickHistory(tmp_path), 23000, times)     # 23050 has no history
+
+    recorder = TickRecorder(tmp_path)
+    strikes = [23000, 23050]
+    engine = TickEngine(make_source(['A'], strikes, strikes), interval=1.0, recorder=recorder)
+    monkeypatch.setattr(straddle_app, 'engine', engine)
+    try:
+        assert len(times) > straddle_app.CHART_MAX_POINTS
+        for chart_window, zoom in [(straddle_app.SESSION_WINDOW, None), (3600, None), (60, (times[0], times[-1]))]:
+            fig, seq = straddle_app.render_view(strikes, chart_window, zoom)
+            assert seq == engine.history[23000].count
+            lines = {trace.name: trace for trace in fig.data}
+            assert 0 < len(lines['23000'].y) <= straddle_app.CHART_MAX_POINTS
+            assert not np.isnan(np.asarray(lines['23050'].y, dtype=float)).any()
+            fig.to_json()
+    finally:
+        recorder.close()
@@ -0,0 +1,140 @@
+import logging
+import os
+import threading
+import time
+from collections import namedtuple
+from contextlib import nullcontext
+import numpy as np
+from ringbuffer import RingBuffer
+from optionchain import OptionChainStore
+from analytics import StraddleAnalytics, OIMomentum
+from downsample import OHLCTiers
+
+logger = logging.getLogger(__name__)
+
+# Columns kept per strike in the tick history: prices, then the straddle analytics
+HISTORY_COLUMNS = ('time', 'call', 'put', 'straddle') + StraddleAnalytics.COLUMNS
+
+# Immutable view of one tick. The engine swaps in a new one each tick, so readers
+# never see a half-updated state and never need to take a lock.
+Snapshot = namedtuple('Snapshot', ['seq', 'time', 'spot', 'straddles', 'stocks', 'option_chain', 'vix'])
+
+# Function to build a Snapshot from arrays aligned to the engine's strikes and stock names
+def make_snapshot(seq, now, spot, strikes, straddle, stock_names, stock_prices, option_chain, vix):
+    return Snapshot(
+        seq=seq,
+        time=float(now),
+        spot=float(spot),
+        straddles=dict(zip(strikes, straddle.tolist())),
+        stocks=[{'Stock Name': name, 'Price': price}
+                for name, price in zip(stock_names, stock_prices.tolist())],
+        option_chain=option_chain.records(),
+        vix=float(vix)
+    )
+
+# Single background clock that advances every strike, the stock table, the option
+# chain and India VIX, independently of how many browsers are polling. Prices come
+# from a marketdata.MarketDataSource, which also defines the instruments tracked.
+#
+# Each strike's straddle is also kept as 1s/1m/5m OHLC bars for long-horizon charts.
+#
+# With a sharedstate.SharedTickStore the history, bars and option chain live in the store
+# instead of process memory, and every tick is published there for follower workers.
+# With a tickhistory.TickRecorder the history is warm-started from disk and every tick
+# is written back to it.
+class TickEngine:
+    # This engine advances the market itself (see sharedstate.FollowerEngine)
+    is_follower = False
+
+    def __init__(self, source, interval=None, depth=None, store=None, recorder=None):
+        self.source = source
+        self.strikes = list(source.strikes)
+        self.stock_names = list(source.stock_names)
+        self.interval = interval or float(os.environ.get("TICK_INTERVAL", 1.0))
+        depth = depth or int(os.environ.get("STRADDLE_HISTORY_DEPTH", 20000))
+
+        self.straddle_analytics = StraddleAnalytics(len(self.strikes), self.interval)
+        self.oi_momentum = OIMomentum(len(source.option_strike_prices), self.interval)
+        self.store = store
+        if store is None:
+            self.history = {strike: RingBuffer(depth, HISTORY_COLUMNS) for strike in self.strikes}
+            self.bars = {strike: OHLCTiers() for strike in self.strikes}
+            self.option_chain = OptionChainStore(source.option_strike_prices)
+        else:
+            self.history = store.history
+            self.bars = store.bars
+            self.option_chain = store.option_chain
+
+        self._listeners = []
+        self._tick_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._snapshot = None
+        self.recorder = recorder
+        if recorder is not None:
+            recorder.attach(self)
+        self.tick()
+
+    # Register fn(snapshot), called on the engine thread after every tick
+    def add_listener(self, fn):
+        self._listeners.append(fn)
+
+    def snapshot(self):
+        return self._snapshot
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='tick-engine', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self.recorder is not None:
+            self.recorder.flush()
+
+    def _run(self):
+        next_tick = time.monotonic() + self.interval
+        while not self._stop.wait(max(0.0, next_tick - time.monotonic())):
+            try:
+                self.tick()
+            except Exception:
+                logger.exception("tick failed")
+            # Fixed clock: if a tick overran, skip the missed slots instead of bursting to catch up
+            next_tick += self.interval
+            now = time.monotonic()
+            if next_tick < now:
+                next_tick = now + self.interval - (now - next_tick) % self.interval
+
+    # Advance everything by one step and publish a new snapshot
+    def tick(self):
+        with self._tick_lock:
+            market = self.source.tick(time.time())
+            now = market.time
+            seq = 0 if self._snapshot is None else self._snapshot.seq + 1
+            straddle = market.straddle_call + market.straddle_put
+            analytics = self.straddle_analytics.update(straddle)
+            rows = np.column_stack([np.full(len(self.strikes), now), market.straddle_call, market.straddle_put,
+                                    straddle] + [analytics[name] for name in StraddleAnalytics.COLUMNS])
+            chain = dict(market.option_chain, **self.oi_momentum.update(market.option_chain['Call OI'],
+                                                                        market.option_chain['Put OI']))
+            with nullcontext() if self.store is None else self.store.writing(seq, market):
+                for i, strike in enumerate(self.strikes):
+                    self.history[strike].append(rows[i])
+                    self.bars[strike].update(now, straddle[i])
+                self.option_chain.update(chain)
+
+            snapshot = make_snapshot(seq, now, market.spot, self.strikes, straddle, self.stock_names,
+                                     market.stock_prices, self.option_chain, market.vix)
+            self._snapshot = snapshot
+
+        for fn in self._listeners:
+            try:
+                fn(snapshot)
+            except Exception:
+                logger.exception("tick listener %r failed", fn)
+        return snapshot
@@ -0,0 +1,166 @@
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+import numpy as np
+from oihistory import ColumnLog, day_of
+from tickengine import HISTORY_COLUMNS
+
+try:
+    import fcntl
+except ImportError:         # Windows: no advisory locks, one writer is up to the deployment
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# One record per strike per tick: a full tick history row
+HISTORY_DTYPE = np.dtype([(name, '<f8') for name in HISTORY_COLUMNS])
+
+# Per-strike tick history on disk, on top of ColumnLog. The columns are recorded next to
+# the data so a log written with a different HISTORY_COLUMNS is refused, not misread.
+class TickHistory:
+    def __init__(self, root):
+        self.log = ColumnLog(root, HISTORY_DTYPE)
+        path = os.path.join(root, 'columns.json')
+        if os.path.exists(path):
+            with open(path) as f:
+                columns = json.load(f)
+            if columns != list(HISTORY_COLUMNS):
+                raise ValueError(f"tick history at {root} has columns {columns}, expected {list(HISTORY_COLUMNS)}")
+        else:
+            os.makedirs(root, exist_ok=True)
+            with open(path, 'w') as f:
+                json.dump(list(HISTORY_COLUMNS), f)
+
+    # Record ticks of {strike: (n, HISTORY_COLUMNS) rows}
+    def record(self, rows_by_strike):
+        for strike, rows in rows_by_strike.items():
+            self.log.append(strike, np.ascontiguousarray(rows, dtype='<f8').view(HISTORY_DTYPE).reshape(-1))
+        self.log.flush()
+
+    # (n, HISTORY_COLUMNS) rows of `strike` on `day` with start <= time < end, memory-mapped
+    def load(self, day, strike, start=None, end=None):
+        records = self.log.read(day, strike, start, end)
+        return records.view('<f8').reshape(len(records), len(HISTORY_COLUMNS))
+
+# Recorders attached in this process, for close_all()
+_recorders = []
+
+# Function to write out every recorder's pending ticks; for processes that exit without
+# running atexit handlers, such as multiprocessing children
+def close_all():
+    for recorder in _recorders:
+        recorder.close()
+
+# Write-behind recorder for a TickEngine's history, and its warm restart.
+#
+# The engine thread only copies each tick's newest rows into a pending list; a background
+# thread writes them to disk in one batch per strike every `flush_interval` seconds, so
+# ticks and requests never wait on the disk. At most one batch is lost on a crash.
+#
+# On startup the last `warm_minutes` of today's history are loaded back into the engine's
+# ring buffers and the whole day into its OHLC bars, in bulk. The rolling analytics start
+# cold and refill within their window.
+#
+# Only one process may record into a history directory: interleaved appends from two
+# engines would leave the per-strike logs out of time order. The first recorder takes an
+# exclusive lock on the directory; any other still warm-starts from it but records nothing.
+class TickRecorder:
+    def __init__(self, root, flush_interval=1.0, warm_minutes=60):
+        self.root = root
+        self.history = TickHistory(root)
+        self.flush_interval = flush_interval
+        self.warm_minutes = warm_minutes
+        self._engine = None
+        self._pending = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._lock_file = None
+
+    # Warm-start `engine` from disk, then record its every tick; called before its first tick
+    def attach(self, engine):
+        self._engine = engine
+        self.rehydrate(engine)
+        if not self._lock_history():
+            logger.warning("tick history at %s is being recorded by another process; not recording", self.root)
+            return
+        engine.add_listener(self.on_tick)
+        self._thread = threading.Thread(target=self._run, name='tick-recorder', daemon=True)
+        self._thread.start()
+        _recorders.append(self)
+        atexit.register(self.close)
+
+    # Every strike's ring gets one row per tick time found in any strike's history, NaN
+    # where its own history has none (a strike added since, or a batch cut short by a
+    # crash), so all rings end at the same count as the charts' shared cursor expects
+    def rehydrate(self, engine, now=None):
+        now = now or time.time()
+        day = day_of(now)
+        start = now - self.warm_minutes * 60
+        warm = {}
+        for strike in engine.strikes:
+            rows = self.history.load(day, strike)
+            if not len(rows):
+                continue
+            engine.bars[strike].extend(rows[:, 0], rows[:, HISTORY_COLUMNS.index('straddle')])
+            warm[strike] = rows[np.searchsorted(rows[:, 0], start):]
+        if not warm:
+            return
+        times = np.unique(np.concatenate([rows[:, 0] for rows in warm.values()]))
+        for strike in engine.strikes:
+            aligned = np.full((len(times), len(HISTORY_COLUMNS)), np.nan)
+            aligned[:, 0] = times
+            if strike in warm:
+                aligned[np.searchsorted(times, warm[strike][:, 0])] = warm[strike]
+            engine.history[strike].extend(aligned)
+
+    # Take the directory's writer lock; False if another process holds it
+    def _lock_history(self):
+        if fcntl is None:
+            return True
+        lock_file = open(os.path.join(self.root, 'writer.lock'), 'a')
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        self._lock_file = lock_file
+        return True
+
+    # TickEngine listener
+    def on_tick(self, snapshot):
+        rows = np.stack([self._engine.history[strike].window(1)[0] for strike in self._engine.strikes])
+        with self._lock:
+            self._pending.append(rows)
+
+    # Write every pending tick to disk, in order even if called from several threads
+    def flush(self):
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, []
+            if not pending:
+                return
+            ticks = np.stack(pending)
+            self.history.record({strike: ticks[:, i] for i, strike in enumerate(self._engine.strikes)})
+            self.history.log.close(keep_day=day_of(ticks[-1, 0, 0]))
+
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("tick history flush failed")
+
+    def close(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.flush()
+        if self._lock_file is not None:
+            self._lock_file.close()
+            self._lock_file = None
@@ -0,0 +1,51 @@
+import threading
+import time
+from collections import OrderedDict
+
+# Bounded LRU cache whose entries also expire `ttl` seconds after they were stored
+class TTLCache:
+    def __init__(self, maxsize=128, ttl=60.0, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clock = clock
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._data)
+
+    # Return (value, age in seconds) for a live entry, or (None, None) on a miss
+    def get_with_age(self, key):
+        now = self.clock()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None, None
+            value, stored_at = entry
+            age = now - stored_at
+            if age > self.ttl:
+                del self._data[key]
+                return None, None
+            self._data.move_to_end(key)
+            return value, age
+
+    def get(self, key, default=None):
+        value, age = self.get_with_age(key)
+        return default if age is None else value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (value, self.clock())
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key, default=None):
+        with self._lock:
+            entry = self._data.pop(key, None)
+        return default if entry is None else entry[0]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()